@@ -0,0 +1,105 @@
+# nexus_apptest.py
+"""Helpers for driving the app script headlessly with Streamlit's ``AppTest``.
+
+The load test, replay and the app tests all run the real script. Two things
+they share:
+
+- ``scratch_stores`` points every store the app writes (aggregated
+  statistics, score histories, drafts, spilled and shared sessions, the team
+  cache) at a temporary directory, so simulated or replayed traffic never
+  reaches the real data. The published correlation adjustments and the
+  mentor profile index are copied over so reports are still scored and
+  matched as in production. It also puts the repository on the import path,
+  which ``AppTest`` does not do for the script's directory, so the app's
+  imports resolve wherever the harness is run from.
+- ``settle_widgets`` works around ``AppTest`` keeping the widgets of a run
+  that ``st.rerun()`` interrupted.
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_SCRIPT = os.path.join(REPO_DIR, "nexus_streamlit_app.py")
+
+# Environment variables naming stores the app writes, with the app's default
+STORES = {
+    "NEXUS_SPILL_DIR": "session_spill",
+    "NEXUS_DRAFTS_DB": "drafts.db",
+    "NEXUS_HISTORY_DIR": "assessment_history",
+    "NEXUS_ITEM_STATS_DIR": "item_stats",
+    "NEXUS_LATENCY_DIR": "latency_stats",
+    "NEXUS_CORRELATION_DIR": "correlation_stats",
+    "NEXUS_TEAM_CACHE": "team_cache",
+}
+# Written only when configured, so redirected only then
+OPTIONAL_STORES = {"NEXUS_SESSION_DB": "sessions.db"}
+# Files the app reads and appends to, copied into the scratch directory
+COPIED = {"NEXUS_MENTOR_INDEX": "mentors.npz"}
+# Not written by headless runs at all: replayed or simulated traffic is not new traffic
+DISABLED = ("NEXUS_EVENT_LOG",)
+
+
+@contextmanager
+def scratch_stores(directory: Optional[str] = None) -> Iterator[str]:
+    """Point the app's stores at ``directory`` (a new temporary one by default) for the duration
+
+    Sets the environment, so it must be entered before the app's resources
+    are first created; worker processes started inside inherit it. A
+    temporary directory is removed when the interpreter exits.
+    """
+    root = directory or tempfile.mkdtemp(prefix="nexus-scratch-")
+    if directory is None:
+        # Registered first so it runs after the app's aggregators flush their shards at exit
+        atexit.register(shutil.rmtree, root, True)
+    correlations = os.environ.get("NEXUS_CORRELATION_DIR", STORES["NEXUS_CORRELATION_DIR"])
+    env: Dict[str, Optional[str]] = {key: os.path.join(root, name) for key, name in STORES.items()}
+    env.update({key: os.path.join(root, name) for key, name in OPTIONAL_STORES.items() if os.environ.get(key)})
+    env.update(dict.fromkeys(DISABLED))
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    python_path = os.environ.get("PYTHONPATH")
+    if REPO_DIR not in (python_path or "").split(os.pathsep):
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, python_path]))
+    for key, name in COPIED.items():
+        source = os.environ.get(key)
+        if source and os.path.exists(source):
+            env[key] = os.path.join(root, name)
+            shutil.copyfile(source, env[key])
+            if os.path.exists(f"{source}.journal"):
+                shutil.copyfile(f"{source}.journal", f"{env[key]}.journal")
+    adjustments = os.path.join(correlations, "adjustments")
+    if os.path.isdir(adjustments):
+        shutil.copytree(adjustments, os.path.join(env["NEXUS_CORRELATION_DIR"], "adjustments"))
+    saved = {key: os.environ.get(key) for key in env}
+    try:
+        for key, value in env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        yield root
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def settle_widgets(at):
+    """Give a value to widgets left over from a run interrupted by ``st.rerun()``
+
+    ``AppTest`` keeps such elements in its tree although the session no longer
+    has state for them, and the next run fails on them.
+    """
+    for radio in at.radio:
+        try:
+            radio.value
+        except KeyError:
+            # Question radios hold option indices; the others their labels
+            radio.set_value(0 if radio.key and radio.key.startswith("q_") else radio.options[0])
@@ -0,0 +1,292 @@
+# nexus_archetypes.py
+"""Data-driven profile archetypes from mini-batch k-means over stored scores.
+
+The model is a set of centroids in score space plus how many profiles each
+centroid has absorbed. Fitting streams the score matrix in chunks; every
+chunk moves each centroid to the running mean of the profiles assigned to it,
+so the whole history never has to be in memory. Per-centroid counts are
+capped so that centroids keep following the population as it drifts.
+
+New assessments reach the model through the app's score history
+(``nexus_history``): the model records the timestamp it has folded history
+in up to, and a scheduled ``refit-history`` reads only the histories
+appended since. A model fitted over a score store can also fold in rows
+added to that store (``refit``).
+
+Assigning candidates is one distance matrix between their profiles and the
+centroids. A running app picks up a rewritten model file through
+``refresh``, which returns a new model rather than changing the one report
+threads may be reading.
+
+    python nexus_archetypes.py fit store/ archetypes.npz --k 8
+    python nexus_archetypes.py refit-history assessment_history/ archetypes.npz
+    python nexus_archetypes.py refit store/ archetypes.npz
+"""
+import argparse
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+DISTINCT_Z = 0.75  # spreads from the population mean that make a dimension part of an archetype's name
+
+
+class ArchetypeModel:
+    """Mini-batch k-means centroids with names and a store cursor"""
+
+    def __init__(self, centroids: np.ndarray, dimension_keys: Sequence[str], counts: Optional[np.ndarray] = None,
+                 names: Optional[List[str]] = None, cursor: int = 0, version: int = 0,
+                 count_cap: int = 100_000, history_cursor: float = 0):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.dimension_keys = list(dimension_keys)
+        self.counts = np.zeros(len(self.centroids), dtype=np.int64) if counts is None else np.asarray(counts, np.int64)
+        self.names = names or [f"Archetype {i + 1}" for i in range(len(self.centroids))]
+        self.cursor = cursor
+        # Unix time the score history has been folded in up to
+        self.history_cursor = history_cursor
+        self.version = version
+        self.count_cap = count_cap
+        self.path = None
+        self._mtime = None
+
+    @property
+    def k(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def initialize(cls, sample: np.ndarray, k: int, dimension_keys: Sequence[str], seed: int = 0,
+                   **kwargs) -> "ArchetypeModel":
+        """k-means++ seeding on a sample of profiles"""
+        sample = np.asarray(sample, dtype=np.float32)
+        if len(sample) < k:
+            raise ValueError(f"Need at least {k} profiles to seed {k} archetypes, got {len(sample)}")
+        rng = np.random.default_rng(seed)
+        centroids = [sample[rng.integers(len(sample))]]
+        nearest = ((sample - centroids[0]) ** 2).sum(axis=1)
+        for _ in range(1, k):
+            total = nearest.sum()
+            pick = rng.choice(len(sample), p=nearest / total) if total > 0 else rng.integers(len(sample))
+            centroids.append(sample[pick])
+            nearest = np.minimum(nearest, ((sample - sample[pick]) ** 2).sum(axis=1))
+        return cls(np.stack(centroids), dimension_keys, **kwargs)
+
+    def distances(self, profiles: np.ndarray) -> np.ndarray:
+        """Squared Euclidean distances, shape (profiles, k)"""
+        profiles = np.asarray(profiles, dtype=np.float32)
+        d2 = ((profiles ** 2).sum(axis=1)[:, None] - 2 * profiles @ self.centroids.T
+              + (self.centroids ** 2).sum(axis=1)[None, :])
+        return np.maximum(d2, 0)
+
+    def assign(self, profiles: np.ndarray) -> np.ndarray:
+        return self.distances(profiles).argmin(axis=1)
+
+    def partial_fit(self, batch: np.ndarray) -> "ArchetypeModel":
+        """Move each centroid to the running mean of the profiles assigned to it"""
+        batch = np.asarray(batch, dtype=np.float32)
+        if not len(batch):
+            return self
+        labels = self.assign(batch)
+        batch_counts = np.bincount(labels, minlength=self.k)
+        sums = np.zeros_like(self.centroids, dtype=np.float64)
+        np.add.at(sums, labels, batch)
+        prior = np.minimum(self.counts, self.count_cap)
+        hit = batch_counts > 0
+        self.centroids[hit] = ((prior[hit, None] * self.centroids[hit] + sums[hit])
+                               / (prior[hit] + batch_counts[hit])[:, None])
+        self.counts += batch_counts
+        return self
+
+    def fit_chunks(self, chunks: Iterable[np.ndarray], epochs: int = 1) -> "ArchetypeModel":
+        """Stream chunks through :meth:`partial_fit`; ``chunks`` must be re-iterable for several epochs"""
+        for _ in range(epochs):
+            for chunk in chunks:
+                self.partial_fit(chunk)
+        return self
+
+    def label(self, dimension_names: Dict[str, str]):
+        """Name each centroid after the dimensions that set it apart from the others"""
+        weights = np.maximum(self.counts, 1) / np.maximum(self.counts, 1).sum()
+        mean = weights @ self.centroids
+        spread = np.sqrt(weights @ (self.centroids - mean) ** 2)
+        relative = np.divide(self.centroids - mean, spread, out=np.zeros_like(self.centroids),
+                             where=spread > 1e-6)
+        # Dimensions nobody varies on (e.g. ones the bank never measures) say nothing about level
+        varied = spread > 1e-6 if (spread > 1e-6).any() else np.ones(len(spread), dtype=bool)
+        names = []
+        for centroid, rel in zip(self.centroids, relative):
+            strong = [i for i in np.argsort(rel)[::-1][:2] if rel[i] >= DISTINCT_Z]
+            weak = [i for i in np.argsort(rel)[:1] if rel[i] <= -DISTINCT_Z]
+            if strong:
+                name = "Strong " + " & ".join(dimension_names[self.dimension_keys[i]] for i in strong)
+            else:
+                level_score = centroid[varied].mean()
+                level = "High" if level_score >= 70 else "Developing" if level_score < 40 else "Solid"
+                name = f"{level} Generalist" if weak else f"{level} All-Rounder"
+            if weak:
+                name += f", low {dimension_names[self.dimension_keys[weak[0]]]}"
+            names.append(name)
+        # Keep names unique when two centroids lead on the same dimensions
+        seen: Dict[str, int] = {}
+        for i, name in enumerate(names):
+            seen[name] = seen.get(name, 0) + 1
+            if seen[name] > 1:
+                names[i] = f"{name} ({seen[name]})"
+        self.names = names
+
+    def describe(self, scores: Dict[str, float]) -> Dict:
+        """Archetype of one candidate, in the shape attached to the dashboard"""
+        profile = np.array([[scores[d] for d in self.dimension_keys]], dtype=np.float32)
+        d2 = self.distances(profile)[0]
+        best = int(d2.argmin())
+        return {
+            "id": best,
+            "name": self.names[best],
+            "distance": round(float(np.sqrt(d2[best])), 2),
+            "centroid": {d: round(float(v), 1) for d, v in zip(self.dimension_keys, self.centroids[best])},
+            "model_version": self.version,
+        }
+
+    def save(self, path: str):
+        """Atomically write the model to ``path`` (.npz)"""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, centroids=self.centroids, counts=self.counts, names=np.array(self.names),
+                 dimension_keys=np.array(self.dimension_keys),
+                 meta=np.array(json.dumps({"cursor": self.cursor, "version": self.version,
+                                           "count_cap": self.count_cap, "history_cursor": self.history_cursor})))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ArchetypeModel":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            model = cls(data["centroids"], data["dimension_keys"].tolist(), counts=data["counts"],
+                        names=data["names"].tolist(), **meta)
+        model.path = path
+        model._mtime = os.stat(path).st_mtime_ns
+        return model
+
+    def refresh(self) -> "ArchetypeModel":
+        """The model to use from now on: a newly loaded one if the file was rewritten, else this one
+
+        This model is left untouched, so threads still describing with it see
+        a consistent model; callers rebind their reference to the result.
+        """
+        if self.path is None or os.stat(self.path).st_mtime_ns == self._mtime:
+            return self
+        return ArchetypeModel.load(self.path)
+
+
+def _store_chunks(scores: np.ndarray, start: int, chunk_size: int):
+    for offset in range(start, len(scores), chunk_size):
+        yield np.asarray(scores[offset:offset + chunk_size])
+
+
+def fit_store(store, k: int, dimension_names: Dict[str, str], chunk_size: int = 100_000,
+              seed: int = 0) -> ArchetypeModel:
+    """Fit a new model over every row of a :class:`nexus_rescoring.ScoreStore`"""
+    rng = np.random.default_rng(seed)
+    sample_rows = np.sort(rng.choice(len(store), size=min(len(store), 20 * k + 1000), replace=False))
+    model = ArchetypeModel.initialize(np.asarray(store.scores[sample_rows]), k,
+                                      store.engine().dimension_keys, seed=seed)
+    model.fit_chunks(_store_chunks(store.scores, 0, chunk_size))
+    model.cursor = len(store)
+    model.version = 1
+    model.label(dimension_names)
+    return model
+
+
+def refit_store(model: ArchetypeModel, store, dimension_names: Dict[str, str],
+                chunk_size: int = 100_000) -> int:
+    """Fold rows added to the store since the last fit into the model; returns how many"""
+    if store.engine().dimension_keys != model.dimension_keys:
+        raise ValueError("Store dimensions do not match the archetype model; fit a new model")
+    new_rows = len(store) - model.cursor
+    if new_rows <= 0:
+        return 0
+    model.fit_chunks(_store_chunks(store.scores, model.cursor, chunk_size))
+    model.cursor = len(store)
+    model.version += 1
+    model.label(dimension_names)
+    return new_rows
+
+
+def refit_history(model: ArchetypeModel, history, dimension_names: Dict[str, str],
+                  settle_seconds: float = 300.0, chunk_size: int = 100_000) -> int:
+    """Fold assessments recorded in a :class:`nexus_history.HistoryStore` since the last refit
+
+    Stops ``settle_seconds`` short of now, so reports still being written for
+    recent completions are picked up by the next refit. Returns how many
+    assessments were folded in.
+    """
+    if history.dimension_keys != model.dimension_keys:
+        raise ValueError("History dimensions do not match the archetype model; fit a new model")
+    until = time.time() - settle_seconds
+    if until <= model.history_cursor:
+        return 0
+    added = 0
+    for chunk in history.scan(since=model.history_cursor, until=until, chunk_size=chunk_size):
+        model.partial_fit(chunk)
+        added += len(chunk)
+    model.history_cursor = until
+    if added:
+        model.version += 1
+        model.label(dimension_names)
+    return added
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Fit profile archetypes over a score store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fit = sub.add_parser("fit", help="fit a new model over the whole store")
+    fit.add_argument("store")
+    fit.add_argument("model")
+    fit.add_argument("--k", type=int, default=8)
+    fit.add_argument("--seed", type=int, default=0)
+
+    refit = sub.add_parser("refit", help="fold in store rows added since the last fit")
+    refit.add_argument("store")
+    refit.add_argument("model")
+
+    refit_hist = sub.add_parser("refit-history", help="fold in assessments the app recorded since the last refit "
+                                                      "(run on a schedule)")
+    refit_hist.add_argument("history", help="the app's score history directory (NEXUS_HISTORY_DIR)")
+    refit_hist.add_argument("model")
+    refit_hist.add_argument("--settle-seconds", type=float, default=300.0)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "refit-history":
+        from nexus_history import HistoryStore
+        from nexus_engine import NexusInsightAssessment
+
+        model = ArchetypeModel.load(args.model)
+        added = refit_history(model, HistoryStore(args.history, model.dimension_keys),
+                              NexusInsightAssessment().dimensions, settle_seconds=args.settle_seconds)
+        # Saved even with nothing added, so the cursor moves on
+        model.save(args.model)
+        print(f"Folded {added} recorded assessments into archetype model version {model.version}")
+        return
+
+    from nexus_rescoring import ScoreStore
+
+    store = ScoreStore(args.store, mode="r")
+    dimension_names = store.engine().dimensions
+    if args.command == "fit":
+        model = fit_store(store, args.k, dimension_names, seed=args.seed)
+        model.save(args.model)
+        print(f"Fitted {model.k} archetypes over {len(store)} profiles")
+    else:
+        model = ArchetypeModel.load(args.model)
+        added = refit_store(model, store, dimension_names)
+        if added:
+            model.save(args.model)
+        print(f"Folded {added} new profiles into archetype model version {model.version}")
+    for name, count, centroid in zip(model.names, model.counts, model.centroids):
+        print(f"  {name:<50} {count:>9}  " + " ".join(f"{v:5.1f}" for v in centroid))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+# nexus_archive.py
+"""Bit-packed archive of completed assessments.
+
+A completed assessment is one option index per question plus answer times.
+The archive stores the index in ``ceil(log2(options))`` bits per question
+(2 bits for a 4-option question) and the times as zlib-compressed deltas,
+in chunks that can be read independently:
+
+    header   "NXA1", uint16 length, JSON {bank, question_ids, widths, chunk_rows}
+    chunks   answers   rows x row_bits, bit-packed, MSB first
+             answered  rows x questions bitmask, omitted when every answer is present
+             times     zlib(int64 row start deltas, int32 per-question deltas), in ms
+    index    per chunk: offset, rows, section lengths
+    footer   uint64 index offset, uint32 chunks, "NXAE"
+
+The header carries the bank fingerprint, so an archive is never decoded
+against a bank whose weights it was not written for. Decoding unpacks a chunk
+straight into the (rows, questions) int8 choice matrix the scorer consumes,
+with -1 for unanswered questions. Times keep millisecond precision.
+
+    python nexus_archive.py bench --n 200000
+    python nexus_archive.py info archive.nxa
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from nexus_engine import NexusInsightAssessment
+from nexus_item_analysis import bank_fingerprint
+
+MAGIC = b"NXA1"
+END_MAGIC = b"NXAE"
+FOOTER = struct.Struct("<QI4s")
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("rows", "<u4"), ("answers", "<u4"),
+                        ("answered", "<u4"), ("times", "<u4")])
+MISSING_TIME = -1
+
+
+def option_widths(engine: NexusInsightAssessment) -> np.ndarray:
+    """Bits needed for each question's option index"""
+    counts = np.array([len(q["options"]) for q in engine.questions])
+    return np.maximum(1, np.ceil(np.log2(counts))).astype(np.int64)
+
+
+def bit_layout(widths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Question and shift of every bit in a packed row, most significant bit first"""
+    question = np.repeat(np.arange(len(widths)), widths)
+    starts = np.cumsum(widths) - widths
+    shift = widths[question] - 1 - (np.arange(len(question)) - starts[question])
+    return question, shift
+
+
+def responses_to_times(engine: NexusInsightAssessment, responses_list: List[Dict]) -> np.ndarray:
+    """(n, questions) answer times in Unix milliseconds from stored ISO timestamps, -1 where missing"""
+    times = np.full((len(responses_list), len(engine.questions)), MISSING_TIME, dtype=np.int64)
+    for row, responses in enumerate(responses_list):
+        for q_id, response in responses.items():
+            qi = engine.question_index.get(int(q_id))
+            if qi is not None and "timestamp" in response:
+                times[row, qi] = round(datetime.fromisoformat(response["timestamp"]).timestamp() * 1000)
+    return times
+
+
+class ArchiveWriter:
+    """Appends completed assessments to a new archive, one chunk per ``chunk_rows``"""
+
+    def __init__(self, path: str, engine: NexusInsightAssessment, chunk_rows: int = 65_536):
+        self.path = path
+        self.engine = engine
+        self.chunk_rows = chunk_rows
+        self.widths = option_widths(engine)
+        self.bit_question, self.bit_shift = bit_layout(self.widths)
+        self._choices: List[np.ndarray] = []
+        self._times: List[np.ndarray] = []
+        self._has_times: Optional[bool] = None
+        self._buffered = 0
+        self._index: List[Tuple] = []
+        header = json.dumps({
+            "bank": bank_fingerprint(engine),
+            "question_ids": [q["id"] for q in engine.questions],
+            "widths": self.widths.tolist(),
+            "chunk_rows": chunk_rows,
+        }).encode()
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + struct.pack("<H", len(header)) + header)
+
+    def append(self, responses: Dict):
+        """Add one assessment in the session's responses dict shape"""
+        self.append_matrix(self.engine.responses_to_matrix([responses]),
+                           responses_to_times(self.engine, [responses]))
+
+    def append_matrix(self, choices: np.ndarray, times_ms: Optional[np.ndarray] = None):
+        """Add (rows, questions) choices with -1 for unanswered and optional times in Unix ms"""
+        choices = np.asarray(choices)
+        if choices.shape[1] != len(self.widths):
+            raise ValueError(f"Expected {len(self.widths)} questions, got {choices.shape[1]}")
+        if self._has_times is None:
+            self._has_times = times_ms is not None
+        elif self._has_times != (times_ms is not None):
+            raise ValueError("Either every batch in an archive has times or none does")
+        self._choices.append(choices)
+        if times_ms is not None:
+            self._times.append(np.asarray(times_ms, dtype=np.int64))
+        self._buffered += len(choices)
+        while self._buffered >= self.chunk_rows:
+            self._flush_chunk(self.chunk_rows)
+
+    def _take(self, parts: List, n: int) -> np.ndarray:
+        block = np.concatenate(parts)
+        parts[:] = [block[n:]] if len(block) > n else []
+        return block[:n]
+
+    def _flush_chunk(self, n: int):
+        choices = self._take(self._choices, n)
+        times = self._take(self._times, n) if self._has_times else None
+        self._buffered -= n
+
+        answered = choices >= 0
+        bits = (np.where(answered, choices, 0)[:, self.bit_question] >> self.bit_shift) & 1
+        answers = np.packbits(bits.astype(np.uint8)).tobytes()
+        answered_mask = b"" if answered.all() else np.packbits(answered).tobytes()
+        times_blob = b"" if times is None else self._encode_times(times, answered & (times != MISSING_TIME))
+
+        offset = self._file.tell()
+        self._file.write(answers + answered_mask + times_blob)
+        self._index.append((offset, n, len(answers), len(answered_mask), len(times_blob)))
+
+    @staticmethod
+    def _encode_times(times: np.ndarray, present: np.ndarray) -> bytes:
+        # Row start is the first answer; per-question offsets from it are delta-encoded in question
+        # order, with missing answers repeating the previous offset so their delta is zero
+        start = np.where(present, times, np.iinfo(np.int64).max).min(axis=1)
+        start = np.where(present.any(axis=1), start, 0)
+        offsets = np.where(present, times - start[:, None], 0)
+        last_present = np.maximum.accumulate(np.where(present, np.arange(times.shape[1]), 0), axis=1)
+        offsets = np.take_along_axis(offsets, last_present, axis=1)
+        deltas = np.diff(offsets, axis=1, prepend=0)
+        return zlib.compress(np.diff(start, prepend=0).astype("<i8").tobytes() + deltas.astype("<i4").tobytes(), 6)
+
+    def close(self):
+        if self._buffered:
+            self._flush_chunk(self._buffered)
+        index = np.array(self._index, dtype=INDEX_DTYPE)
+        index_offset = self._file.tell()
+        self._file.write(index.tobytes() + FOOTER.pack(index_offset, len(index), END_MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArchiveReader:
+    """Random access to an archive's chunks through a memory map"""
+
+    def __init__(self, path: str, engine: Optional[NexusInsightAssessment] = None):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:4] != MAGIC:
+            raise ValueError(f"{path} is not a Nexus archive")
+        (header_len,) = struct.unpack_from("<H", self._mm, 4)
+        self.header = json.loads(self._mm[6:6 + header_len])
+        if engine is not None and self.header["bank"] != bank_fingerprint(engine):
+            raise ValueError(f"{path} was written for a different question bank version")
+        index_offset, n_chunks, end = FOOTER.unpack_from(self._mm, len(self._mm) - FOOTER.size)
+        if end != END_MAGIC:
+            raise ValueError(f"{path} is incomplete (missing footer)")
+        self.index = np.frombuffer(self._mm, dtype=INDEX_DTYPE, count=n_chunks, offset=index_offset)
+        self.widths = np.array(self.header["widths"], dtype=np.int64)
+        self.question_ids = self.header["question_ids"]
+        question, shift = bit_layout(self.widths)
+        # Place value of every packed bit in its question's field, so decoding is one matrix product
+        self._place = np.zeros((len(question), len(self.widths)), dtype=np.float32)
+        self._place[np.arange(len(question)), question] = 2.0 ** shift
+        self.row_starts = np.concatenate([[0], np.cumsum(self.index["rows"], dtype=np.int64)])
+
+    def __len__(self) -> int:
+        return int(self.row_starts[-1])
+
+    @property
+    def n_chunks(self) -> int:
+        return len(self.index)
+
+    def read_chunk(self, i: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """``(choices, times_ms)`` of chunk ``i``; times are None when the archive has none"""
+        entry = self.index[i]
+        rows, n_q = int(entry["rows"]), len(self.widths)
+        offset = int(entry["offset"])
+        packed = np.frombuffer(self._mm, dtype=np.uint8, count=int(entry["answers"]), offset=offset)
+        bits = np.unpackbits(packed, count=rows * len(self._place)).reshape(rows, len(self._place))
+        choices = (bits @ self._place).astype(np.int8)
+
+        offset += int(entry["answers"])
+        answered = None
+        if entry["answered"]:
+            mask = np.frombuffer(self._mm, dtype=np.uint8, count=int(entry["answered"]), offset=offset)
+            answered = np.unpackbits(mask, count=rows * n_q).reshape(rows, n_q).astype(bool)
+            choices[~answered] = -1
+
+        offset += int(entry["answered"])
+        times = None
+        if entry["times"]:
+            raw = zlib.decompress(self._mm[offset:offset + int(entry["times"])])
+            start = np.cumsum(np.frombuffer(raw, dtype="<i8", count=rows))
+            deltas = np.frombuffer(raw, dtype="<i4", offset=rows * 8).reshape(rows, n_q)
+            times = start[:, None] + np.cumsum(deltas, axis=1, dtype=np.int64)
+            if answered is not None:
+                times[~answered] = MISSING_TIME
+        return choices, times
+
+    def choices(self) -> np.ndarray:
+        """The whole archive as one (rows, questions) choice matrix"""
+        out = np.empty((len(self), len(self.widths)), dtype=np.int8)
+        for i in range(self.n_chunks):
+            out[self.row_starts[i]:self.row_starts[i + 1]] = self.read_chunk(i)[0]
+        return out
+
+    def row(self, i: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """One assessment by position, decoding only its chunk"""
+        chunk = int(np.searchsorted(self.row_starts, i, side="right")) - 1
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        choices, times = self.read_chunk(chunk)
+        local = i - self.row_starts[chunk]
+        return choices[local], None if times is None else times[local]
+
+    def responses(self, i: int) -> Dict:
+        """One assessment back in the session's responses dict shape"""
+        choices, times = self.row(i)
+        return {
+            str(q_id): {
+                "selected_option": int(choices[qi]),
+                **({"timestamp": datetime.fromtimestamp(times[qi] / 1000).isoformat()}
+                   if times is not None else {}),
+            }
+            for qi, q_id in enumerate(self.question_ids) if choices[qi] >= 0
+        }
+
+    def close(self):
+        self.index = None
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark(n: int, path: str, seed: int = 0) -> Dict:
+    """Archive vs JSON lines of the session's responses dicts: bytes and full decode time"""
+    from nexus_cohort import CohortGenerator
+
+    engine = NexusInsightAssessment()
+    chunk = CohortGenerator(engine, seed=seed).generate(n)
+    started = 1_700_000_000_000 + np.arange(n, dtype=np.int64) * 60_000
+    times = started[:, None] + np.cumsum(np.rint(chunk["response_times"] * 1000), axis=1).astype(np.int64)
+    ids = [str(q["id"]) for q in engine.questions]
+    lines = [
+        json.dumps({
+            q_id: {"selected_option": int(c), "timestamp": datetime.fromtimestamp(t / 1000).isoformat()}
+            for q_id, c, t in zip(ids, row_choices, row_times)
+        })
+        for row_choices, row_times in zip(chunk["choices"].tolist(), times.tolist())
+    ]
+    json_bytes = sum(len(line) + 1 for line in lines)
+
+    with ArchiveWriter(path, engine) as writer:
+        writer.append_matrix(chunk["choices"], times)
+    archive_bytes = os.path.getsize(path)
+
+    t0 = time.perf_counter()
+    decoded = [json.loads(line) for line in lines]
+    json_choices = engine.responses_to_matrix(decoded)
+    json_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ArchiveReader(path, engine) as reader:
+        archive_choices = np.concatenate([reader.read_chunk(i)[0] for i in range(reader.n_chunks)])
+    archive_seconds = time.perf_counter() - t0
+    if not np.array_equal(json_choices, archive_choices):
+        raise AssertionError("Archive and JSON decode to different choices")
+
+    return {"n": n, "json_bytes": json_bytes, "archive_bytes": archive_bytes,
+            "json_decode_s": json_seconds, "archive_decode_s": archive_seconds}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Bit-packed assessment archives")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="compare size and decode speed against JSON")
+    bench.add_argument("--n", type=int, default=200_000)
+    bench.add_argument("--path", default="bench.nxa")
+    info = sub.add_parser("info", help="describe an archive")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        result = benchmark(args.n, args.path)
+        n = result["n"]
+        print(f"{n} assessments")
+        print(f"  JSON     {result['json_bytes'] / 1e6:9.2f} MB  {result['json_bytes'] / n:7.1f} B/row"
+              f"  decode {result['json_decode_s']:.3f}s")
+        print(f"  archive  {result['archive_bytes'] / 1e6:9.2f} MB  {result['archive_bytes'] / n:7.1f} B/row"
+              f"  decode {result['archive_decode_s']:.3f}s")
+        print(f"  {result['json_bytes'] / result['archive_bytes']:.0f}x smaller, "
+              f"{result['json_decode_s'] / result['archive_decode_s']:.0f}x faster to decode")
+    else:
+        with ArchiveReader(args.path) as reader:
+            print(f"{len(reader)} assessments in {reader.n_chunks} chunks, bank {reader.header['bank']}")
+            print(f"  {int(reader.widths.sum())} answer bits per assessment, "
+                  f"{os.path.getsize(args.path) / max(len(reader), 1):.1f} bytes per assessment on disk")
+
+
+if __name__ == "__main__":
+    main()
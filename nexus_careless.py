@@ -0,0 +1,212 @@
+# nexus_careless.py
+"""Careless-responder detection from answer choices and timestamps.
+
+Three checks, available both vectorized over batches of stored responses and
+online with constant state per session:
+
+- speeder: most answers given faster than anyone can read the scenario
+- straight-liner: the same option index on every question
+- random clicker: chosen options that pull the profile in no consistent
+  direction. Each choice is taken as its weight vector minus the mean option
+  of its question; for a consistent respondent these vectors line up and their
+  sum is long, for random choices the length of the sum only grows like a
+  random walk. Coherence is that length divided by the random-walk length.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from nexus_engine import NexusInsightAssessment
+
+CARELESS_THRESHOLDS = {
+    "fast_seconds": 4.0,         # an answer faster than this counts as a fast answer
+    "speeder_fraction": 0.5,     # share of fast answers that makes a speeder
+    "min_answers": 5,            # answers needed before any flag is raised
+    "min_coherence": 1.0,        # coherence below this looks random (uniform choices score ~1)
+}
+
+FLAG_NAMES = ("speeder", "straight_liner", "random_clicker")
+
+
+def centered_weights(engine: NexusInsightAssessment) -> np.ndarray:
+    """Option weight vectors minus their question's mean option, shape (questions, options, dims)"""
+    mask = engine.option_mask[:, :, None]
+    weights = engine.weight_tensor
+    mean = np.where(mask, weights, 0).sum(axis=1, keepdims=True) / mask.sum(axis=1, keepdims=True)
+    return np.where(mask, weights - mean, 0).astype(np.float32)
+
+
+def responses_to_dwell(engine: NexusInsightAssessment, responses_list: List[Dict],
+                       started_at: Optional[Sequence[Optional[str]]] = None) -> np.ndarray:
+    """Seconds spent on each question from the stored ISO answer timestamps
+
+    Dwell on a question is the time since the previous answer; the first answer
+    is measured from ``started_at`` when known and is NaN otherwise.
+    """
+    dwell = np.full((len(responses_list), len(engine.questions)), np.nan, dtype=np.float32)
+    for row, responses in enumerate(responses_list):
+        stamped = sorted(
+            (datetime.fromisoformat(r["timestamp"]).timestamp(), engine.question_index[int(q_id)])
+            for q_id, r in responses.items()
+            if "timestamp" in r and int(q_id) in engine.question_index
+        )
+        if not stamped:
+            continue
+        times = np.array([t for t, _ in stamped])
+        columns = np.array([qi for _, qi in stamped])
+        start = started_at[row] if started_at is not None else None
+        previous = np.concatenate([[datetime.fromisoformat(start).timestamp() if start else np.nan], times[:-1]])
+        dwell[row, columns] = times - previous
+    return dwell
+
+
+def detect_careless(choices: np.ndarray, dwell: np.ndarray, centered: np.ndarray,
+                    thresholds: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+    """Vectorized careless-responder flags for a batch
+
+    ``choices`` is (n, questions) with -1 for unanswered, ``dwell`` holds
+    seconds per answer (NaN when unknown) and ``centered`` comes from
+    :func:`centered_weights`.
+    """
+    t = {**CARELESS_THRESHOLDS, **(thresholds or {})}
+    n_options = centered.shape[1]
+    answered = choices >= 0
+    n_answered = answered.sum(axis=1)
+    enough = n_answered >= t["min_answers"]
+
+    timed = answered & ~np.isnan(dwell)
+    n_timed = timed.sum(axis=1)
+    fast = (timed & (np.nan_to_num(dwell, nan=np.inf) < t["fast_seconds"])).sum(axis=1)
+    fast_fraction = np.divide(fast, n_timed, out=np.zeros(len(choices)), where=n_timed > 0)
+    median_dwell = np.full(len(choices), np.nan)
+    has_timed = n_timed > 0
+    if has_timed.any():
+        median_dwell[has_timed] = np.nanmedian(np.where(timed, dwell, np.nan)[has_timed], axis=1)
+
+    option_counts = np.stack([(choices == o).sum(axis=1) for o in range(n_options)], axis=1)
+    straight = enough & (option_counts.max(axis=1) == n_answered)
+
+    picked = centered[np.arange(choices.shape[1]), np.maximum(choices, 0)] * answered[:, :, None]
+    resultant = np.sqrt((picked.sum(axis=1) ** 2).sum(axis=1))
+    walk = np.sqrt((picked ** 2).sum(axis=(1, 2)))
+    coherence = np.divide(resultant, walk, out=np.zeros(len(choices)), where=walk > 0)
+    random_clicker = enough & (coherence < t["min_coherence"])
+
+    speeder = enough & (fast_fraction >= t["speeder_fraction"])
+    return {
+        "speeder": speeder,
+        "straight_liner": straight,
+        "random_clicker": random_clicker,
+        "flagged": speeder | straight | random_clicker,
+        "fast_fraction": fast_fraction,
+        "median_dwell": median_dwell,
+        "coherence": coherence,
+    }
+
+
+def detect_careless_frame(frame, engine: NexusInsightAssessment, thresholds: Optional[Dict] = None):
+    """Add flag columns to a cohort DataFrame with ``q{id}`` choices and ``t{id}`` dwell seconds"""
+    q_cols = [f"q{q['id']}" for q in engine.questions]
+    t_cols = [f"t{q['id']}" for q in engine.questions]
+    choices = frame[q_cols].to_numpy(dtype=np.int8)
+    dwell = frame[t_cols].to_numpy(dtype=np.float32) if set(t_cols) <= set(frame.columns) \
+        else np.full(choices.shape, np.nan, dtype=np.float32)
+    result = detect_careless(choices, dwell, centered_weights(engine), thresholds)
+    frame = frame.copy()
+    for name in FLAG_NAMES + ("flagged",):
+        frame[name] = result[name]
+    return frame
+
+
+def filter_cohort(frame, exclude: Sequence[str] = FLAG_NAMES):
+    """Drop rows carrying any of the ``exclude`` flags from a flagged cohort frame"""
+    keep = np.ones(len(frame), dtype=bool)
+    for name in exclude:
+        keep &= ~frame[name].to_numpy(dtype=bool)
+    return frame[keep]
+
+
+class CarelessMonitor:
+    """Online careless-responder checks with O(1) state per session"""
+
+    def __init__(self, centered: np.ndarray, started_at: Optional[str] = None,
+                 thresholds: Optional[Dict] = None):
+        self.centered = centered
+        self.thresholds = {**CARELESS_THRESHOLDS, **(thresholds or {})}
+        self.last_timestamp = datetime.fromisoformat(started_at).timestamp() if started_at else None
+        self.n_answers = 0
+        self.n_timed = 0
+        self.n_fast = 0
+        self.option_counts = np.zeros(centered.shape[1], dtype=np.int64)
+        self.resultant = np.zeros(centered.shape[2])
+        self.walk_sq = 0.0
+
+    def update(self, question_index: int, option_index: int, timestamp: str,
+               previous_option: Optional[int] = None):
+        """Record one answer as it is submitted
+
+        ``previous_option`` is the question's earlier answer when it is answered
+        again after going back: that answer's contribution is replaced, and the
+        time spent clicking back through is not counted as a dwell.
+        """
+        t = datetime.fromisoformat(timestamp).timestamp()
+        if previous_option is None:
+            if self.last_timestamp is not None:
+                self.n_timed += 1
+                self.n_fast += (t - self.last_timestamp) < self.thresholds["fast_seconds"]
+            self.n_answers += 1
+        else:
+            previous = self.centered[question_index, previous_option]
+            self.resultant -= previous
+            self.walk_sq = max(self.walk_sq - float(previous @ previous), 0.0)
+            self.option_counts[previous_option] -= 1
+        self.last_timestamp = t
+
+        self.option_counts[option_index] += 1
+        vector = self.centered[question_index, option_index]
+        self.resultant += vector
+        self.walk_sq += float(vector @ vector)
+
+    def to_state(self) -> Dict:
+        """Running counters as plain values, for storing the session outside this process"""
+        return {
+            "thresholds": self.thresholds,
+            "last_timestamp": self.last_timestamp,
+            "n_answers": self.n_answers,
+            "n_timed": self.n_timed,
+            "n_fast": self.n_fast,
+            "option_counts": self.option_counts.tolist(),
+            "resultant": self.resultant.tolist(),
+            "walk_sq": self.walk_sq,
+        }
+
+    @classmethod
+    def from_state(cls, centered: np.ndarray, state: Dict) -> "CarelessMonitor":
+        monitor = cls(centered, thresholds=state["thresholds"])
+        for name in ("last_timestamp", "n_answers", "n_timed", "n_fast", "walk_sq"):
+            setattr(monitor, name, state[name])
+        monitor.resultant = np.array(state["resultant"], dtype=float)
+        monitor.option_counts[:] = state["option_counts"]
+        return monitor
+
+    def flags(self) -> Dict:
+        """Current flags, in the same shape as attached to the dashboard"""
+        t = self.thresholds
+        n = self.n_answers
+        enough = n >= t["min_answers"]
+        fast_fraction = self.n_fast / self.n_timed if self.n_timed else 0.0
+        walk = np.sqrt(self.walk_sq)
+        coherence = float(np.sqrt(self.resultant @ self.resultant) / walk) if walk > 0 else 0.0
+
+        flags = {
+            "speeder": bool(enough and fast_fraction >= t["speeder_fraction"]),
+            "straight_liner": bool(enough and self.option_counts.max() == n),
+            "random_clicker": bool(enough and coherence < t["min_coherence"]),
+        }
+        return {
+            **flags,
+            "flagged": any(flags.values()),
+            "fast_fraction": round(fast_fraction, 3),
+            "coherence": round(coherence, 3),
+        }
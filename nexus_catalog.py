@@ -0,0 +1,345 @@
+# nexus_catalog.py
+"""Development-action catalog for coaching recommendations.
+
+The catalog is a file of learning actions (courses, programs, exercises),
+one per JSON line or CSV row:
+
+    id, title, dimensions ("LD;CT"), level ("Low;Medium", empty for any),
+    duration_minutes, and optionally rating and tags ("online;workshop")
+
+Actions are ranked once at load (highest rating, then shortest, then file
+order) and every tag gets a posting list of rank positions, so postings are
+sorted by relevance and a filtered search is an intersection of sorted
+arrays. The lists for each (dimension, level) pair are intersected up front.
+
+A candidate's recommendations interleave the ranked lists of their weakest
+dimensions at the candidate's level in each, weakest first, which is a few
+list lookups per candidate. Cohorts are grouped by that (dimensions, levels)
+signature, so each distinct signature is resolved once.
+
+The engine reloads the file when it changes on disk (see ``refresh``).
+
+    python nexus_catalog.py query catalog.jsonl --scores '{"LD": 30, "CT": 55, "Psy": 80}'
+    python nexus_catalog.py bench --n 100000
+"""
+import argparse
+import bisect
+import csv
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_LEVELS = {"Low": (0, 40), "Medium": (40, 70), "High": (70, 100)}
+
+
+def _split(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [part.strip() for part in str(value).split(";") if part.strip()]
+
+
+def read_actions(path: str) -> List[Dict]:
+    """Rows of a .jsonl or .csv catalog file"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            return list(csv.DictReader(f))
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class CatalogIndex:
+    """Immutable ranked columns, posting lists and (dimension, level) lists of one catalog version"""
+
+    def __init__(self, actions: List[Dict], dimension_keys: Sequence[str], levels: Sequence[str]):
+        errors = []
+        rows = []
+        for n, action in enumerate(actions):
+            dims = _split(action.get("dimensions"))
+            action_levels = _split(action.get("level")) or list(levels)
+            unknown = [d for d in dims if d not in dimension_keys] + [l for l in action_levels if l not in levels]
+            try:
+                duration = float(action.get("duration_minutes") or 0)
+                rating = float(action.get("rating") or 0)
+            except ValueError:
+                errors.append(f"action #{n + 1}: duration_minutes and rating must be numbers")
+                continue
+            if not action.get("title") or not dims or unknown:
+                errors.append(f"action #{n + 1}: needs a title and known dimensions and levels"
+                              + (f" (unknown: {', '.join(unknown)})" if unknown else ""))
+                continue
+            rows.append((-rating, duration, n, action, dims, action_levels))
+        if errors:
+            raise ValueError("Invalid action catalog:\n  " + "\n  ".join(errors[:20])
+                             + (f"\n  ... and {len(errors) - 20} more" if len(errors) > 20 else ""))
+        rows.sort(key=lambda row: row[:3])
+
+        self.dimension_keys = list(dimension_keys)
+        self.levels = list(levels)
+        self.ids = [str(row[3].get("id", row[2])) for row in rows]
+        self.titles = [str(row[3]["title"]) for row in rows]
+        self.durations = np.array([row[1] for row in rows])
+        self.ratings = np.array([-row[0] for row in rows])
+        self.dimensions = [row[4] for row in rows]
+        self.action_levels = [row[5] for row in rows]
+        self.tags = [_split(row[3].get("tags")) for row in rows]
+        postings: Dict[str, List[int]] = {}
+        for position, (dims, action_levels, tags) in enumerate(zip(self.dimensions, self.action_levels, self.tags)):
+            for d in dims:
+                postings.setdefault(f"dim:{d}", []).append(position)
+            for l in action_levels:
+                postings.setdefault(f"level:{l}", []).append(position)
+            for t in tags:
+                postings.setdefault(f"tag:{t}", []).append(position)
+        # Positions were appended in rank order, so every posting list is sorted by relevance
+        self.postings = {key: np.array(p, dtype=np.int32) for key, p in postings.items()}
+        empty = np.empty(0, dtype=np.int32)
+        self.ranked = {
+            (d, l): np.intersect1d(self.postings.get(f"dim:{d}", empty), self.postings.get(f"level:{l}", empty),
+                                   assume_unique=True)
+            for d in self.dimension_keys for l in self.levels
+        }
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def action(self, position: int) -> Dict:
+        return {
+            "id": self.ids[position],
+            "title": self.titles[position],
+            "dimensions": self.dimensions[position],
+            "levels": self.action_levels[position],
+            "duration_minutes": float(self.durations[position]),
+            "rating": float(self.ratings[position]),
+            "tags": self.tags[position],
+        }
+
+
+class ActionCatalog:
+    """Ranked, indexed development actions with hot reload from their file"""
+
+    def __init__(self, actions: List[Dict], dimension_keys: Sequence[str],
+                 thresholds: Optional[Dict[str, Tuple[float, float]]] = None):
+        thresholds = thresholds or DEFAULT_LEVELS
+        self.level_names = [name for name, _ in sorted(thresholds.items(), key=lambda item: item[1][0])]
+        # Lower bounds after the first; a score's level is how many it reaches
+        self.level_edges = [thresholds[name][0] for name in self.level_names[1:]]
+        self.dimension_keys = list(dimension_keys)
+        self._index = CatalogIndex(actions, self.dimension_keys, self.level_names)
+        self.path = None
+        self._mtime = None
+        self._reload_lock = threading.Lock()
+        self.version = 1
+        self.last_error = None
+
+    @classmethod
+    def load(cls, path: str, dimension_keys: Sequence[str],
+             thresholds: Optional[Dict[str, Tuple[float, float]]] = None) -> "ActionCatalog":
+        mtime = os.stat(path).st_mtime_ns
+        catalog = cls(read_actions(path), dimension_keys, thresholds)
+        catalog.path = path
+        catalog._mtime = mtime
+        return catalog
+
+    def __getstate__(self) -> Dict:
+        # Process-pool report workers pickle the engine, catalog included
+        state = dict(self.__dict__)
+        del state["_reload_lock"]
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self._reload_lock = threading.Lock()
+
+    def refresh(self) -> "ActionCatalog":
+        """Reload the file this catalog was loaded from if it changed; a missing or bad file keeps the current index"""
+        if self.path is None:
+            return self
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as exc:
+            # Deleted, or briefly absent while a deploy moves it into place
+            self.last_error = str(exc)
+            return self
+        if mtime == self._mtime:
+            return self
+        with self._reload_lock:
+            if mtime != self._mtime:
+                try:
+                    # One assignment swaps the whole index, so readers never see a mix of versions
+                    self._index = CatalogIndex(read_actions(self.path), self.dimension_keys, self.level_names)
+                    self.version += 1
+                    self.last_error = None
+                except (OSError, ValueError) as exc:
+                    self.last_error = str(exc)
+                self._mtime = mtime
+        return self
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def level_of(self, score: float) -> str:
+        return self.level_names[bisect.bisect_right(self.level_edges, score)]
+
+    def search(self, dimension: Optional[str] = None, level: Optional[str] = None, tags: Sequence[str] = (),
+               max_minutes: Optional[float] = None, k: int = 10) -> List[Dict]:
+        """Best ``k`` actions matching every given filter"""
+        index = self._index
+        if dimension is not None and level is not None:
+            lists = [index.ranked.get((dimension, level), np.empty(0, dtype=np.int32))]
+        else:
+            lists = [index.postings.get(key, np.empty(0, dtype=np.int32)) for key in
+                     ([f"dim:{dimension}"] if dimension else []) + ([f"level:{level}"] if level else [])]
+        lists += [index.postings.get(f"tag:{t}", np.empty(0, dtype=np.int32)) for t in tags]
+        if lists:
+            lists.sort(key=len)
+            hits = lists[0]
+            for other in lists[1:]:
+                hits = hits[np.isin(hits, other, assume_unique=True)]
+        else:
+            hits = np.arange(len(index), dtype=np.int32)
+        if max_minutes is not None:
+            hits = hits[index.durations[hits] <= max_minutes]
+        return [index.action(p) for p in hits[:k]]
+
+    def titles(self, dimension: str, score: float, k: int = 3) -> List[str]:
+        """Titles of the best ``k`` actions for a dimension at the level of ``score``"""
+        index = self._index
+        return [index.titles[p] for p in index.ranked[(dimension, self.level_of(score))][:k]]
+
+    @staticmethod
+    def _interleave(index: CatalogIndex, lists: Sequence[np.ndarray], k: int,
+                    max_minutes: Optional[float]) -> List[int]:
+        chosen: List[int] = []
+        seen = set()
+        cursors = [0] * len(lists)
+        while len(chosen) < k:
+            progressed = False
+            for j, ranked in enumerate(lists):
+                while cursors[j] < len(ranked):
+                    position = int(ranked[cursors[j]])
+                    cursors[j] += 1
+                    if position in seen or (max_minutes is not None and index.durations[position] > max_minutes):
+                        continue
+                    seen.add(position)
+                    chosen.append(position)
+                    progressed = True
+                    break
+                if len(chosen) == k:
+                    break
+            if not progressed:
+                break
+        return chosen
+
+    def recommend(self, scores: Dict[str, float], k: int = 5, dimensions: Optional[Sequence[str]] = None,
+                  areas: int = 3, max_minutes: Optional[float] = None) -> List[Dict]:
+        """Top ``k`` actions for one candidate
+
+        ``dimensions`` are the development areas, weakest first; by default
+        the ``areas`` lowest-scoring dimensions.
+        """
+        if dimensions is None:
+            dimensions = sorted((d for d in self.dimension_keys if d in scores), key=lambda d: scores[d])[:areas]
+        index = self._index
+        lists = [index.ranked[(d, self.level_of(scores[d]))] for d in dimensions]
+        return [{**index.action(p), "for_dimension": next(d for d in dimensions if d in index.dimensions[p])}
+                for p in self._interleave(index, lists, k, max_minutes)]
+
+    def recommend_batch(self, scores: np.ndarray, k: int = 5, measured: Optional[Sequence[int]] = None,
+                        areas: int = 3, max_minutes: Optional[float] = None) -> np.ndarray:
+        """(n, k) catalog positions for an (n, dimensions) score matrix, -1 past the end
+
+        Development areas are the ``areas`` lowest of the ``measured``
+        dimension columns (all by default). Look positions up with ``actions``.
+        """
+        index = self._index
+        measured = np.arange(len(self.dimension_keys)) if measured is None else np.asarray(measured)
+        scores = np.asarray(scores, dtype=np.float32)
+        weakest = measured[np.argsort(scores[:, measured], axis=1, kind="stable")[:, :areas]]
+        levels = np.searchsorted(self.level_edges, np.take_along_axis(scores, weakest, axis=1), side="right")
+        # Candidates with the same areas at the same levels get the same list
+        signature = np.zeros(len(scores), dtype=np.int64)
+        for j in range(weakest.shape[1]):
+            signature = signature * (len(self.dimension_keys) * len(self.level_names)) \
+                + weakest[:, j] * len(self.level_names) + levels[:, j]
+        unique, first, inverse = np.unique(signature, return_index=True, return_inverse=True)
+        table = np.full((len(unique), k), -1, dtype=np.int32)
+        for u, row in enumerate(first):
+            lists = [index.ranked[(self.dimension_keys[d], self.level_names[l])]
+                     for d, l in zip(weakest[row], levels[row])]
+            chosen = self._interleave(index, lists, k, max_minutes)
+            table[u, :len(chosen)] = chosen
+        return table[inverse]
+
+    def actions(self, positions: Sequence[int]) -> List[Dict]:
+        index = self._index
+        return [index.action(int(p)) for p in positions if p >= 0]
+
+
+def synthetic_actions(n: int, dimension_keys: Sequence[str], seed: int = 0) -> List[Dict]:
+    """Random catalog rows for benchmarks"""
+    rng = np.random.default_rng(seed)
+    levels = list(DEFAULT_LEVELS)
+    formats = ["online", "workshop", "mentoring", "reading", "project"]
+    actions = []
+    for i in range(n):
+        dims = rng.choice(dimension_keys, size=rng.integers(1, 3), replace=False)
+        actions.append({
+            "id": f"A{i:06d}",
+            "title": f"Course {i}: {' & '.join(dims)}",
+            "dimensions": ";".join(dims),
+            "level": levels[rng.integers(len(levels))] if rng.random() < 0.8 else "",
+            "duration_minutes": int(rng.integers(15, 2400)),
+            "rating": round(float(rng.uniform(1, 5)), 2),
+            "tags": formats[rng.integers(len(formats))],
+        })
+    return actions
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Query and benchmark the development-action catalog")
+    sub = parser.add_subparsers(dest="command", required=True)
+    query = sub.add_parser("query", help="recommend actions for one score profile")
+    query.add_argument("path", help=".jsonl or .csv catalog")
+    query.add_argument("--scores", required=True, help='JSON object, e.g. {"LD": 30, "CT": 55}')
+    query.add_argument("--k", type=int, default=5)
+    query.add_argument("--max-minutes", type=float)
+    bench = sub.add_parser("bench", help="time lookups over a synthetic catalog")
+    bench.add_argument("--n", type=int, default=100_000, help="catalog size")
+    bench.add_argument("--candidates", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    from nexus_engine import NexusInsightAssessment
+
+    engine = NexusInsightAssessment()
+    if args.command == "query":
+        catalog = ActionCatalog.load(args.path, engine.dimension_keys, engine.thresholds)
+        scores = {d: float(v) for d, v in json.loads(args.scores).items()}
+        for action in catalog.recommend(scores, k=args.k, max_minutes=args.max_minutes):
+            print(f"{action['for_dimension']:<4} {action['title']}  ({action['duration_minutes']:.0f} min, "
+                  f"rating {action['rating']:.1f})")
+        return
+
+    actions = synthetic_actions(args.n, engine.dimension_keys)
+    start = time.perf_counter()
+    catalog = ActionCatalog(actions, engine.dimension_keys, engine.thresholds)
+    print(f"Indexed {len(catalog)} actions in {time.perf_counter() - start:.2f}s")
+    scores = np.random.default_rng(1).uniform(0, 100, (args.candidates, len(engine.dimension_keys))).astype(np.float32)
+    profiles = [dict(zip(engine.dimension_keys, row.tolist())) for row in scores[:10_000]]
+    start = time.perf_counter()
+    for profile in profiles:
+        catalog.recommend(profile)
+    per_candidate = (time.perf_counter() - start) / len(profiles)
+    start = time.perf_counter()
+    catalog.recommend_batch(scores)
+    batch = time.perf_counter() - start
+    print(f"recommend: {per_candidate * 1e6:.1f} us per candidate")
+    print(f"recommend_batch: {batch:.3f}s for {len(scores)} candidates ({batch / len(scores) * 1e6:.2f} us each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# nexus_cohort.py
+"""Vectorized synthetic cohort generator for benchmarks, norm tables and load tests.
+
+Each synthetic respondent gets a latent trait vector drawn from one of the
+configured profiles. Option choice probabilities are a softmax over the bank's
+weights projected onto that latent vector, and response times follow a
+per-question log-normal that grows with text length and with how close the
+best options are. Everything is drawn from one seeded ``numpy.random.Generator``:
+
+    python nexus_cohort.py --n 5000000 --chunk-size 250000 --seed 7 --out cohort.parquet
+"""
+import argparse
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from nexus_engine import NexusInsightAssessment
+
+# Latent trait means/standard deviations per dimension, in standardized units
+DEFAULT_PROFILES = [
+    {
+        "name": "balanced",
+        "share": 0.45,
+        "mean": {"Psy": 0.2, "CT": 0.2, "LT": 0.0, "LD": 0.2, "Cog": 0.1, "TR": 0.2},
+        "sd": {"Psy": 0.6, "CT": 0.6, "LT": 0.6, "LD": 0.6, "Cog": 0.6, "TR": 0.6},
+    },
+    {
+        "name": "strategic",
+        "share": 0.2,
+        "mean": {"Psy": 0.1, "CT": 0.9, "LT": 0.5, "LD": 0.8, "Cog": 0.6, "TR": -0.2},
+        "sd": {"Psy": 0.5, "CT": 0.4, "LT": 0.5, "LD": 0.4, "Cog": 0.5, "TR": 0.5},
+    },
+    {
+        "name": "people_first",
+        "share": 0.2,
+        "mean": {"Psy": 0.8, "CT": -0.1, "LT": -0.2, "LD": 0.5, "Cog": 0.0, "TR": 0.9},
+        "sd": {"Psy": 0.4, "CT": 0.5, "LT": 0.5, "LD": 0.5, "Cog": 0.5, "TR": 0.4},
+    },
+    {
+        "name": "disengaged",
+        "share": 0.15,
+        "mean": {"Psy": -0.6, "CT": -0.5, "LT": -0.3, "LD": -0.7, "Cog": -0.3, "TR": -0.5},
+        "sd": {"Psy": 0.7, "CT": 0.7, "LT": 0.7, "LD": 0.7, "Cog": 0.7, "TR": 0.7},
+    },
+]
+
+READING_WORDS_PER_SECOND = 3.5
+BASE_DECISION_SECONDS = 6.0
+
+
+class CohortGenerator:
+    """Draws synthetic response matrices against the question bank"""
+
+    def __init__(self, engine: Optional[NexusInsightAssessment] = None,
+                 profiles: Optional[List[Dict]] = None, seed: int = 0,
+                 discrimination: float = 0.6, time_sigma: float = 0.45):
+        self.engine = engine or NexusInsightAssessment()
+        self.profiles = profiles or DEFAULT_PROFILES
+        self.rng = np.random.default_rng(seed)
+        self.discrimination = discrimination
+        self.time_sigma = time_sigma
+
+        dims = self.engine.dimension_keys
+        self.profile_names = [p["name"] for p in self.profiles]
+        shares = np.array([p.get("share", 1.0) for p in self.profiles], dtype=np.float64)
+        self.profile_shares = shares / shares.sum()
+        self.profile_means = np.array([[p["mean"].get(d, 0.0) for d in dims] for p in self.profiles])
+        self.profile_sds = np.array([[p["sd"].get(d, 0.5) for d in dims] for p in self.profiles])
+
+        weights = self.engine.weight_tensor
+        self.n_questions, self.n_options, self.n_dims = weights.shape
+        self.flat_weights = weights.reshape(-1, self.n_dims).T.astype(np.float64)
+        self.option_bias = np.where(self.engine.option_mask, 0.0, -np.inf)
+
+        # Median time per question: reading the scenario and options, then deciding
+        words = np.array([
+            len(q["text"].split()) + sum(len(o["text"].split()) for o in q["options"])
+            for q in self.engine.questions
+        ], dtype=np.float64)
+        self.median_seconds = words / READING_WORDS_PER_SECOND + BASE_DECISION_SECONDS
+
+    def generate(self, n: int, first_id: int = 0) -> Dict[str, np.ndarray]:
+        """Generate ``n`` respondents with choices in bank order"""
+        rng = self.rng
+        profile = rng.choice(len(self.profiles), size=n, p=self.profile_shares)
+        latent = self.profile_means[profile] + self.profile_sds[profile] * rng.standard_normal((n, self.n_dims))
+
+        utility = (latent @ self.flat_weights).reshape(n, self.n_questions, self.n_options)
+        utility = utility * self.discrimination + self.option_bias
+        # Gumbel-max trick: argmax of utility plus Gumbel noise samples the softmax
+        choices = np.argmax(utility + rng.gumbel(size=utility.shape), axis=2).astype(np.int8)
+
+        # Close calls take longer: slow down when the top two utilities are near each other
+        top_two = np.sort(utility, axis=2)[:, :, -2:]
+        hesitation = 1.0 + np.exp(-(top_two[:, :, 1] - top_two[:, :, 0]))
+        speed = rng.lognormal(0.0, 0.3, size=(n, 1))
+        response_times = (
+            self.median_seconds * speed * hesitation
+            * rng.lognormal(0.0, self.time_sigma, size=(n, self.n_questions))
+        ).astype(np.float32)
+
+        return {
+            "respondent_id": np.arange(first_id, first_id + n, dtype=np.int64),
+            "profile": profile.astype(np.int8),
+            "latent": latent.astype(np.float32),
+            "choices": choices,
+            "response_times": response_times,
+        }
+
+    def iter_chunks(self, n_total: int, chunk_size: int = 100_000) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield ``n_total`` respondents in chunks of at most ``chunk_size``"""
+        for start in range(0, n_total, chunk_size):
+            yield self.generate(min(chunk_size, n_total - start), first_id=start)
+
+    def chunk_to_arrow(self, chunk: Dict[str, np.ndarray]):
+        """Flatten a generated chunk into an Arrow table, one column per question"""
+        import pyarrow as pa
+
+        columns = {
+            "respondent_id": pa.array(chunk["respondent_id"]),
+            "profile": pa.DictionaryArray.from_arrays(
+                pa.array(chunk["profile"]), pa.array(self.profile_names)
+            ),
+        }
+        for qi, question in enumerate(self.engine.questions):
+            columns[f"q{question['id']}"] = pa.array(chunk["choices"][:, qi])
+        for qi, question in enumerate(self.engine.questions):
+            columns[f"t{question['id']}"] = pa.array(chunk["response_times"][:, qi])
+        return pa.table(columns)
+
+    def write_parquet(self, path: str, n_total: int, chunk_size: int = 100_000,
+                      compression: str = "zstd") -> int:
+        """Stream ``n_total`` respondents to a Parquet file, one row group per chunk"""
+        import pyarrow.parquet as pq
+
+        writer = None
+        written = 0
+        try:
+            for chunk in self.iter_chunks(n_total, chunk_size):
+                table = self.chunk_to_arrow(chunk)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression=compression)
+                writer.write_table(table)
+                written += table.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        return written
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Nexus Insight cohort")
+    parser.add_argument("--n", type=int, default=1_000_000, help="number of respondents")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--discrimination", type=float, default=0.6,
+                        help="how strongly latent traits drive option choice")
+    parser.add_argument("--out", default="cohort.parquet")
+    args = parser.parse_args(argv)
+
+    generator = CohortGenerator(seed=args.seed, discrimination=args.discrimination)
+    written = generator.write_parquet(args.out, args.n, args.chunk_size)
+    print(f"Wrote {written} respondents to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
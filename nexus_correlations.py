@@ -0,0 +1,366 @@
+# nexus_correlations.py
+"""Cross-dimension score adjustments learned from the population.
+
+Every completed assessment adds its normalized scores, before any
+adjustment, to a running mean and co-moment matrix (Welford's update; shards
+from other processes combine with Chan's parallel merge). Learning from
+unadjusted scores keeps an adjustment from feeding back into the statistics
+that produced it.
+
+From the covariance, each dimension gets its regression prediction from the
+other dimensions and moves toward it in proportion to how much of its
+variance they explain:
+
+    adjusted_j = s_j + strength * R2_j * (predicted_j - s_j)
+
+which is affine, so a whole score batch is adjusted with one matrix product
+``scores @ matrix + offset``. Dimensions the population never varies on
+(unmeasured by the bank) are left alone.
+
+Each derived set is published as a numbered version file; the engine applies
+the newest set for its bank and dashboards record the version, "fixed" when
+the built-in rules were used. Publishing changes every later report's scores,
+so it happens only when an operator runs ``derive``; an aggregator built with
+``derive_every`` also publishes after that many new assessments.
+
+    python nexus_correlations.py show correlation_stats
+    python nexus_correlations.py derive correlation_stats --min-samples 500
+"""
+import argparse
+import atexit
+import json
+import os
+import re
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from nexus_engine import NexusInsightAssessment
+from nexus_item_analysis import bank_fingerprint
+
+VERSION_FILE = re.compile(r"^v(\d{6})\.json$")
+
+
+class CovarianceState:
+    """Count, mean and co-moment matrix of score vectors, updatable one vector or batch at a time"""
+
+    def __init__(self, n_dims: int):
+        self.n = 0
+        self.mean = np.zeros(n_dims)
+        self.m2 = np.zeros((n_dims, n_dims))
+
+    def add(self, x: np.ndarray):
+        """Welford update with one score vector"""
+        x = np.asarray(x, dtype=np.float64)
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += np.outer(delta, x - self.mean)
+
+    def add_batch(self, scores: np.ndarray):
+        scores = np.asarray(scores, dtype=np.float64)
+        if not len(scores):
+            return
+        batch = CovarianceState(scores.shape[1])
+        batch.n = len(scores)
+        batch.mean = scores.mean(axis=0)
+        centered = scores - batch.mean
+        batch.m2 = centered.T @ centered
+        self.merge(batch)
+
+    def merge(self, other: "CovarianceState") -> "CovarianceState":
+        """Chan's parallel combination of two states"""
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + np.outer(delta, delta) * (self.n * other.n / n)
+        self.mean += delta * (other.n / n)
+        self.n = n
+        return self
+
+    def covariance(self) -> np.ndarray:
+        if self.n < 2:
+            return np.full(self.m2.shape, np.nan)
+        return self.m2 / (self.n - 1)
+
+    def correlation(self) -> np.ndarray:
+        cov = self.covariance()
+        sd = np.sqrt(np.diag(cov))
+        outer = np.outer(sd, sd)
+        return np.divide(cov, outer, out=np.full(cov.shape, np.nan), where=outer > 1e-12)
+
+    def save(self, path: str, fingerprint: str):
+        """Atomically write the state to ``path`` (.npz)"""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, fingerprint=np.array(fingerprint), n=np.array(self.n), mean=self.mean, m2=self.m2)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def read_fingerprint(path: str) -> str:
+        with np.load(path) as data:
+            return str(data["fingerprint"])
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str) -> "CovarianceState":
+        with np.load(path) as data:
+            if str(data["fingerprint"]) != fingerprint:
+                raise ValueError(f"{path} was gathered against a different question bank")
+            state = cls(len(data["mean"]))
+            state.n = int(data["n"])
+            state.mean[...] = data["mean"]
+            state.m2[...] = data["m2"]
+        return state
+
+
+def merge_shards(directory: str, fingerprint: str, n_dims: int, exclude: Optional[str] = None) -> CovarianceState:
+    """Every process's latest shard in ``directory`` merged into one state
+
+    Shards gathered against another bank, before an edit, are left out.
+    """
+    merged = CovarianceState(n_dims)
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if (name.endswith(".npz") and not name.endswith(".tmp.npz") and path != exclude
+                and CovarianceState.read_fingerprint(path) == fingerprint):
+            merged.merge(CovarianceState.load(path, fingerprint))
+    return merged
+
+
+class AdjustmentSet:
+    """One version of the learned adjustment: ``scores @ matrix + offset``, clipped to 0-100"""
+
+    def __init__(self, matrix: np.ndarray, offset: np.ndarray, mean: np.ndarray, version: Optional[int] = None,
+                 fingerprint: str = "", n_samples: int = 0, strength: float = 0.0, derived_at: float = 0.0):
+        self.matrix = np.asarray(matrix, dtype=np.float64)
+        self.offset = np.asarray(offset, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.version = version
+        self.fingerprint = fingerprint
+        self.n_samples = n_samples
+        self.strength = strength
+        self.derived_at = derived_at
+
+    @classmethod
+    def derive(cls, state: CovarianceState, fingerprint: str, strength: float = 0.25,
+               min_variance: float = 1.0, ridge: float = 1e-3) -> "AdjustmentSet":
+        """Adjustment toward each dimension's prediction from the others, scaled by their R squared"""
+        n_d = len(state.mean)
+        cov = state.covariance()
+        active = np.flatnonzero(np.diag(cov) >= min_variance)
+        matrix = np.eye(n_d)
+        offset = np.zeros(n_d)
+        if len(active) >= 2:
+            sub = cov[np.ix_(active, active)]
+            precision = np.linalg.inv(sub + ridge * np.diag(np.diag(sub)))
+            p_diag = np.diag(precision)
+            # beta[i, j]: coefficient of dimension i when predicting dimension j from the rest
+            beta = -precision / p_diag[None, :]
+            np.fill_diagonal(beta, 0.0)
+            r2 = np.clip(1 - 1 / (p_diag * np.diag(sub)), 0, 1)
+            weight = strength * r2
+            mean = state.mean[active]
+            matrix[np.ix_(active, active)] = np.diag(1 - weight) + beta * weight[None, :]
+            offset[active] = weight * (mean - mean @ beta)
+        return cls(matrix, offset, state.mean, fingerprint=fingerprint, n_samples=state.n,
+                   strength=strength, derived_at=time.time())
+
+    def apply(self, scores: np.ndarray) -> np.ndarray:
+        """Adjust an (n, dimensions) score matrix; NaN scores stay NaN and do not influence others"""
+        scores = np.asarray(scores, dtype=np.float64)
+        missing = np.isnan(scores)
+        if missing.any():
+            # At the population mean a dimension contributes nothing to the others
+            filled = np.where(missing, self.mean, scores)
+            return np.where(missing, np.nan, np.clip(filled @ self.matrix + self.offset, 0, 100))
+        return np.clip(scores @ self.matrix + self.offset, 0, 100)
+
+    def to_dict(self) -> Dict:
+        return {"version": self.version, "fingerprint": self.fingerprint, "n_samples": self.n_samples,
+                "strength": self.strength, "derived_at": self.derived_at, "matrix": self.matrix.tolist(),
+                "offset": self.offset.tolist(), "mean": self.mean.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "AdjustmentSet":
+        return cls(data["matrix"], data["offset"], data["mean"], version=data["version"],
+                   fingerprint=data["fingerprint"], n_samples=data["n_samples"], strength=data["strength"],
+                   derived_at=data["derived_at"])
+
+
+class AdjustmentRegistry:
+    """Numbered adjustment versions in a directory; ``current`` is the newest for this bank
+
+    Versions are never rewritten, so a report's recorded version can always
+    be looked up again.
+    """
+
+    def __init__(self, directory: str, fingerprint: str):
+        self.directory = directory
+        self.fingerprint = fingerprint
+        self.current: Optional[AdjustmentSet] = None
+        self._seen = -1
+        os.makedirs(directory, exist_ok=True)
+        self.refresh()
+
+    def versions(self) -> List[int]:
+        return sorted(int(m.group(1)) for m in map(VERSION_FILE.match, os.listdir(self.directory)) if m)
+
+    def load(self, version: int) -> AdjustmentSet:
+        with open(os.path.join(self.directory, f"v{version:06d}.json")) as f:
+            return AdjustmentSet.from_dict(json.load(f))
+
+    def refresh(self) -> Optional[AdjustmentSet]:
+        """Pick up versions other processes published since the last look"""
+        versions = self.versions()
+        if versions and versions[-1] > self._seen:
+            for version in reversed(versions):
+                if version <= self._seen:
+                    break
+                adjustments = self.load(version)
+                if adjustments.fingerprint == self.fingerprint:
+                    # One assignment, so scoring threads see either the old set or the new one
+                    self.current = adjustments
+                    break
+            self._seen = versions[-1]
+        return self.current
+
+    def publish(self, adjustments: AdjustmentSet) -> AdjustmentSet:
+        """Write ``adjustments`` as the next version and make it current"""
+        version = (self.versions() or [0])[-1] + 1
+        while True:
+            adjustments.version = version
+            try:
+                fd = os.open(os.path.join(self.directory, f"v{version:06d}.json"), os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+            except FileExistsError:
+                # Another process published this number first
+                version += 1
+                continue
+            with os.fdopen(fd, "w") as f:
+                json.dump(adjustments.to_dict(), f)
+            break
+        self.current = adjustments
+        self._seen = max(self._seen, version)
+        return adjustments
+
+
+class CorrelationAggregator:
+    """Process-wide covariance shard; publishes new adjustments every ``derive_every`` records (0: only via ``derive``)"""
+
+    def __init__(self, engine: NexusInsightAssessment, directory: str = "correlation_stats",
+                 flush_every: int = 50, flush_seconds: float = 60.0, derive_every: int = 0,
+                 min_samples: int = 500, strength: float = 0.25, tolerance: float = 0.01,
+                 registry: Optional[AdjustmentRegistry] = None):
+        self.engine = engine
+        self.fingerprint = bank_fingerprint(engine)
+        self.state = CovarianceState(len(engine.dimension_keys))
+        self.directory = directory
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.derive_every = derive_every
+        self.min_samples = min_samples
+        self.strength = strength
+        self.tolerance = tolerance
+        self.shard_path = os.path.join(directory, f"{socket.gethostname()}-{os.getpid()}.npz")
+        os.makedirs(directory, exist_ok=True)
+        # Share the engine's registry so a published set applies to the next report
+        self.registry = registry or AdjustmentRegistry(os.path.join(directory, "adjustments"), self.fingerprint)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._since_derive = 0
+        self._last_flush = time.monotonic()
+        # A shard left by an earlier process with this name under another bank is overwritten
+        if os.path.exists(self.shard_path) and CovarianceState.read_fingerprint(self.shard_path) == self.fingerprint:
+            self.state.merge(CovarianceState.load(self.shard_path, self.fingerprint))
+        atexit.register(self.flush)
+
+    def record(self, choices_row: np.ndarray) -> Optional[AdjustmentSet]:
+        """Record a completed response; returns a newly published adjustment set, if this record triggered one"""
+        totals, lower, upper = self.engine.raw_dimension_totals(np.asarray(choices_row)[None, :])
+        scores = self.engine.unadjusted_scores(totals, lower, upper)[0]
+        with self._lock:
+            self.state.add(scores)
+            self._pending += 1
+            self._since_derive += 1
+            if self._pending >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._flush_locked()
+            if not self.derive_every or self._since_derive < self.derive_every:
+                return None
+            self._since_derive = 0
+            self._flush_locked()
+        return self.derive()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self.state.save(self.shard_path, self.fingerprint)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def merged(self) -> CovarianceState:
+        """This process's live state merged with every other process's latest shard"""
+        merged = merge_shards(self.directory, self.fingerprint, len(self.engine.dimension_keys), self.shard_path)
+        with self._lock:
+            return merged.merge(self.state)
+
+    def derive(self) -> Optional[AdjustmentSet]:
+        """Publish a new adjustment set from the merged population if it moved past ``tolerance``"""
+        state = self.merged()
+        if state.n < self.min_samples:
+            return None
+        candidate = AdjustmentSet.derive(state, self.fingerprint, strength=self.strength)
+        current = self.registry.refresh()
+        if current is not None and np.abs(candidate.matrix - current.matrix).max() < self.tolerance \
+                and np.abs(candidate.offset - current.offset).max() < self.tolerance * 100:
+            return None
+        return self.registry.publish(candidate)
+
+
+def describe(adjustments: AdjustmentSet, dimension_keys: Sequence[str]) -> str:
+    lines = [f"version {adjustments.version}: {adjustments.n_samples} samples, strength {adjustments.strength}"]
+    lines.append("      " + " ".join(f"{d:>7}" for d in dimension_keys) + "   offset")
+    for j, target in enumerate(dimension_keys):
+        row = " ".join(f"{adjustments.matrix[i, j]:7.3f}" for i in range(len(dimension_keys)))
+        lines.append(f"{target:<5} {row} {adjustments.offset[j]:8.2f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Inspect and derive learned cross-dimension adjustments")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="population correlations and the current adjustment set")
+    show.add_argument("directory")
+    derive = sub.add_parser("derive", help="derive and publish a new adjustment set from every shard")
+    derive.add_argument("directory")
+    derive.add_argument("--min-samples", type=int, default=500)
+    derive.add_argument("--strength", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    engine = NexusInsightAssessment()
+    keys = engine.dimension_keys
+    fingerprint = bank_fingerprint(engine)
+    state = merge_shards(args.directory, fingerprint, len(keys))
+    registry = AdjustmentRegistry(os.path.join(args.directory, "adjustments"), fingerprint)
+    if args.command == "derive":
+        if state.n < args.min_samples:
+            print(f"Not enough samples ({state.n} < {args.min_samples})")
+            return
+        published = registry.publish(AdjustmentSet.derive(state, fingerprint, strength=args.strength))
+        print(describe(published, keys))
+        return
+    print(f"{state.n} score vectors")
+    if state.n >= 2:
+        corr = state.correlation()
+        print("      " + " ".join(f"{d:>7}" for d in keys))
+        for i, d in enumerate(keys):
+            print(f"{d:<5} " + " ".join(f"{c:7.3f}" for c in corr[i]))
+    current = registry.current
+    print(describe(current, keys) if current is not None else "No adjustment set published; fixed rules apply")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# nexus_drafts.py
+"""Draft persistence for the improvement plan.
+
+Every rerun of the improvement page hands the current form values to
+:meth:`DraftStore.stage`, which diffs them against the last saved values and
+keeps only the changed fields, merged per user so a burst of reruns becomes
+one write. Pending changes are written ``debounce_seconds`` after the first
+of them (or at once by :meth:`flush`, e.g. when the form is submitted):
+
+    drafts          (user_id, field) -> latest value and the revision that set it
+    draft_history   the changed fields of each revision, last ``keep_revisions`` per user
+    progress_notes  saved progress updates, append-only
+
+Restoring a user's drafts is one SELECT, cached afterwards.
+"""
+import atexit
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class DraftStore:
+    """Debounced, diff-based draft storage in SQLite"""
+
+    def __init__(self, path: str, debounce_seconds: float = 5.0, keep_revisions: int = 50,
+                 max_cached_users: int = 10_000, timeout: float = 10.0):
+        self.path = path
+        self.debounce_seconds = debounce_seconds
+        self.keep_revisions = keep_revisions
+        self.max_cached_users = max_cached_users
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # user -> (revision, saved fields); least recently used first
+        self._saved: "OrderedDict[str, tuple]" = OrderedDict()
+        # user -> (monotonic time of the first unsaved change, changed fields)
+        self._pending: Dict[str, tuple] = {}
+        self._counters = {"staged": 0, "fields_written": 0, "flushes": 0}
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS drafts ("
+            " user_id TEXT NOT NULL, field TEXT NOT NULL, value TEXT NOT NULL, revision INTEGER NOT NULL,"
+            " PRIMARY KEY (user_id, field));"
+            "CREATE TABLE IF NOT EXISTS draft_history ("
+            " user_id TEXT NOT NULL, revision INTEGER NOT NULL, updated REAL NOT NULL,"
+            " field TEXT NOT NULL, value TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS draft_history_user ON draft_history (user_id, revision);"
+            "CREATE TABLE IF NOT EXISTS progress_notes ("
+            " user_id TEXT NOT NULL, created REAL NOT NULL, note TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS progress_notes_user ON progress_notes (user_id, created);"
+        )
+        conn.commit()
+        self._stop = threading.Event()
+        if debounce_seconds > 0:
+            threading.Thread(target=self._flush_loop, daemon=True).start()
+        atexit.register(self.flush)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _saved_locked(self, user_id: str) -> Optional[tuple]:
+        entry = self._saved.get(user_id)
+        if entry is not None:
+            self._saved.move_to_end(user_id)
+        return entry
+
+    def load(self, user_id: str) -> Dict[str, str]:
+        """The user's drafts, including changes staged but not yet written"""
+        with self._lock:
+            entry = self._saved_locked(user_id)
+        if entry is None:
+            rows = self._conn().execute(
+                "SELECT field, value, revision FROM drafts WHERE user_id = ?", (user_id,)).fetchall()
+            entry = (max((r[2] for r in rows), default=0), {field: value for field, value, _ in rows})
+            with self._lock:
+                # Another thread may have flushed meanwhile; keep whichever is newer
+                current = self._saved.get(user_id)
+                if current is None or current[0] < entry[0]:
+                    self._saved[user_id] = entry
+                else:
+                    entry = current
+                excess = len(self._saved) - self.max_cached_users
+                if excess > 0:
+                    # Users with unwritten changes keep their baseline
+                    for user in [u for u in self._saved if u not in self._pending][:excess]:
+                        del self._saved[user]
+        with self._lock:
+            pending = self._pending.get(user_id, (None, {}))[1]
+            return {**entry[1], **pending}
+
+    def stage(self, user_id: str, fields: Dict[str, str]) -> int:
+        """Record the form's current values; returns how many fields differ from the stored draft"""
+        current = self.load(user_id)
+        changed = {k: v for k, v in fields.items() if current.get(k, "") != v}
+        if not changed:
+            return 0
+        with self._lock:
+            first, pending = self._pending.get(user_id, (time.monotonic(), {}))
+            pending.update(changed)
+            self._pending[user_id] = (first, pending)
+            self._counters["staged"] += len(changed)
+            due = time.monotonic() - first >= self.debounce_seconds
+        if due:
+            self.flush(user_id)
+        return len(changed)
+
+    def flush(self, user_id: Optional[str] = None):
+        """Write pending changes for one user, or for everyone"""
+        with self._lock:
+            users = [user_id] if user_id is not None else list(self._pending)
+            batches = [(u, self._pending.pop(u)[1]) for u in users if u in self._pending]
+        for user, changed in batches:
+            self._write(user, changed)
+
+    def _write(self, user_id: str, changed: Dict[str, str]):
+        with self._lock:
+            entry = self._saved_locked(user_id)
+        revision = (entry[0] if entry is not None else self._latest_revision(user_id)) + 1
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO drafts (user_id, field, value, revision) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(user_id, field) DO UPDATE SET value = excluded.value, revision = excluded.revision",
+                [(user_id, field, value, revision) for field, value in changed.items()])
+            conn.executemany(
+                "INSERT INTO draft_history (user_id, revision, updated, field, value) VALUES (?, ?, ?, ?, ?)",
+                [(user_id, revision, now, field, value) for field, value in changed.items()])
+            conn.execute("DELETE FROM draft_history WHERE user_id = ? AND revision <= ?",
+                         (user_id, revision - self.keep_revisions))
+        with self._lock:
+            saved = dict(entry[1]) if entry is not None else {}
+            saved.update(changed)
+            self._saved[user_id] = (revision, saved)
+            self._counters["fields_written"] += len(changed)
+            self._counters["flushes"] += 1
+
+    def _latest_revision(self, user_id: str) -> int:
+        row = self._conn().execute("SELECT MAX(revision) FROM drafts WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] or 0
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.debounce_seconds / 2):
+            cutoff = time.monotonic() - self.debounce_seconds
+            with self._lock:
+                due = [user for user, (first, _) in self._pending.items() if first <= cutoff]
+            for user in due:
+                try:
+                    self.flush(user)
+                except sqlite3.Error:
+                    pass
+
+    def history(self, user_id: str, limit: int = 20) -> List[Dict]:
+        """Most recent revisions first, each with the fields it changed"""
+        self.flush(user_id)
+        rows = self._conn().execute(
+            "SELECT revision, updated, field, value FROM draft_history WHERE user_id = ?"
+            " AND revision > (SELECT COALESCE(MAX(revision), 0) FROM draft_history WHERE user_id = ?) - ?"
+            " ORDER BY revision DESC", (user_id, user_id, limit)).fetchall()
+        revisions: Dict[int, Dict] = {}
+        for revision, updated, field, value in rows:
+            revisions.setdefault(revision, {"revision": revision, "updated": updated, "fields": {}})
+            revisions[revision]["fields"][field] = value
+        return list(revisions.values())
+
+    def add_progress_note(self, user_id: str, note: str, timestamp: Optional[float] = None):
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT INTO progress_notes (user_id, created, note) VALUES (?, ?, ?)",
+                         (user_id, timestamp if timestamp is not None else time.time(), note))
+
+    def progress_notes(self, user_id: str, limit: int = 20) -> List[Dict]:
+        """Saved progress notes, newest first"""
+        rows = self._conn().execute(
+            "SELECT created, note FROM progress_notes WHERE user_id = ? ORDER BY created DESC LIMIT ?",
+            (user_id, limit)).fetchall()
+        return [{"created": created, "note": note} for created, note in rows]
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {**self._counters, "pending_users": len(self._pending)}
+
+    def close(self):
+        self._stop.set()
+        self.flush()
@@ -0,0 +1,703 @@
+# nexus_engine.py
+import math
+import numpy as np
+from typing import Dict, List, Any
+from datetime import datetime
+
+def validate_bank(questions: List[Dict], dimension_keys: List[str]) -> List[str]:
+    """Check a question bank before it is scored against
+    
+    Raises ValueError listing every structural problem; returns warnings for
+    problems that still score, such as dimensions no option weights.
+    """
+    errors = []
+    warnings = []
+    if not isinstance(questions, list) or not questions:
+        raise ValueError("Question bank must be a non-empty list of questions")
+    
+    seen_ids = set()
+    weighted = set()
+    for position, question in enumerate(questions):
+        q_id = question.get("id") if isinstance(question, dict) else None
+        where = f"question {q_id if q_id is not None else f'#{position + 1}'}"
+        if not isinstance(question, dict):
+            errors.append(f"{where}: not a mapping")
+            continue
+        if not isinstance(q_id, int) or isinstance(q_id, bool):
+            errors.append(f"{where}: id must be an integer")
+        elif q_id in seen_ids:
+            errors.append(f"{where}: duplicate id")
+        seen_ids.add(q_id)
+        if not isinstance(question.get("text"), str) or not question["text"].strip():
+            errors.append(f"{where}: missing text")
+        options = question.get("options")
+        if not isinstance(options, list) or len(options) < 2:
+            errors.append(f"{where}: needs at least two options")
+            continue
+        
+        question_dims = set()
+        for oi, option in enumerate(options):
+            weights = option.get("weights") if isinstance(option, dict) else None
+            if not isinstance(weights, dict):
+                errors.append(f"{where}, option {oi + 1}: missing weights")
+                continue
+            if not isinstance(option.get("text"), str) or not option["text"].strip():
+                errors.append(f"{where}, option {oi + 1}: missing text")
+            for dim, weight in weights.items():
+                if dim not in dimension_keys:
+                    errors.append(f"{where}, option {oi + 1}: unknown dimension {dim!r}")
+                elif isinstance(weight, bool) or not isinstance(weight, (int, float)) or not math.isfinite(weight):
+                    errors.append(f"{where}, option {oi + 1}: weight for {dim} must be a finite number")
+                else:
+                    question_dims.add(dim)
+        weighted |= question_dims
+        
+        declared = question.get("dimensions")
+        if declared is not None and set(declared) != question_dims:
+            warnings.append(f"{where}: declares dimensions {sorted(declared)} but weights {sorted(question_dims)}")
+    
+    if errors:
+        raise ValueError("Invalid question bank:\n  " + "\n  ".join(errors))
+    for dim in dimension_keys:
+        if dim not in weighted:
+            warnings.append(f"dimension {dim} is not weighted by any option and will not be measured")
+    return warnings
+
+
+class NexusInsightAssessment:
+    def __init__(self, questions: List[Dict] = None):
+        self.dimensions = {
+            'Psy': 'Psychological Metrics',
+            'CT': 'Critical Thinking', 
+            'LT': 'Logical Thinking',
+            'LD': 'Leadership',
+            'Cog': 'Cognitive Skills',
+            'TR': 'Team Roles'
+        }
+        
+        self.thresholds = {
+            'Low': (0, 40),
+            'Medium': (40, 70), 
+            'High': (70, 100)
+        }
+        
+        self.questions = questions if questions is not None else self._create_innovative_questions()
+        self.dimension_keys = list(self.dimensions.keys())
+        self.bank_warnings = validate_bank(self.questions, self.dimension_keys)
+        self.question_index = {q["id"]: i for i, q in enumerate(self.questions)}
+        self.weight_tensor, self.touch_tensor, self.option_mask = self._build_weight_tensor()
+        self._build_dimension_bounds()
+        # Optional nexus_archetypes.ArchetypeModel; when set, dashboards report the candidate's archetype
+        self.archetypes = None
+        # Optional nexus_catalog.ActionCatalog; when set, development actions come from the learning catalog
+        self.action_catalog = None
+        # Optional nexus_correlations.AdjustmentRegistry; its current set replaces the fixed correlation rules
+        self.correlation_adjustments = None
+        
+    def _create_innovative_questions(self) -> List[Dict]:
+        """Create innovative assessment questions with real-world scenarios"""
+        questions = [
+            {
+                "id": 1,
+                "text": "You're the young founder of an AI startup. After 6 months of launch, a major competitor copies your product and offers it at 50% lower price. Your team is demotivated. What do you do?",
+                "type": "situational_judgment",
+                "scenario_type": "startup_crisis",
+                "options": [
+                    {"text": "Rush to develop unique features and lower prices to compete", "weights": {"Psy": -3, "LD": 2, "CT": 1}},
+                    {"text": "Host brainstorming session with team for creative solutions", "weights": {"LD": 4, "TR": 3, "Cog": 2}},
+                    {"text": "Focus on different customer segment not served by competitor", "weights": {"CT": 4, "LD": 3, "Psy": 2}},
+                    {"text": "Seek strategic partnership with larger company", "weights": {"TR": 4, "LD": 3, "CT": 2}}
+                ],
+                "creative_elements": ["Startup environment", "Fierce competition", "Creative problem-solving"],
+                "dimensions": ["Psy", "LD", "CT", "TR"]
+            },
+            {
+                "id": 2,
+                "text": "An investor asks you to completely change your business model for funding. This conflicts with your core vision. How do you handle this dilemma?",
+                "type": "ethical_dilemma", 
+                "scenario_type": "investor_pressure",
+                "options": [
+                    {"text": "Reject the offer and maintain your vision", "weights": {"Psy": 4, "LD": 3, "CT": -2}},
+                    {"text": "Accept with reservations and minor adjustments", "weights": {"TR": 3, "LD": 2, "Psy": 1}},
+                    {"text": "Negotiate to find middle ground satisfying both parties", "weights": {"LD": 4, "CT": 3, "TR": 3}},
+                    {"text": "Request time to think and consult mentors", "weights": {"CT": 4, "Psy": 3, "Cog": 2}}
+                ],
+                "creative_elements": ["Ethical dilemma", "Investor pressure", "Vision preservation"],
+                "dimensions": ["Psy", "LD", "CT", "TR"]
+            },
+            {
+                "id": 3,
+                "text": "Your top performer is highly productive but creates team conflicts. Do you prioritize results or team harmony?",
+                "type": "leadership_dilemma",
+                "scenario_type": "team_management",
+                "options": [
+                    {"text": "Focus on results and manage conflicts separately", "weights": {"LD": 3, "Psy": -2, "TR": -3}},
+                    {"text": "Coach the employee on teamwork while acknowledging contributions", "weights": {"LD": 4, "Psy": 3, "TR": 4}},
+                    {"text": "Reassign to individual contributor role", "weights": {"TR": 3, "LD": 2, "CT": 2}},
+                    {"text": "Implement team-building activities addressing the issue", "weights": {"TR": 4, "LD": 3, "Psy": 3}}
+                ],
+                "creative_elements": ["Performance vs harmony", "Leadership challenge", "Conflict resolution"],
+                "dimensions": ["LD", "TR", "Psy", "CT"]
+            },
+            {
+                "id": 4,
+                "text": "As a manager in traditional manufacturing company, you need to lead digital transformation. 60% of employees resist change. What's your strategy?",
+                "type": "change_management",
+                "scenario_type": "digital_resistance", 
+                "options": [
+                    {"text": "Enforce change gradually with intensive training", "weights": {"LD": 3, "Psy": -2, "TR": 1}},
+                    {"text": "Identify 'change champions' and make them transformation ambassadors", "weights": {"TR": 4, "LD": 4, "Psy": 3}},
+                    {"text": "Start with small pilot project to demonstrate success", "weights": {"CT": 4, "LD": 3, "Cog": 2}},
+                    {"text": "Redesign incentives to encourage voluntary adoption", "weights": {"LD": 4, "Psy": 3, "CT": 3}}
+                ],
+                "creative_elements": ["Digital transformation", "Change resistance", "Adoption strategy"],
+                "dimensions": ["LD", "TR", "Psy", "CT"]
+            },
+            {
+                "id": 5,
+                "text": "AI implementation will replace 30% of manual jobs in your department. How do you lead this transition ethically?",
+                "type": "ethical_leadership",
+                "scenario_type": "ai_implementation",
+                "options": [
+                    {"text": "Implement quickly and offer severance packages", "weights": {"LD": 2, "Psy": -4, "CT": 1}},
+                    {"text": "Create upskilling programs and gradual transition plan", "weights": {"LD": 5, "TR": 4, "Psy": 4}},
+                    {"text": "Slow implementation and seek alternative roles", "weights": {"CT": 3, "LD": 3, "TR": 3}},
+                    {"text": "Form employee committee to co-design transition", "weights": {"TR": 5, "LD": 4, "CT": 4}}
+                ],
+                "creative_elements": ["AI ethics", "Workforce transition", "Inclusive decision-making"],
+                "dimensions": ["LD", "CT", "TR", "Psy"]
+            },
+            {
+                "id": 6,
+                "text": "Market research shows your product is becoming obsolete. Do you invest in incremental improvements or radical innovation?",
+                "type": "strategic_decision",
+                "scenario_type": "innovation_crossroads",
+                "options": [
+                    {"text": "Focus on improving existing product features", "weights": {"CT": 3, "LD": 2, "Psy": -2}},
+                    {"text": "Allocate resources for breakthrough innovation", "weights": {"LD": 4, "CT": 4, "Cog": 3}},
+                    {"text": "Pursue both paths with separate teams", "weights": {"TR": 4, "LD": 3, "CT": 3}},
+                    {"text": "Acquire innovative startup instead of internal development", "weights": {"CT": 4, "LD": 3, "TR": 2}}
+                ],
+                "creative_elements": ["Innovation strategy", "Risk assessment", "Strategic thinking"],
+                "dimensions": ["LD", "CT", "TR", "Cog"]
+            },
+            {
+                "id": 7,
+                "text": "Major data breach exposes customer information. Media is calling, stock price is dropping. What's your first response?",
+                "type": "crisis_management",
+                "scenario_type": "data_breach",
+                "options": [
+                    {"text": "Issue immediate public apology and transparency", "weights": {"LD": 4, "CT": 3, "Psy": 3}},
+                    {"text": "First contain breach internally, then communicate", "weights": {"CT": 4, "LD": 3, "Cog": 3}},
+                    {"text": "Blame technical issues and minimize responsibility", "weights": {"LD": -4, "Psy": -3, "CT": -2}},
+                    {"text": "Activate crisis team and follow pre-established protocol", "weights": {"LD": 5, "CT": 4, "TR": 4}}
+                ],
+                "creative_elements": ["Crisis leadership", "Stakeholder management", "Quick decision-making"],
+                "dimensions": ["LD", "CT", "Psy", "TR"]
+            },
+            {
+                "id": 8,
+                "text": "Expanding to new international market, you discover cultural practices conflicting with company values. How do you proceed?",
+                "type": "cross_cultural",
+                "scenario_type": "global_expansion",
+                "options": [
+                    {"text": "Adapt company practices to local culture", "weights": {"TR": 3, "LD": 2, "Psy": 2}},
+                    {"text": "Maintain company values and educate local partners", "weights": {"LD": 4, "CT": 3, "Psy": 3}},
+                    {"text": "Find compromise respecting both perspectives", "weights": {"CT": 4, "LD": 4, "TR": 3}},
+                    {"text": "Reconsider market entry if values conflict irreconcilably", "weights": {"CT": 5, "LD": 3, "Psy": 4}}
+                ],
+                "creative_elements": ["Cultural intelligence", "Values-based leadership", "Global mindset"],
+                "dimensions": ["LD", "CT", "Psy", "TR"]
+            },
+            {
+                "id": 9,
+                "text": "Metaverse technology could transform your industry in 5 years. Do you invest heavily now or wait for market maturity?",
+                "type": "future_strategy",
+                "scenario_type": "emerging_technology",
+                "options": [
+                    {"text": "Heavy investment to become early leader", "weights": {"LD": 4, "CT": 3, "Psy": 2}},
+                    {"text": "Wait for clear ROI and proven use cases", "weights": {"CT": 4, "LD": 2, "Psy": 3}},
+                    {"text": "Form strategic partnerships to share risk", "weights": {"TR": 4, "LD": 3, "CT": 3}},
+                    {"text": "Create innovation lab for experimentation", "weights": {"Cog": 4, "LD": 3, "CT": 4}}
+                ],
+                "creative_elements": ["Future thinking", "Technology adoption", "Strategic foresight"],
+                "dimensions": ["LD", "CT", "TR", "Cog"]
+            },
+            {
+                "id": 10,
+                "text": "Your company is accused of greenwashing. Environmental groups are protesting. How do you restore trust?",
+                "type": "reputation_management",
+                "scenario_type": "crisis_communication",
+                "options": [
+                    {"text": "Issue strong denial and defend current practices", "weights": {"LD": -3, "CT": -2, "Psy": -4}},
+                    {"text": "Admit shortcomings and present concrete improvement plan", "weights": {"LD": 5, "CT": 4, "Psy": 4}},
+                    {"text": "Hire PR firm to manage the narrative", "weights": {"CT": 2, "LD": 2, "TR": 1}},
+                    {"text": "Engage with protesters and co-create sustainability goals", "weights": {"TR": 5, "LD": 4, "CT": 4}}
+                ],
+                "creative_elements": ["Reputation crisis", "Stakeholder engagement", "Authentic leadership"],
+                "dimensions": ["LD", "CT", "TR", "Psy"]
+            }
+        ]
+        return questions
+
+    def _build_weight_tensor(self):
+        """Dense (question, option, dimension) view of the bank weights for vectorized work"""
+        n_options = max(len(q["options"]) for q in self.questions)
+        shape = (len(self.questions), n_options, len(self.dimension_keys))
+        weights = np.zeros(shape, dtype=np.float32)
+        touches = np.zeros(shape, dtype=bool)
+        option_mask = np.zeros(shape[:2], dtype=bool)
+        
+        for qi, question in enumerate(self.questions):
+            for oi, option in enumerate(question["options"]):
+                option_mask[qi, oi] = True
+                for dim, weight in option["weights"].items():
+                    di = self.dimension_keys.index(dim)
+                    weights[qi, oi, di] = weight
+                    touches[qi, oi, di] = True
+        
+        return weights, touches, option_mask
+
+    def _build_dimension_bounds(self):
+        """Exact achievable raw totals per dimension, per question and as prefix sums
+
+        An option that does not weight a dimension contributes 0 to it, so a
+        question's range on a dimension is the min/max over its options of
+        that contribution. Any subset of questions has bounds equal to the sum
+        of its questions' ranges; for the first ``k`` questions that sum is
+        one lookup in the prefix tables.
+        """
+        valid = self.option_mask[:, :, None]
+        self.option_min = np.where(valid, self.weight_tensor, np.inf).min(axis=1)
+        self.option_max = np.where(valid, self.weight_tensor, -np.inf).max(axis=1)
+        zeros = np.zeros((1, len(self.dimension_keys)), dtype=np.float32)
+        self.prefix_min = np.concatenate([zeros, np.cumsum(self.option_min, axis=0)]).astype(np.float32)
+        self.prefix_max = np.concatenate([zeros, np.cumsum(self.option_max, axis=0)]).astype(np.float32)
+        # Dimensions no option in the bank can move are not measured and stay out of overall_score
+        self.measured = self.prefix_max[-1] > self.prefix_min[-1]
+        self.measured_dimensions = [d for d, m in zip(self.dimension_keys, self.measured) if m]
+
+    def dimension_bounds(self, answered: np.ndarray):
+        """(lower, upper) achievable raw totals for an (n, questions) answered mask"""
+        answered = np.asarray(answered, dtype=bool)
+        k = answered.sum(axis=1)
+        if (answered == (np.arange(answered.shape[1]) < k[:, None])).all():
+            return self.prefix_min[k], self.prefix_max[k]
+        mask = answered.astype(np.float32)
+        return mask @ self.option_min, mask @ self.option_max
+
+    def overall_score(self, scores: Dict[str, float]) -> float:
+        """Mean over the dimensions the bank actually measures"""
+        return float(np.mean([scores[d] for d in self.measured_dimensions]))
+
+    def responses_to_matrix(self, responses_list: List[Dict]) -> np.ndarray:
+        """Stack stored response dicts into an (n, questions) option matrix, -1 where unanswered"""
+        choices = np.full((len(responses_list), len(self.questions)), -1, dtype=np.int8)
+        for row, responses in enumerate(responses_list):
+            for q_id, response in responses.items():
+                qi = self.question_index.get(int(q_id))
+                if qi is not None and "selected_option" in response:
+                    choices[row, qi] = response["selected_option"]
+        return choices
+
+    def calculate_dimension_scores(self, responses: Dict) -> Dict[str, float]:
+        """Calculate scores using advanced algorithm"""
+        dimension_totals = {dim: 0 for dim in self.dimensions.keys()}
+        answered = np.zeros((1, len(self.questions)), dtype=bool)
+        
+        for q_id, response in responses.items():
+            question = next((q for q in self.questions if q["id"] == int(q_id)), None)
+            if question and "selected_option" in response:
+                option_index = response["selected_option"]
+                if 0 <= option_index < len(question["options"]):
+                    selected_option = question["options"][option_index]
+                    answered[0, self.question_index[question["id"]]] = True
+                    
+                    for dim, weight in selected_option["weights"].items():
+                        dimension_totals[dim] += weight
+        
+        # Normalize scores to 0-100 against the range the answered questions can reach
+        lower, upper = self.dimension_bounds(answered)
+        normalized_scores = {}
+        for i, dim in enumerate(self.dimension_keys):
+            min_possible, max_possible = float(lower[0, i]), float(upper[0, i])
+            if max_possible > min_possible:
+                normalized = ((dimension_totals[dim] - min_possible) / (max_possible - min_possible)) * 100
+                normalized_scores[dim] = max(0, min(100, normalized))
+            else:
+                normalized_scores[dim] = 0
+        
+        # Apply cross-dimension correlations
+        normalized_scores = self._apply_cross_dimension_correlations(normalized_scores)
+        
+        return normalized_scores
+
+    def learned_adjustments(self):
+        """The learned adjustment set in use, None while the fixed rules apply"""
+        return self.correlation_adjustments.current if self.correlation_adjustments is not None else None
+
+    def adjustment_version(self):
+        adjustments = self.learned_adjustments()
+        return adjustments.version if adjustments is not None else "fixed"
+
+    def _apply_cross_dimension_correlations(self, scores: Dict[str, float]) -> Dict[str, float]:
+        """Apply advanced correlations between dimensions"""
+        adjustments = self.learned_adjustments()
+        if adjustments is not None:
+            row = adjustments.apply(np.array([[scores[dim] for dim in self.dimension_keys]]))[0]
+            return {dim: float(row[i]) for i, dim in enumerate(self.dimension_keys)}
+        adjusted_scores = scores.copy()
+        
+        if adjusted_scores['LD'] > 70:
+            adjusted_scores['TR'] = min(100, adjusted_scores['TR'] * 1.1)
+        
+        if adjusted_scores['CT'] > 70:
+            adjusted_scores['LD'] = min(100, adjusted_scores['LD'] * 1.08)
+        
+        if adjusted_scores['Psy'] > 70:
+            adjusted_scores['Cog'] = min(100, adjusted_scores['Cog'] * 1.05)
+        
+        if adjusted_scores['LT'] > 70:
+            adjusted_scores['CT'] = min(100, adjusted_scores['CT'] * 1.06)
+        
+        return adjusted_scores
+
+    def raw_dimension_totals(self, choices: np.ndarray):
+        """Vectorized raw totals and their (lower, upper) bounds per dimension for an (n, questions) option matrix"""
+        answered = choices >= 0
+        picked = np.where(answered, choices, 0).astype(np.intp)
+        q_index = np.arange(choices.shape[1])
+        totals = (self.weight_tensor[q_index, picked] * answered[:, :, None]).sum(axis=1)
+        lower, upper = self.dimension_bounds(answered)
+        return totals.astype(np.float32), lower, upper
+
+    def unadjusted_scores(self, totals: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+        """Vectorized 0-100 normalization before cross-dimension correlations"""
+        measured = upper > lower
+        span = np.where(measured, upper - lower, 1.0)
+        normalized = np.clip((totals - lower) / span * 100, 0, 100)
+        return np.where(measured, normalized, 0.0)
+
+    def normalize_dimension_totals(self, totals: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+        """Vectorized normalization and correlations, same result as calculate_dimension_scores"""
+        return self._apply_cross_dimension_correlations_batch(self.unadjusted_scores(totals, lower, upper))
+
+    def _apply_cross_dimension_correlations_batch(self, scores: np.ndarray) -> np.ndarray:
+        """Row-wise _apply_cross_dimension_correlations over an (n, dimensions) score matrix"""
+        adjustments = self.learned_adjustments()
+        if adjustments is not None:
+            return adjustments.apply(scores)
+        adjusted = np.array(scores, dtype=np.float64)
+        col = {dim: i for i, dim in enumerate(self.dimension_keys)}
+        for source, target, factor in (('LD', 'TR', 1.1), ('CT', 'LD', 1.08), ('Psy', 'Cog', 1.05), ('LT', 'CT', 1.06)):
+            boosted = np.minimum(100, adjusted[:, col[target]] * factor)
+            adjusted[:, col[target]] = np.where(adjusted[:, col[source]] > 70, boosted, adjusted[:, col[target]])
+        return adjusted
+
+    def score_matrix(self, choices: np.ndarray) -> np.ndarray:
+        """Score many respondents at once; columns follow self.dimension_keys"""
+        return self.normalize_dimension_totals(*self.raw_dimension_totals(choices))
+
+    def score_variants(self, choices: np.ndarray, variant_weights: np.ndarray, chunk_size: int = 65_536,
+                       out: np.ndarray = None) -> np.ndarray:
+        """Score one option matrix against stacked (variants, questions, options, dimensions) weights
+
+        Variants share this bank's questions and options and differ only in
+        weights. Each chunk of responses is one-hot encoded once and multiplied
+        by every variant's weights (and option ranges) in a single matrix
+        product. Returns (variants, n, dimensions); variant ``v`` equals
+        ``score_matrix`` of an engine built with those weights.
+        """
+        variant_weights = np.asarray(variant_weights, dtype=np.float32)
+        if variant_weights.shape[1:] != self.weight_tensor.shape:
+            raise ValueError(f"Variant weights must have shape (variants, {', '.join(map(str, self.weight_tensor.shape))})")
+        n_v, n_q, n_o, n_d = variant_weights.shape
+        # (question * option, variant * dimension) so one product scores every variant
+        stacked = variant_weights.transpose(1, 2, 0, 3).reshape(n_q * n_o, n_v * n_d)
+        valid = self.option_mask[None, :, :, None]
+        option_min = np.where(valid, variant_weights, np.inf).min(axis=2).transpose(1, 0, 2).reshape(n_q, n_v * n_d)
+        option_max = np.where(valid, variant_weights, -np.inf).max(axis=2).transpose(1, 0, 2).reshape(n_q, n_v * n_d)
+
+        n = len(choices)
+        if out is None:
+            out = np.empty((n_v, n, n_d), dtype=np.float32)
+        flat_offsets = np.arange(n_q) * n_o
+        for start in range(0, n, chunk_size):
+            block = np.asarray(choices[start:start + chunk_size])
+            m = len(block)
+            answered = block >= 0
+            rows, questions = np.nonzero(answered)
+            one_hot = np.zeros((m, n_q * n_o), dtype=np.float32)
+            one_hot[rows, flat_offsets[questions] + block[rows, questions]] = 1.0
+            answered_f = answered.astype(np.float32)
+            totals = (one_hot @ stacked).reshape(m * n_v, n_d)
+            lower = (answered_f @ option_min).reshape(m * n_v, n_d)
+            upper = (answered_f @ option_max).reshape(m * n_v, n_d)
+            scores = self.normalize_dimension_totals(totals, lower, upper)
+            out[:, start:start + m] = scores.reshape(m, n_v, n_d).transpose(1, 0, 2)
+        return out
+
+    def bootstrap_counts(self, n_resamples: int = 200, seed: int = 0) -> np.ndarray:
+        """(resamples, questions) times each question is drawn in each bootstrap resample
+
+        Drawn once per engine and reused for every candidate, so intervals are
+        reproducible and a cohort's resampled totals are one matrix product.
+        """
+        key = (n_resamples, seed)
+        cache = self.__dict__.setdefault("_bootstrap_counts", {})
+        if key not in cache:
+            n_q = len(self.questions)
+            rng = np.random.default_rng(seed)
+            cache[key] = rng.multinomial(n_q, np.full(n_q, 1 / n_q), size=n_resamples).astype(np.float32)
+        return cache[key]
+
+    def score_intervals(self, choices: np.ndarray, level: float = 0.9, n_resamples: int = 200,
+                        seed: int = 0, chunk_size: int = 2048):
+        """Bootstrap (low, high) score bounds for an (n, questions) option matrix, each (n, dimensions)
+
+        Each resample redraws the questions with replacement and rescores the
+        candidate's answers to them against the drawn questions' exact range.
+        Resamples in which no drawn question touches a dimension are left out
+        for that dimension; bounds are NaN where no resample measures it.
+        """
+        counts = self.bootstrap_counts(n_resamples, seed)
+        n_q, _, n_d = self.weight_tensor.shape
+        q_index = np.arange(n_q)
+        tail = (1 - level) / 2
+        low = np.empty((len(choices), n_d), dtype=np.float32)
+        high = np.empty((len(choices), n_d), dtype=np.float32)
+        for start in range(0, len(choices), chunk_size):
+            block = np.asarray(choices[start:start + chunk_size])
+            m = len(block)
+            answered = (block >= 0)[:, :, None]
+            items = self.weight_tensor[q_index, np.where(block >= 0, block, 0).astype(np.intp)] * answered
+            # (questions, 3 * m * dims): resampled totals, lower and upper bounds in one product
+            per_question = np.stack([items, answered * self.option_min, answered * self.option_max])
+            resampled = counts @ per_question.transpose(2, 0, 1, 3).reshape(n_q, 3 * m * n_d)
+            totals, lower, upper = resampled.reshape(n_resamples, 3, m * n_d).transpose(1, 0, 2)
+            measured = upper > lower
+            normalized = np.where(measured, np.clip((totals - lower) / np.where(measured, upper - lower, 1) * 100,
+                                                    0, 100), np.nan)
+            adjusted = self._apply_cross_dimension_correlations_batch(
+                normalized.reshape(n_resamples * m, n_d)).reshape(n_resamples, m * n_d)
+            # NaN sorts last, so the quantiles index into each cell's measured resamples
+            adjusted.sort(axis=0)
+            valid = measured.sum(axis=0)
+            last = np.maximum(valid - 1, 0)
+            lo = np.take_along_axis(adjusted, np.floor(tail * last).astype(np.intp)[None], axis=0)[0]
+            hi = np.take_along_axis(adjusted, np.ceil((1 - tail) * last).astype(np.intp)[None], axis=0)[0]
+            low[start:start + m] = np.where(valid > 0, lo, np.nan).reshape(m, n_d)
+            high[start:start + m] = np.where(valid > 0, hi, np.nan).reshape(m, n_d)
+        return low, high
+
+    def confidence_intervals(self, responses: Dict, level: float = 0.9) -> Dict[str, Dict[str, float]]:
+        """Bootstrap score bounds for one candidate's measured dimensions"""
+        low, high = self.score_intervals(self.responses_to_matrix([responses]), level=level)
+        return {
+            dim: {"low": float(low[0, i]), "high": float(high[0, i]), "level": level}
+            for i, dim in enumerate(self.dimension_keys)
+            if dim in self.measured_dimensions and not np.isnan(low[0, i])
+        }
+
+    def generate_ai_coach_recommendations(self, scores: Dict[str, float]) -> List[Dict]:
+        """Generate personalized AI Coach recommendations"""
+        recommendations = []
+        
+        if scores['LD'] < 40:
+            recommendations.append({
+                "dimension": "LD",
+                "priority": "high",
+                "title": "Develop Leadership Skills",
+                "description": "Leadership score indicates need for development in decision-making and team guidance.",
+                "actions": [
+                    "Enroll in strategic leadership course",
+                    "Find leadership mentor",
+                    "Practice leading small project teams"
+                ]
+            })
+        
+        if scores['CT'] < 40:
+            recommendations.append({
+                "dimension": "CT", 
+                "priority": "high",
+                "title": "Enhance Critical Thinking",
+                "description": "Critical thinking skills need development for better analysis and decision-making.",
+                "actions": [
+                    "Read books on critical thinking",
+                    "Practice analyzing complex case studies",
+                    "Train on detecting cognitive biases"
+                ]
+            })
+        
+        if scores['Psy'] < 40:
+            recommendations.append({
+                "dimension": "Psy",
+                "priority": "medium", 
+                "title": "Build Psychological Resilience",
+                "description": "Psychological resilience can be enhanced for better stress management.",
+                "actions": [
+                    "Practice mindfulness and meditation",
+                    "Develop emotional intelligence skills",
+                    "Learn stress management techniques"
+                ]
+            })
+
+        if scores['TR'] < 40:
+            recommendations.append({
+                "dimension": "TR",
+                "priority": "medium",
+                "title": "Improve Team Collaboration",
+                "description": "Team role effectiveness needs enhancement for better collaboration.",
+                "actions": [
+                    "Take team role assessment",
+                    "Participate in team-building activities",
+                    "Learn conflict resolution techniques"
+                ]
+            })
+        
+        if self.action_catalog is not None:
+            for rec in recommendations:
+                rec["actions"] = self.action_catalog.titles(rec["dimension"], scores[rec["dimension"]]) or rec["actions"]
+        
+        return recommendations
+
+    def create_executive_dashboard(self, scores: Dict[str, float], user_id: str,
+                                   response_quality: Dict = None, confidence_intervals: Dict = None) -> Dict:
+        """Create comprehensive executive dashboard"""
+        score_analysis = {}
+        for dim, score in scores.items():
+            if dim not in self.measured_dimensions:
+                score_analysis[dim] = {
+                    "score": score,
+                    "level": "Not Measured",
+                    "color": "⚪",
+                    "description": f"{self.dimensions[dim]}: not measured by this question bank"
+                }
+                continue
+            if score < 40:
+                level = "Low"
+                color = "🔴"
+            elif score < 70:
+                level = "Medium" 
+                color = "🟡"
+            else:
+                level = "High"
+                color = "🟢"
+            
+            score_analysis[dim] = {
+                "score": score,
+                "level": level,
+                "color": color,
+                "description": f"{self.dimensions[dim]}: {level} ({score:.1f}/100)"
+            }
+        
+        sorted_scores = sorted(((dim, score) for dim, score in scores.items() if dim in self.measured_dimensions),
+                               key=lambda x: x[1], reverse=True)
+        top_3 = sorted_scores[:3]
+        bottom_3 = sorted_scores[-3:]
+        
+        dashboard = {
+            "user_id": user_id,
+            "report_date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "overall_score": self.overall_score(scores),
+            "dimension_scores": score_analysis,
+            "top_strengths": [
+                {
+                    "dimension": dim,
+                    "name": self.dimensions[dim],
+                    "score": score,
+                    "interpretation": self._get_interpretation(dim, score)
+                } for dim, score in top_3
+            ],
+            "development_areas": [
+                {
+                    "dimension": dim, 
+                    "name": self.dimensions[dim],
+                    "score": score,
+                    "recommendations": self._get_development_recommendations(dim, score)
+                } for dim, score in bottom_3
+            ],
+            "leadership_style": self._analyze_leadership_style(scores),
+            "innovation_potential": self._calculate_innovation_potential(scores),
+            "correlation_adjustments": self.adjustment_version()
+        }
+        
+        if response_quality is not None:
+            dashboard["response_quality"] = response_quality
+        
+        if confidence_intervals is not None:
+            dashboard["confidence_intervals"] = confidence_intervals
+        
+        if self.archetypes is not None:
+            dashboard["archetype"] = self.archetypes.describe(scores)
+        
+        if self.action_catalog is not None:
+            dashboard["recommended_actions"] = self.action_catalog.recommend(
+                scores, dimensions=[dim for dim, _ in reversed(bottom_3)])
+        
+        return dashboard
+
+    def _get_interpretation(self, dimension: str, score: float) -> str:
+        interpretations = {
+            'LD': {
+                'low': 'Cautious leadership style, needs to develop confidence in decision-making',
+                'medium': 'Balanced leader, can improve influence and guidance skills',
+                'high': 'Inspiring leader with clear vision and ability to motivate teams'
+            },
+            'CT': {
+                'low': 'Tends toward superficial acceptance, needs to develop critical analysis',
+                'medium': 'Capable of analysis in familiar contexts, needs to broaden thinking scope',
+                'high': 'Excellent analyst, detects biases and offers innovative problem solutions'
+            },
+            'Psy': {
+                'low': 'Needs to enhance psychological resilience and stress management',
+                'medium': 'Psychologically balanced, can improve handling change',
+                'high': 'Psychologically resilient, quickly adapts to challenges and difficult conditions'
+            }
+        }
+        
+        level = 'low' if score < 40 else 'medium' if score < 70 else 'high'
+        return interpretations.get(dimension, {}).get(level, 'Strong capabilities in this area')
+
+    def _get_development_recommendations(self, dimension: str, score: float) -> List[str]:
+        if self.action_catalog is not None:
+            titles = self.action_catalog.titles(dimension, score)
+            if titles:
+                return titles
+        recommendations = {
+            'LD': [
+                'Situational Leadership workshops',
+                'Decision-making training',
+                'Influence and persuasion exercises'
+            ],
+            'CT': [
+                'Critical thinking courses',
+                'Case study analysis exercises',
+                'Bias detection training'
+            ],
+            'Psy': [
+                'Resilience enhancement programs',
+                'Stress management training',
+                'Emotional intelligence exercises'
+            ]
+        }
+        return recommendations.get(dimension, ['Professional development programs'])
+
+    def _analyze_leadership_style(self, scores: Dict[str, float]) -> str:
+        if scores['LD'] > 70 and scores['CT'] > 60:
+            return "Strategic Leader: Combines vision with precise analysis"
+        elif scores['LD'] > 70 and scores['Psy'] > 70:
+            return "Inspirational Leader: Focuses on motivating teams and building relationships"
+        elif scores['CT'] > 70 and scores['LT'] > 70:
+            return "Analytical Leader: Relies on data and logic in leadership"
+        else:
+            return "Balanced Leader: Combines multiple leadership approaches"
+
+    def _calculate_innovation_potential(self, scores: Dict[str, float]) -> float:
+        innovation_score = (
+            scores['CT'] * 0.3 +
+            scores['Psy'] * 0.3 + 
+            scores['LD'] * 0.2 +
+            scores['Cog'] * 0.2
+        )
+        return innovation_score
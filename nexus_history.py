@@ -0,0 +1,199 @@
+# nexus_history.py
+"""Append-only per-user score history for repeat assessments.
+
+Each user has one file of fixed-size records behind a small header naming the
+dimensions. A record is a uint32 Unix timestamp, a keyframe flag, the
+cross-dimension adjustment set the scores were computed with (int32: 0 for
+the fixed rules, n for learned version n, -1 if not known) and one byte per
+dimension in half-point units:
+
+- keyframe: the absolute score as uint8 (0-200 half points)
+- delta: the change from the previous assessment as int8 (±63.5 points)
+
+A keyframe is written for the first assessment, every ``KEYFRAME_EVERY``
+records, and whenever a change is too large for a delta, so a user's history
+costs a few bytes per assessment. Deltas are taken against the previously
+stored (quantized) scores, so decoding is exact. Reading a history is one
+file read and a segmented cumulative sum.
+
+Files are sharded into subdirectories by a hash of the user id.
+"""
+import hashlib
+import json
+import os
+import struct
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are not serialized across processes
+    fcntl = None
+
+MAGIC = b"NXH2"
+SCALE = 2  # stored units per score point
+FIXED_ADJUSTMENTS = 0
+UNKNOWN_ADJUSTMENTS = -1
+KEYFRAME_EVERY = 16
+SECONDS_PER_DAY = 86_400
+
+
+def record_dtype(n_dims: int) -> np.dtype:
+    return np.dtype([("ts", "<u4"), ("keyframe", "u1"), ("adjustment", "<i4"), ("values", "u1", (n_dims,))])
+
+
+def adjustment_code(version: Union[int, str, None]) -> int:
+    """Stored form of an engine's ``adjustment_version()``"""
+    if version is None:
+        return UNKNOWN_ADJUSTMENTS
+    return FIXED_ADJUSTMENTS if version == "fixed" else int(version)
+
+
+def adjustment_label(code: int) -> Union[int, str, None]:
+    """Inverse of :func:`adjustment_code`"""
+    if code == UNKNOWN_ADJUSTMENTS:
+        return None
+    return "fixed" if code == FIXED_ADJUSTMENTS else int(code)
+
+
+class HistoryStore:
+    """Directory of per-user append-only score histories"""
+
+    def __init__(self, directory: str, dimension_keys: Sequence[str]):
+        self.directory = directory
+        self.dimension_keys = list(dimension_keys)
+        self.dtype = record_dtype(len(self.dimension_keys))
+        header_json = json.dumps(self.dimension_keys).encode()
+        self.header = MAGIC + struct.pack("<H", len(header_json)) + header_json
+
+    def path(self, user_id: str) -> str:
+        digest = hashlib.sha1(str(user_id).encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.nxh")
+
+    def _read_records(self, path: str) -> np.ndarray:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        if not data:
+            return np.empty(0, dtype=self.dtype)
+        if not data.startswith(self.header):
+            raise ValueError(f"{path} was written for different dimensions or is not a history file")
+        body = data[len(self.header):]
+        # A torn trailing record from an interrupted append is ignored
+        usable = len(body) - len(body) % self.dtype.itemsize
+        return np.frombuffer(body[:usable], dtype=self.dtype)
+
+    def _decode(self, records: np.ndarray) -> np.ndarray:
+        """Absolute scores in stored units, shape (assessments, dims)"""
+        keyframe = records["keyframe"].astype(bool)
+        step = np.where(keyframe[:, None], records["values"].astype(np.int32),
+                        records["values"].view(np.int8).astype(np.int32))
+        running = np.cumsum(step, axis=0)
+        # Restart the running sum at each keyframe
+        segment = np.cumsum(keyframe) - 1
+        starts = np.flatnonzero(keyframe)
+        return running - (running[starts] - step[starts])[segment]
+
+    def append(self, user_id: str, scores: Dict[str, float], timestamp: Optional[float] = None,
+               adjustment_version: Union[int, str, None] = None):
+        """Add one assessment to ``user_id``'s history
+
+        ``adjustment_version`` is the engine's ``adjustment_version()`` the
+        scores were computed with.
+        """
+        path = self.path(user_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        quantized = np.clip(np.rint(np.array([scores[d] for d in self.dimension_keys]) * SCALE), 0, 100 * SCALE)
+        record = np.zeros(1, dtype=self.dtype)
+        record["ts"] = int(timestamp if timestamp is not None else time.time())
+        record["adjustment"] = adjustment_code(adjustment_version)
+
+        with open(path, "ab") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                records = self._read_records(path)
+                since_keyframe = len(records) - 1 - np.flatnonzero(records["keyframe"])[-1] if len(records) else 0
+                delta = quantized - self._decode(records)[-1] if len(records) else None
+                if delta is None or since_keyframe + 1 >= KEYFRAME_EVERY or np.abs(delta).max() > 127:
+                    record["keyframe"] = 1
+                    record["values"] = quantized.astype(np.uint8)
+                else:
+                    record["values"] = delta.astype(np.int8).view(np.uint8)
+                if f.tell() == 0:
+                    f.write(self.header)
+                f.write(record.tobytes())
+                f.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def scan(self, since: float = 0, until: Optional[float] = None, chunk_size: int = 100_000) -> Iterator[np.ndarray]:
+        """Scores of every user's assessments timestamped after ``since`` and up to ``until``
+
+        Yields (rows, dims) chunks of about ``chunk_size`` rows. Files not
+        modified since ``since`` cannot hold newer records and are not read.
+        """
+        until = time.time() if until is None else until
+        pending = []
+        rows = 0
+        try:
+            shards = sorted(entry.path for entry in os.scandir(self.directory) if entry.is_dir())
+        except FileNotFoundError:
+            return
+        for shard in shards:
+            for entry in os.scandir(shard):
+                if not entry.name.endswith(".nxh") or entry.stat().st_mtime < since:
+                    continue
+                records = self._read_records(entry.path)
+                window = (records["ts"] > since) & (records["ts"] <= until)
+                if not window.any():
+                    continue
+                pending.append(self._decode(records)[window].astype(np.float32) / SCALE)
+                rows += len(pending[-1])
+                if rows >= chunk_size:
+                    yield np.concatenate(pending)
+                    pending, rows = [], 0
+        if pending:
+            yield np.concatenate(pending)
+
+    def _unpack(self, records: np.ndarray):
+        if not len(records):
+            return np.empty(0, dtype=np.int64), np.empty((0, len(self.dimension_keys)), dtype=np.float32)
+        return records["ts"].astype(np.int64), self._decode(records).astype(np.float32) / SCALE
+
+    def read(self, user_id: str):
+        """``(timestamps, scores)``: Unix seconds (n,) and scores (n, dims) in score points"""
+        return self._unpack(self._read_records(self.path(user_id)))
+
+    def adjustment_versions(self, user_id: str) -> List[Union[int, str, None]]:
+        """Adjustment set of each assessment in ``user_id``'s history; None where it was not recorded"""
+        return [adjustment_label(code) for code in self._read_records(self.path(user_id))["adjustment"].tolist()]
+
+    def trajectory(self, user_id: str) -> Dict:
+        """History with per-assessment deltas and per-dimension least-squares trend lines"""
+        records = self._read_records(self.path(user_id))
+        timestamps, scores = self._unpack(records)
+        n = len(timestamps)
+        deltas = np.diff(scores, axis=0) if n else scores
+        if n >= 2 and timestamps[-1] > timestamps[0]:
+            days = (timestamps - timestamps[0]) / SECONDS_PER_DAY
+            centered = days - days.mean()
+            slope = centered @ (scores - scores.mean(axis=0)) / (centered @ centered)
+            trend_line = scores.mean(axis=0) + np.outer(centered, slope)
+        else:
+            slope = np.zeros(len(self.dimension_keys))
+            trend_line = scores
+        return {
+            "dates": [datetime.fromtimestamp(int(t)) for t in timestamps],
+            "scores": scores,
+            "deltas": deltas,
+            "trend_per_30_days": dict(zip(self.dimension_keys, (slope * 30).round(2).tolist())),
+            "trend_line": trend_line,
+            "adjustments": [adjustment_label(code) for code in records["adjustment"].tolist()],
+        }
@@ -0,0 +1,260 @@
+# nexus_item_analysis.py
+"""Classical test statistics for the question bank from mergeable sums.
+
+A question's item score on a dimension is the weight its chosen option puts
+on that dimension; a dimension's scale is the questions with any option
+touching it. Everything the statistics need is kept as sums over
+respondents:
+
+    option_counts  (questions, options)             how often each option was chosen
+    n              ()                               complete responses
+    item_sums      (dims, questions)                sum of item scores
+    cross          (dims, questions, questions)     sum of item score products
+
+These add across batches, shards and processes, so the statistics update as
+each response arrives and never rescan history. From them come option
+selection rates, corrected item-total (item-rest) correlations and
+Cronbach's alpha per dimension.
+
+    python nexus_item_analysis.py cohort.parquet --save stats.npz
+"""
+import argparse
+import atexit
+import hashlib
+import os
+import socket
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from nexus_engine import NexusInsightAssessment
+
+
+def bank_fingerprint(engine: NexusInsightAssessment) -> str:
+    """Hash of the weights the statistics depend on; stats from different banks do not merge"""
+    digest = hashlib.sha1(engine.weight_tensor.tobytes())
+    digest.update(",".join(engine.dimension_keys).encode())
+    return digest.hexdigest()[:16]
+
+
+class ItemStats:
+    """Mergeable sufficient statistics for item analysis"""
+
+    def __init__(self, engine: NexusInsightAssessment):
+        self.engine = engine
+        self.fingerprint = bank_fingerprint(engine)
+        n_q, n_o, n_d = engine.weight_tensor.shape
+        self.option_counts = np.zeros((n_q, n_o), dtype=np.int64)
+        self.n = 0
+        self.item_sums = np.zeros((n_d, n_q), dtype=np.float64)
+        self.cross = np.zeros((n_d, n_q, n_q), dtype=np.float64)
+        # Questions belonging to each dimension's scale, (dims, questions)
+        self.scale_items = engine.touch_tensor.any(axis=1).T
+
+    def add_batch(self, choices: np.ndarray, chunk_size: int = 200_000):
+        """Accumulate a (respondents, questions) choice matrix with -1 for unanswered"""
+        choices = np.asarray(choices)
+        n_q, n_o, _ = self.engine.weight_tensor.shape
+        for start in range(0, len(choices), chunk_size):
+            block = choices[start:start + chunk_size]
+            answered = block >= 0
+            rows, questions = np.nonzero(answered)
+            flat = questions * n_o + block[rows, questions]
+            self.option_counts += np.bincount(flat, minlength=n_q * n_o).reshape(n_q, n_o)
+
+            # Reliability statistics use complete responses only
+            complete = block[answered.all(axis=1)].astype(np.intp)
+            if not len(complete):
+                continue
+            # (dims, n, questions) so the cross-products are one batched matrix product
+            items = np.ascontiguousarray(
+                self.engine.weight_tensor[np.arange(n_q), complete].transpose(2, 0, 1), dtype=np.float64)
+            self.n += len(complete)
+            self.item_sums += items.sum(axis=1)
+            self.cross += items.transpose(0, 2, 1) @ items
+
+    def add(self, choices_row: np.ndarray):
+        """Accumulate one response as it is submitted"""
+        self.add_batch(np.asarray(choices_row)[None, :])
+
+    def merge(self, other: "ItemStats") -> "ItemStats":
+        if other.fingerprint != self.fingerprint:
+            raise ValueError("Cannot merge item statistics gathered against a different question bank")
+        self.option_counts += other.option_counts
+        self.n += other.n
+        self.item_sums += other.item_sums
+        self.cross += other.cross
+        return self
+
+    def option_rates(self) -> np.ndarray:
+        """(questions, options) share of answers choosing each option"""
+        totals = self.option_counts.sum(axis=1, keepdims=True)
+        return np.divide(self.option_counts, totals, out=np.zeros(self.option_counts.shape), where=totals > 0)
+
+    def covariance(self) -> np.ndarray:
+        """(dims, questions, questions) sample covariance of item scores"""
+        if self.n < 2:
+            return np.full(self.cross.shape, np.nan)
+        mean = self.item_sums / self.n
+        return (self.cross - self.n * mean[:, :, None] * mean[:, None, :]) / (self.n - 1)
+
+    def item_rest_correlations(self) -> np.ndarray:
+        """(dims, questions) correlation of each item with the rest of its dimension's scale
+
+        NaN for items outside the scale or with no variance.
+        """
+        cov = self.covariance() * self.scale_items[:, :, None] * self.scale_items[:, None, :]
+        item_var = np.diagonal(cov, axis1=1, axis2=2)
+        total_var = cov.sum(axis=(1, 2))[:, None]
+        item_total_cov = cov.sum(axis=2)
+        rest_var = total_var - 2 * item_total_cov + item_var
+        rest_cov = item_total_cov - item_var
+        denom = np.sqrt(item_var * rest_var)
+        valid = self.scale_items & (denom > 1e-12)
+        return np.divide(rest_cov, denom, out=np.full(item_var.shape, np.nan), where=valid)
+
+    def cronbach_alpha(self) -> np.ndarray:
+        """(dims,) Cronbach's alpha of each dimension's scale; NaN with fewer than two items"""
+        cov = self.covariance() * self.scale_items[:, :, None] * self.scale_items[:, None, :]
+        k = self.scale_items.sum(axis=1)
+        item_var = np.diagonal(cov, axis1=1, axis2=2).sum(axis=1)
+        total_var = cov.sum(axis=(1, 2))
+        valid = (k >= 2) & (total_var > 1e-12)
+        ratio = np.divide(item_var, total_var, out=np.zeros(len(k)), where=valid)
+        return np.where(valid, k / np.maximum(k - 1, 1) * (1 - ratio), np.nan)
+
+    def report(self) -> Dict:
+        """Per-dimension alpha and per-question option rates and item-rest correlations"""
+        keys = self.engine.dimension_keys
+        alpha = self.cronbach_alpha()
+        correlations = self.item_rest_correlations()
+        rates = self.option_rates()
+        return {
+            "responses": self.n,
+            "alpha": {d: alpha[i] for i, d in enumerate(keys)},
+            "scale_items": {d: int(self.scale_items[i].sum()) for i, d in enumerate(keys)},
+            "questions": [
+                {
+                    "question": q["id"],
+                    "answers": int(self.option_counts[qi].sum()),
+                    "option_rates": rates[qi, :len(q["options"])].tolist(),
+                    "item_rest": {d: correlations[i, qi] for i, d in enumerate(keys) if self.scale_items[i, qi]},
+                }
+                for qi, q in enumerate(self.engine.questions)
+            ],
+        }
+
+    def save(self, path: str):
+        """Atomically write the statistics to ``path`` (.npz)"""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, fingerprint=np.array(self.fingerprint), option_counts=self.option_counts,
+                 n=np.array(self.n), item_sums=self.item_sums, cross=self.cross)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def read_fingerprint(path: str) -> str:
+        with np.load(path) as data:
+            return str(data["fingerprint"])
+
+    @classmethod
+    def load(cls, path: str, engine: NexusInsightAssessment) -> "ItemStats":
+        stats = cls(engine)
+        with np.load(path) as data:
+            if str(data["fingerprint"]) != stats.fingerprint:
+                raise ValueError(f"{path} was gathered against a different question bank")
+            stats.option_counts[...] = data["option_counts"]
+            stats.n = int(data["n"])
+            stats.item_sums[...] = data["item_sums"]
+            stats.cross[...] = data["cross"]
+        return stats
+
+    @classmethod
+    def merge_files(cls, paths: Iterable[str], engine: NexusInsightAssessment) -> "ItemStats":
+        merged = cls(engine)
+        for path in paths:
+            merged.merge(cls.load(path, engine))
+        return merged
+
+
+class ItemStatsAggregator:
+    """Process-wide item statistics checkpointed as a shard other processes can merge"""
+
+    def __init__(self, engine: NexusInsightAssessment, directory: str = "item_stats",
+                 flush_every: int = 50, flush_seconds: float = 60.0):
+        self.engine = engine
+        self.stats = ItemStats(engine)
+        self.directory = directory
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.shard_path = os.path.join(directory, f"{socket.gethostname()}-{os.getpid()}.npz")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        # A shard left by an earlier process with this name under another bank is overwritten
+        if os.path.exists(self.shard_path) and ItemStats.read_fingerprint(self.shard_path) == self.stats.fingerprint:
+            self.stats.merge(ItemStats.load(self.shard_path, engine))
+        atexit.register(self.flush)
+
+    def record(self, choices_row: np.ndarray):
+        """Record a completed response, checkpointing the shard now and then"""
+        with self._lock:
+            self.stats.add(choices_row)
+            self._pending += 1
+            if self._pending >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self.stats.save(self.shard_path)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def merged(self) -> ItemStats:
+        """This process's live statistics merged with every other process's latest shard"""
+        others = [
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.endswith(".npz") and not name.endswith(".tmp.npz")
+            and os.path.join(self.directory, name) != self.shard_path
+        ]
+        # Shards gathered before a bank edit describe other items and are left out
+        others = [path for path in others if ItemStats.read_fingerprint(path) == self.stats.fingerprint]
+        merged = ItemStats.merge_files(others, self.engine)
+        with self._lock:
+            return merged.merge(self.stats)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Item analysis over a cohort Parquet file")
+    parser.add_argument("parquet", nargs="+", help="cohort files with q{id} choice columns")
+    parser.add_argument("--save", help="write the merged statistics to this .npz shard")
+    args = parser.parse_args(argv)
+
+    import pyarrow.parquet as pq
+
+    engine = NexusInsightAssessment()
+    columns = [f"q{q['id']}" for q in engine.questions]
+    stats = ItemStats(engine)
+    for path in args.parquet:
+        for batch in pq.ParquetFile(path).iter_batches(columns=columns, batch_size=500_000):
+            stats.add_batch(np.column_stack([batch.column(c).to_numpy() for c in columns]).astype(np.int8))
+    if args.save:
+        stats.save(args.save)
+
+    report = stats.report()
+    print(f"{report['responses']} complete responses")
+    for dim, alpha in report["alpha"].items():
+        print(f"  {dim:<4} alpha {alpha:6.3f}  ({report['scale_items'][dim]} items)")
+    for row in report["questions"]:
+        rates = " ".join(f"{r:.2f}" for r in row["option_rates"])
+        item_rest = " ".join(f"{d}={r:.2f}" for d, r in row["item_rest"].items())
+        print(f"  Q{row['question']:<3} rates [{rates}]  item-rest {item_rest}")
+
+
+if __name__ == "__main__":
+    main()
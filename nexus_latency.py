@@ -0,0 +1,198 @@
+# nexus_latency.py
+"""Per-question, per-option dwell-time analytics with mergeable fixed-memory histograms.
+
+Every answer lands in one of ``N_BINS`` log-spaced bins for its question and
+chosen option, so the whole aggregate is a small (questions, options, bins)
+count array no matter how many answers have been seen. Counts add, so shards
+written by different worker processes merge by summation, and percentiles are
+read straight off the cumulative counts without touching raw responses.
+
+Histograms carry the fingerprint of the question bank they were gathered
+against (see ``nexus_item_analysis.bank_fingerprint``); counts from different
+banks do not merge.
+"""
+import atexit
+import os
+import socket
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+MIN_SECONDS = 0.25
+MAX_SECONDS = 3600.0
+N_BINS = 96
+
+# Bin 0 catches everything below MIN_SECONDS, the last bin everything above MAX_SECONDS
+BIN_EDGES = np.concatenate([[0.0], np.geomspace(MIN_SECONDS, MAX_SECONDS, N_BINS - 1), [np.inf]])
+
+
+class LatencyHistogram:
+    """Fixed-memory dwell-time histograms for every (question, option) pair"""
+
+    def __init__(self, n_questions: int, n_options: int, fingerprint: str = ""):
+        self.counts = np.zeros((n_questions, n_options, N_BINS), dtype=np.int64)
+        self.fingerprint = fingerprint
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def add(self, question_index: int, option_index: int, seconds: float):
+        """Record one answer"""
+        bin_index = min(int(np.searchsorted(BIN_EDGES, seconds, side="right")) - 1, N_BINS - 1)
+        self.counts[question_index, option_index, max(bin_index, 0)] += 1
+
+    def add_batch(self, choices: np.ndarray, dwell: np.ndarray):
+        """Record a batch; ``choices`` is (n, questions) with -1 unanswered, ``dwell`` NaN when unknown"""
+        valid = (choices >= 0) & ~np.isnan(dwell)
+        rows, questions = np.nonzero(valid)
+        options = choices[rows, questions].astype(np.int64)
+        bins = np.clip(np.searchsorted(BIN_EDGES, dwell[rows, questions], side="right") - 1, 0, N_BINS - 1)
+        n_q, n_o, n_b = self.counts.shape
+        flat = (questions * n_o + options) * n_b + bins
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add another histogram's counts into this one"""
+        if other.fingerprint != self.fingerprint:
+            raise ValueError("Cannot merge dwell times gathered against a different question bank")
+        if other.counts.shape != self.counts.shape:
+            raise ValueError(f"Cannot merge histograms of shape {other.counts.shape} into {self.counts.shape}")
+        self.counts += other.counts
+        return self
+
+    @staticmethod
+    def _quantiles(counts: np.ndarray, probs: Sequence[float]) -> np.ndarray:
+        """Quantiles of the last axis, interpolating geometrically inside the bin"""
+        cumulative = np.cumsum(counts, axis=-1)
+        total = cumulative[..., -1:]
+        out = np.full(counts.shape[:-1] + (len(probs),), np.nan)
+        lower = np.maximum(BIN_EDGES[:-1], MIN_SECONDS / 2)
+        upper = np.minimum(BIN_EDGES[1:], MAX_SECONDS * 2)
+        for i, p in enumerate(probs):
+            target = p * total
+            bins = np.minimum((cumulative < target).sum(axis=-1, keepdims=True), N_BINS - 1)
+            before = np.take_along_axis(cumulative, bins, -1) - np.take_along_axis(counts, bins, -1)
+            in_bin = np.take_along_axis(counts, bins, -1)
+            frac = np.divide(target - before, in_bin, out=np.zeros(in_bin.shape), where=in_bin > 0)
+            lo, hi = lower[bins], upper[bins]
+            value = lo * (hi / lo) ** np.clip(frac, 0, 1)
+            out[..., i] = np.where(total > 0, value, np.nan)[..., 0]
+        return out
+
+    def question_quantiles(self, probs: Sequence[float] = (0.5, 0.95)) -> np.ndarray:
+        """(questions, len(probs)) dwell quantiles over all options"""
+        return self._quantiles(self.counts.sum(axis=1), probs)
+
+    def option_quantiles(self, probs: Sequence[float] = (0.5, 0.95)) -> np.ndarray:
+        """(questions, options, len(probs)) dwell quantiles per chosen option"""
+        return self._quantiles(self.counts, probs)
+
+    def summary(self, question_ids: Sequence[int], probs: Sequence[float] = (0.5, 0.95)) -> List[Dict]:
+        """Per-question rows with answer counts and quantiles, overall and per option"""
+        overall = self.question_quantiles(probs)
+        per_option = self.option_quantiles(probs)
+        option_counts = self.counts.sum(axis=2)
+        rows = []
+        for qi, q_id in enumerate(question_ids):
+            row = {"question": q_id, "answers": int(option_counts[qi].sum())}
+            row.update({f"p{round(p * 100)}_s": overall[qi, i] for i, p in enumerate(probs)})
+            row["options"] = [
+                {"option": oi, "answers": int(option_counts[qi, oi]),
+                 **{f"p{round(p * 100)}_s": per_option[qi, oi, i] for i, p in enumerate(probs)}}
+                for oi in range(self.counts.shape[1])
+            ]
+            rows.append(row)
+        return rows
+
+    def save(self, path: str):
+        """Atomically write the counts to ``path`` (.npz)"""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, counts=self.counts, edges=BIN_EDGES, fingerprint=np.array(self.fingerprint))
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def read_fingerprint(path: str) -> str:
+        with np.load(path) as data:
+            return str(data["fingerprint"]) if "fingerprint" in data.files else ""
+
+    @classmethod
+    def load(cls, path: str, fingerprint: Optional[str] = None) -> "LatencyHistogram":
+        """Read a shard, checking it was gathered against the ``fingerprint`` bank when given"""
+        with np.load(path) as data:
+            if not np.array_equal(data["edges"], BIN_EDGES):
+                raise ValueError(f"{path} was written with different histogram bins")
+            stored = str(data["fingerprint"]) if "fingerprint" in data.files else ""
+            if fingerprint is not None and stored != fingerprint:
+                raise ValueError(f"{path} was gathered against a different question bank")
+            hist = cls(*data["counts"].shape[:2], fingerprint=stored)
+            hist.counts[...] = data["counts"]
+        return hist
+
+    @classmethod
+    def merge_files(cls, paths: Iterable[str], n_questions: int, n_options: int,
+                    fingerprint: str = "") -> "LatencyHistogram":
+        merged = cls(n_questions, n_options, fingerprint)
+        for path in paths:
+            merged.merge(cls.load(path, fingerprint))
+        return merged
+
+
+class LatencyAggregator:
+    """Process-wide histogram that checkpoints itself as a shard other processes can merge
+
+    Each app process owns one shard file in ``directory``; the admin view merges
+    every shard, which costs a few kilobytes per process however many answers
+    have been recorded.
+    """
+
+    def __init__(self, n_questions: int, n_options: int, directory: str = "latency_stats",
+                 flush_every: int = 200, flush_seconds: float = 30.0, fingerprint: str = ""):
+        self.histogram = LatencyHistogram(n_questions, n_options, fingerprint)
+        self.fingerprint = fingerprint
+        self.directory = directory
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.shard_path = os.path.join(directory, f"{socket.gethostname()}-{os.getpid()}.npz")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.shard_path) and LatencyHistogram.read_fingerprint(self.shard_path) == fingerprint:
+            self.histogram.merge(LatencyHistogram.load(self.shard_path, fingerprint))
+        atexit.register(self.flush)
+
+    def record(self, question_index: int, option_index: int, seconds: float):
+        """Record an answer as it arrives, checkpointing the shard now and then"""
+        with self._lock:
+            self.histogram.add(question_index, option_index, seconds)
+            self._pending += 1
+            if self._pending >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self.histogram.save(self.shard_path)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def merged(self) -> LatencyHistogram:
+        """This process's live counts merged with every other process's latest shard
+
+        Shards left from before a bank edit are skipped rather than mixed in.
+        """
+        shape = self.histogram.counts.shape[:2]
+        others = [
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.endswith(".npz") and not name.endswith(".tmp.npz")
+            and os.path.join(self.directory, name) != self.shard_path
+        ]
+        others = [path for path in others if LatencyHistogram.read_fingerprint(path) == self.fingerprint]
+        merged = LatencyHistogram.merge_files(others, *shape, fingerprint=self.fingerprint)
+        with self._lock:
+            return merged.merge(self.histogram)
@@ -0,0 +1,376 @@
+# nexus_load_test.py
+"""Concurrent-session load test harness for the Nexus Insight Streamlit app.
+
+Drives the real app script headlessly through Streamlit's ``AppTest`` and
+simulates candidates clicking through the whole assessment:
+
+    python nexus_load_test.py --sessions 2000 --concurrency 500 --workers 4 --think-scale 0.05
+
+Each worker process plays the role of one server process: it keeps up to
+``concurrency`` sessions alive and interleaves their script runs on a single
+thread, the same way the GIL serializes script runs inside a Streamlit server.
+Latency is the script run time of each step, scheduling lag is how late a step
+started compared to when the candidate clicked, and RSS is sampled per worker.
+
+The app writes to scratch stores (see ``nexus_apptest``) during the test,
+so simulated candidates are not added to the real statistics, histories or
+sessions.
+
+AppTest re-fires buttons across ``st.rerun()`` before Streamlit 1.33, which
+is why requirements.txt pins 1.33.
+"""
+import argparse
+import heapq
+import json
+import os
+import re
+import resource
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from nexus_apptest import APP_SCRIPT, scratch_stores, settle_widgets
+
+# Median think time in seconds before each step, scaled by --think-scale
+THINK_TIMES = {
+    "home": 0.0,
+    "start": 6.0,
+    "open_assessment": 2.0,
+    "question": 25.0,
+    "results": 3.0,
+}
+
+MAX_QUESTIONS = 100
+QUESTION_HEADING = re.compile(r"Question (\d+) of \d+")
+
+
+def read_rss_mb() -> float:
+    """Current resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        # No procfs (macOS): fall back to the peak RSS, reported in bytes there
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 20
+
+
+class RssSampler(threading.Thread):
+    """Background sampler recording process RSS over time"""
+
+    def __init__(self, t0: float, interval: float = 1.0):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples: List[tuple] = []
+        self._t0 = t0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.samples.append((time.time() - self._t0, read_rss_mb()))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.samples.append((time.time() - self._t0, read_rss_mb()))
+
+
+class CandidateSession:
+    """One simulated candidate clicking through the app"""
+
+    def __init__(self, session_no: int, think_scale: float, seed: int, timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.session_no = session_no
+        self.think_scale = think_scale
+        self.rng = np.random.default_rng([seed, session_no])
+        self.at = AppTest.from_file(APP_SCRIPT, default_timeout=timeout)
+        self.step = "home"
+        self.timings: List[tuple] = []
+
+    def think_time(self, step_kind: str) -> float:
+        median = THINK_TIMES[step_kind] * self.think_scale
+        return float(self.rng.lognormal(np.log(median), 0.5)) if median > 0 else 0.0
+
+    def _timed(self, action):
+        start = time.perf_counter()
+        try:
+            action()
+        finally:
+            self.timings.append((self.step, time.perf_counter() - start))
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+
+    def _button(self, label: str):
+        return next(b for b in self.at.button if b.label == label)
+
+    def _navigate(self, page: str):
+        settle_widgets(self.at)
+        self.at.sidebar.radio[0].set_value(page).run()
+
+    # Progress may have been spilled to disk while the session was idle, so go by the rendered
+    # page. After the last answer AppTest's tree still holds that question's elements from the
+    # run st.rerun() interrupted; the completion message is what the final run itself renders.
+    def _completed(self) -> bool:
+        return any(s.value.startswith("Assessment completed!") for s in self.at.success)
+
+    def _question_shown(self) -> Optional[int]:
+        for element in self.at.markdown:
+            match = QUESTION_HEADING.fullmatch(element.value)
+            if match:
+                return int(match.group(1))
+        return None
+
+    def _answer_current_question(self):
+        radio = next(r for r in self.at.radio if r.key and r.key.startswith("q_"))
+        radio.set_value(int(self.rng.integers(len(radio.options))))
+        self._button("Next →").click().run()
+
+    def steps(self) -> Iterator[float]:
+        """Yield the think time before each step; resuming performs the step
+
+        Home → Start → Assessment → every Next → Results
+        """
+        at = self.at
+        self._timed(at.run)
+
+        self.step = "start"
+        yield self.think_time("start")
+        self._timed(lambda: self._button("Start Your Assessment Journey").click().run())
+
+        self.step = "open_assessment"
+        yield self.think_time("open_assessment")
+        self._timed(lambda: self._navigate("Assessment"))
+
+        answered = 0
+        while not self._completed():
+            question_no = self._question_shown()
+            if question_no is None:
+                raise RuntimeError("the Assessment page shows neither a question nor completion")
+            answered += 1
+            if answered > MAX_QUESTIONS:
+                raise RuntimeError(f"assessment did not complete after {MAX_QUESTIONS} answers")
+            self.step = f"q{question_no:02d}"
+            yield self.think_time("question")
+            self._timed(self._answer_current_question)
+            if not self._completed() and self._question_shown() == question_no:
+                raise RuntimeError(f"question {question_no} did not advance after answering")
+
+        self.step = "results"
+        yield self.think_time("results")
+        self._timed(lambda: self._navigate("Results"))
+
+
+def run_worker(first_session: int, sessions: int, concurrency: int, think_scale: float,
+               ramp_up: float, seed: int, timeout: float, rss_interval: float, t0: float) -> Dict:
+    """Simulate ``sessions`` candidates in this process, at most ``concurrency`` alive at once"""
+    arrivals = [t0 + ramp_up * i / max(sessions, 1) for i in range(sessions)]
+    next_arrival = 0
+    live: List[tuple] = []  # heap of (due time, session no, session, step iterator)
+    step_timings: Dict[str, List[float]] = {}
+    lags: List[float] = []
+    errors: List[Dict] = []
+    completed = 0
+
+    sampler = RssSampler(t0, rss_interval)
+    sampler.start()
+
+    def advance(session, step_iter, due):
+        nonlocal completed
+        lags.append(max(0.0, time.time() - due))
+        try:
+            delay = next(step_iter)
+        except StopIteration:
+            completed += 1
+            finish(session)
+            return
+        except Exception as exc:
+            errors.append({"session": session.session_no, "step": session.step, "error": repr(exc)})
+            finish(session)
+            return
+        heapq.heappush(live, (time.time() + delay, session.session_no, session, step_iter))
+
+    def finish(session):
+        for step, elapsed in session.timings:
+            step_timings.setdefault(step, []).append(elapsed)
+
+    while next_arrival < sessions or live:
+        now = time.time()
+        if next_arrival < sessions and len(live) < concurrency and arrivals[next_arrival] <= now:
+            session_no = first_session + next_arrival
+            session = CandidateSession(session_no, think_scale, seed, timeout)
+            next_arrival += 1
+            advance(session, session.steps(), now)
+            continue
+
+        waits = [live[0][0]] if live else []
+        if next_arrival < sessions and len(live) < concurrency:
+            waits.append(arrivals[next_arrival])
+        wait = min(waits) - now
+        if wait > 0:
+            time.sleep(wait)
+            continue
+
+        due, _, session, step_iter = heapq.heappop(live)
+        advance(session, step_iter, due)
+
+    sampler.stop()
+    return {
+        "completed": completed,
+        "step_timings": step_timings,
+        "lags": lags,
+        "errors": errors,
+        "rss_samples": sampler.samples,
+    }
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    arr = np.asarray(values) * 1000
+    p50, p90, p95, p99 = np.percentile(arr, [50, 90, 95, 99])
+    return {
+        "count": int(arr.size),
+        "mean_ms": float(arr.mean()),
+        "p50_ms": float(p50),
+        "p90_ms": float(p90),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(arr.max()),
+    }
+
+
+def _total_rss(worker_samples: List[List[tuple]], interval: float) -> np.ndarray:
+    """Sum per-worker RSS samples on a common time grid"""
+    end = max(s[-1][0] for s in worker_samples)
+    grid = np.arange(0.0, end + interval, interval)
+    total = np.zeros_like(grid)
+    for samples in worker_samples:
+        arr = np.asarray(samples)
+        total += np.interp(grid, arr[:, 0], arr[:, 1])
+    return np.column_stack([grid, total])
+
+
+def run_load_test(sessions: int, concurrency: int, workers: int = 1, think_scale: float = 1.0,
+                  ramp_up: float = 0.0, seed: int = 0, timeout: float = 60.0,
+                  rss_interval: float = 1.0) -> Dict:
+    """Run ``sessions`` simulated candidates spread over ``workers`` processes"""
+    per_worker = [sessions // workers + (i < sessions % workers) for i in range(workers)]
+    t0 = time.time()
+    args = [(sum(per_worker[:i]), n, max(1, concurrency // workers), think_scale, ramp_up, seed, timeout,
+             rss_interval, t0) for i, n in enumerate(per_worker)]
+
+    with scratch_stores():
+        if workers == 1:
+            results = [run_worker(*args[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(run_worker, *zip(*args)))
+    wall = time.time() - t0
+
+    step_timings: Dict[str, List[float]] = {}
+    for result in results:
+        for step, timings in result["step_timings"].items():
+            step_timings.setdefault(step, []).extend(timings)
+    all_runs = [t for timings in step_timings.values() for t in timings]
+    lags = [lag for result in results for lag in result["lags"]]
+    errors = [error for result in results for error in result["errors"]]
+    completed = sum(result["completed"] for result in results)
+
+    rss = _total_rss([result["rss_samples"] for result in results], rss_interval)
+    rss_growth_per_min = float(np.polyfit(rss[:, 0], rss[:, 1], 1)[0] * 60) if len(rss) > 2 else 0.0
+
+    return {
+        "config": {
+            "sessions": sessions,
+            "concurrency": concurrency,
+            "workers": workers,
+            "think_scale": think_scale,
+            "ramp_up": ramp_up,
+            "seed": seed,
+        },
+        "wall_time_s": wall,
+        "completed_sessions": completed,
+        "failed_sessions": sessions - completed,
+        "throughput": {
+            "sessions_per_s": completed / wall if wall else 0.0,
+            "script_runs_per_s": len(all_runs) / wall if wall else 0.0,
+        },
+        "latency": {
+            "all_steps": _percentiles(all_runs) if all_runs else {},
+            "per_step": {step: _percentiles(t) for step, t in sorted(step_timings.items())},
+            "scheduling_lag": _percentiles(lags) if lags else {},
+        },
+        "rss_mb": {
+            "start": float(rss[0, 1]),
+            "end": float(rss[-1, 1]),
+            "peak": float(rss[:, 1].max()),
+            "growth_per_min": rss_growth_per_min,
+            "samples": [(round(float(t), 2), round(float(m), 1)) for t, m in rss],
+        },
+        "errors": errors[:100],
+        "error_count": len(errors),
+    }
+
+
+def print_report(report: Dict):
+    """Print a human-readable summary of a load test report"""
+    cfg = report["config"]
+    print(f"Sessions: {cfg['sessions']} (concurrency {cfg['concurrency']}, {cfg['workers']} workers, "
+          f"think scale {cfg['think_scale']})")
+    print(f"Completed: {report['completed_sessions']}  Failed: {report['failed_sessions']}")
+    print(f"Wall time: {report['wall_time_s']:.1f}s")
+    print(f"Throughput: {report['throughput']['sessions_per_s']:.2f} sessions/s, "
+          f"{report['throughput']['script_runs_per_s']:.1f} script runs/s")
+    print()
+    print(f"{'step':<18}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    latency = report["latency"]
+    rows = list(latency["per_step"].items()) + [("ALL", latency["all_steps"]),
+                                                ("scheduling lag", latency["scheduling_lag"])]
+    for step, stats in rows:
+        if not stats:
+            continue
+        print(f"{step:<18}{stats['count']:>8}{stats['p50_ms']:>10.1f}{stats['p90_ms']:>10.1f}"
+              f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+    print()
+    rss = report["rss_mb"]
+    print(f"RSS (all workers): start {rss['start']:.1f} MB, end {rss['end']:.1f} MB, "
+          f"peak {rss['peak']:.1f} MB, growth {rss['growth_per_min']:+.1f} MB/min")
+    for error in report["errors"][:5]:
+        print(f"  error in session {error['session']} at {error['step']}: {error['error']}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load test the Nexus Insight Streamlit app")
+    parser.add_argument("--sessions", type=int, default=1000, help="total simulated candidates")
+    parser.add_argument("--concurrency", type=int, default=200, help="simultaneous candidates across all workers")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes, one per simulated server")
+    parser.add_argument("--think-scale", type=float, default=1.0,
+                        help="multiplier on realistic think times (0 = no thinking)")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds over which sessions arrive")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="per script run timeout in seconds")
+    parser.add_argument("--rss-interval", type=float, default=1.0, help="RSS sampling interval in seconds")
+    parser.add_argument("--json", help="write the full report to this file")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(
+        sessions=args.sessions,
+        concurrency=args.concurrency,
+        workers=args.workers,
+        think_scale=args.think_scale,
+        ramp_up=args.ramp_up,
+        seed=args.seed,
+        timeout=args.timeout,
+        rss_interval=args.rss_interval,
+    )
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
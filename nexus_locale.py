@@ -0,0 +1,241 @@
+# nexus_locale.py
+"""Translated question bank text in a compact, memory-mapped catalog.
+
+The bank's structure (ids, options, weights) stays in the engine, in one copy
+and one language; scoring never sees text, so results are the same whichever
+language a candidate answered in. Text lives in a catalog with one string
+table per locale, addressed by keys derived from the bank's structure:
+
+    q<id>.text         question text
+    q<id>.option<k>    text of option k
+    q<id>.element<k>   creative element k
+
+Catalog layout, all integers little-endian:
+
+    MAGIC, uint32 header length, header JSON (keys, locales with table offsets)
+    per locale: uint32 end offset of each string, then the UTF-8 strings
+
+A locale's table is only touched the first time that locale is used, and
+strings are decoded and interned on first lookup, so one process-wide
+catalog serves every session. Strings a translation leaves out fall back to
+the source locale.
+
+    python nexus_locale.py template en.json
+    python nexus_locale.py build catalog.nxl locales/de.json locales/fr.json
+    python nexus_locale.py info catalog.nxl
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+MAGIC = b"NXL1"
+SOURCE_LOCALE = "en"
+
+
+def string_keys(questions: List[Dict]) -> List[str]:
+    """Catalog keys for every translatable string of the bank, in catalog order"""
+    keys = []
+    for question in questions:
+        prefix = f"q{question['id']}"
+        keys.append(f"{prefix}.text")
+        keys.extend(f"{prefix}.option{k}" for k in range(len(question["options"])))
+        keys.extend(f"{prefix}.element{k}" for k in range(len(question.get("creative_elements", []))))
+    return keys
+
+
+def source_strings(questions: List[Dict]) -> Dict[str, str]:
+    """The bank's own text under its catalog keys"""
+    strings = {}
+    for question in questions:
+        prefix = f"q{question['id']}"
+        strings[f"{prefix}.text"] = question["text"]
+        for k, option in enumerate(question["options"]):
+            strings[f"{prefix}.option{k}"] = option["text"]
+        for k, element in enumerate(question.get("creative_elements", [])):
+            strings[f"{prefix}.element{k}"] = element
+    return strings
+
+
+def build_catalog(path: str, questions: List[Dict], translations: Dict[str, Dict[str, str]],
+                  source_locale: str = SOURCE_LOCALE) -> Dict:
+    """Write a catalog of the bank's text and ``translations`` (locale -> key -> text)
+
+    Returns, per translated locale, the keys it is missing (served from the
+    source locale) and the keys it has that the bank does not.
+    """
+    keys = string_keys(questions)
+    tables = {source_locale: source_strings(questions), **translations}
+    blobs = {}
+    for locale, strings in tables.items():
+        encoded = [strings.get(key, "").encode() for key in keys]
+        ends = np.cumsum([len(s) for s in encoded], dtype=np.int64)
+        if len(ends) and ends[-1] >= 2 ** 32:
+            raise ValueError(f"Locale {locale} has more than 4 GB of text")
+        blobs[locale] = ends.astype("<u4").tobytes() + b"".join(encoded)
+
+    def layout(header_len: int) -> Dict:
+        offset = len(MAGIC) + 4 + header_len
+        locales = {}
+        for locale, blob in blobs.items():
+            offset += -offset % 4
+            locales[locale] = {"offset": offset}
+            offset += len(blob)
+        return locales
+
+    # Offsets depend on the header's own length; settle it before writing
+    header = {"source": source_locale, "keys": keys, "locales": layout(0)}
+    encoded_header = json.dumps(header).encode()
+    while True:
+        header["locales"] = layout(len(encoded_header))
+        updated = json.dumps(header).encode()
+        if len(updated) == len(encoded_header):
+            encoded_header = updated
+            break
+        encoded_header = updated
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(encoded_header)) + encoded_header)
+        for locale, blob in blobs.items():
+            f.write(b"\0" * (header["locales"][locale]["offset"] - f.tell()))
+            f.write(blob)
+    os.replace(tmp, path)
+
+    key_set = set(keys)
+    return {
+        locale: {"missing": [k for k in keys if not strings.get(k)],
+                 "unknown": sorted(k for k in strings if k not in key_set)}
+        for locale, strings in translations.items()
+    }
+
+
+class LocaleTable:
+    """One locale's strings, decoded on first lookup"""
+
+    def __init__(self, buffer, offset: int, count: int, fallback: Optional["LocaleTable"] = None):
+        self.ends = np.frombuffer(buffer, dtype="<u4", count=count, offset=offset)
+        self._buffer = buffer
+        self._blob = offset + 4 * count
+        self._strings: List[Optional[str]] = [None] * count
+        self.fallback = fallback
+
+    def get(self, i: int) -> str:
+        text = self._strings[i]
+        if text is None:
+            start, end = (int(self.ends[i - 1]) if i else 0), int(self.ends[i])
+            if start == end and self.fallback is not None:
+                text = self.fallback.get(i)
+            else:
+                text = sys.intern(self._buffer[self._blob + start:self._blob + end].decode())
+            self._strings[i] = text
+        return text
+
+    @property
+    def decoded(self) -> int:
+        return sum(text is not None for text in self._strings)
+
+
+class LocaleCatalog:
+    """Memory-mapped catalog with lazily opened per-locale tables"""
+
+    def __init__(self, path: str, questions: Optional[List[Dict]] = None):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:4] != MAGIC:
+            raise ValueError(f"{path} is not a Nexus locale catalog")
+        (header_len,) = struct.unpack_from("<I", self._mm, 4)
+        self.header = json.loads(self._mm[8:8 + header_len])
+        self.keys = self.header["keys"]
+        if questions is not None and string_keys(questions) != self.keys:
+            raise ValueError(f"{path} was built for a different question bank structure")
+        self.source = self.header["source"]
+        self.locales = list(self.header["locales"])
+        self.key_index = {key: i for i, key in enumerate(self.keys)}
+        self._tables: Dict[str, LocaleTable] = {}
+        self._lock = threading.Lock()
+
+    def table(self, locale: str) -> LocaleTable:
+        table = self._tables.get(locale)
+        if table is None:
+            if locale not in self.header["locales"]:
+                raise ValueError(f"Locale {locale!r} is not in {self.path}")
+            fallback = self.table(self.source) if locale != self.source else None
+            with self._lock:
+                table = self._tables.get(locale)
+                if table is None:
+                    table = LocaleTable(self._mm, self.header["locales"][locale]["offset"], len(self.keys), fallback)
+                    self._tables[locale] = table
+        return table
+
+    def text(self, locale: str, key: str) -> str:
+        return self.table(locale).get(self.key_index[key])
+
+    def question_text(self, locale: str, question: Dict) -> str:
+        return self.text(locale, f"q{question['id']}.text")
+
+    def option_texts(self, locale: str, question: Dict) -> List[str]:
+        table, start = self.table(locale), self.key_index[f"q{question['id']}.option0"]
+        return [table.get(start + k) for k in range(len(question["options"]))]
+
+    def creative_elements(self, locale: str, question: Dict) -> List[str]:
+        table, prefix = self.table(locale), f"q{question['id']}.element"
+        return [table.get(self.key_index[f"{prefix}{k}"]) for k in range(len(question.get("creative_elements", [])))]
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {"locales": len(self.locales), "loaded": sorted(self._tables),
+                    "decoded": {locale: table.decoded for locale, table in self._tables.items()},
+                    "bytes": len(self._mm)}
+
+    def close(self):
+        self._tables.clear()
+        self._mm.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build and inspect question bank locale catalogs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    template = sub.add_parser("template", help="write the bank's text as a translation file to start from")
+    template.add_argument("output")
+    build = sub.add_parser("build", help="build a catalog; each file's locale is its name, e.g. de.json")
+    build.add_argument("output")
+    build.add_argument("translations", nargs="*")
+    build.add_argument("--source-locale", default=SOURCE_LOCALE)
+    info = sub.add_parser("info", help="describe a catalog")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    from nexus_engine import NexusInsightAssessment
+
+    questions = NexusInsightAssessment().questions
+    if args.command == "template":
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(source_strings(questions), f, indent=2, ensure_ascii=False)
+        print(f"Wrote {len(string_keys(questions))} strings to {args.output}")
+    elif args.command == "build":
+        translations = {}
+        for path in args.translations:
+            with open(path, encoding="utf-8") as f:
+                translations[os.path.splitext(os.path.basename(path))[0]] = json.load(f)
+        report = build_catalog(args.output, questions, translations, source_locale=args.source_locale)
+        print(f"Wrote {args.output}: {1 + len(translations)} locales, {os.path.getsize(args.output)} bytes")
+        for locale, problems in report.items():
+            print(f"  {locale}: {len(problems['missing'])} missing, {len(problems['unknown'])} unknown keys")
+    else:
+        catalog = LocaleCatalog(args.path, questions)
+        print(f"{len(catalog.keys)} strings, source {catalog.source}, locales {', '.join(catalog.locales)}")
+        for locale in catalog.locales:
+            ends = catalog.table(locale).ends
+            print(f"  {locale}: {int(ends[-1]) if len(ends) else 0} bytes of text")
+
+
+if __name__ == "__main__":
+    main()
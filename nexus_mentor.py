@@ -0,0 +1,235 @@
+# nexus_mentor.py
+"""Nearest-neighbor mentor matching over stored score profiles.
+
+Profiles are the 6-dimension vectors from ``calculate_dimension_scores``. With
+six dimensions a tree index buys little over a blocked scan, so queries stream
+the float32 profile matrix through BLAS in fixed-size blocks and keep a
+running top-k; 500k profiles take a few milliseconds per query. The matrix
+grows by doubling, so new results are appended in amortized O(1).
+
+- similar: smallest Euclidean distance to the query profile
+- complementary: mentors strongest where the candidate is weakest, scored as
+  one matrix-vector product with a weight vector built from the candidate's
+  development areas
+
+Profiles the app adds one at a time (``add_scores``) to an index loaded from
+a file are also appended to a ``<file>.journal`` of JSON lines, which
+``load`` replays, so they survive a restart. Saving the index to its own file
+folds the journal in.
+
+    python nexus_mentor.py build store/ mentors.npz --mentors mentor_rows.txt
+"""
+import argparse
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+BLOCK_ROWS = 65_536
+
+
+class ProfileIndex:
+    """Growable matrix of score profiles with attribute filters
+
+    Profiles are looked up by the string form of their id, which is expected
+    to be unique.
+    """
+
+    def __init__(self, dimension_keys: Sequence[str], capacity: int = 1024):
+        self.dimension_keys = list(dimension_keys)
+        self.vectors = np.zeros((capacity, len(self.dimension_keys)), dtype=np.float32)
+        self.sq_norms = np.zeros(capacity, dtype=np.float32)
+        self.ids: List[Any] = []
+        self.attributes: Dict[str, np.ndarray] = {}
+        self._rows: Dict[str, int] = {}
+        self.journal: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _grow(self, needed: int):
+        capacity = len(self.vectors)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self.vectors = np.resize(self.vectors, (capacity, self.vectors.shape[1]))
+        self.sq_norms = np.resize(self.sq_norms, capacity)
+        for name, values in self.attributes.items():
+            self.attributes[name] = np.resize(values, capacity)
+
+    def add(self, ids: Sequence[Any], vectors: np.ndarray, attributes: Optional[Dict[str, Sequence]] = None):
+        """Append profiles; ``attributes`` maps a name to one value per profile"""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        with self._lock:
+            start, end = len(self.ids), len(self.ids) + len(vectors)
+            self._grow(end)
+            self.vectors[start:end] = vectors
+            self.sq_norms[start:end] = (vectors ** 2).sum(axis=1)
+            attributes = {name: np.asarray(values) for name, values in (attributes or {}).items()}
+            for name, values in attributes.items():
+                if name not in self.attributes:
+                    self.attributes[name] = np.zeros(len(self.vectors), dtype=values.dtype)
+            # Attributes not given for these profiles default to zero / False
+            for name, column in self.attributes.items():
+                column[start:end] = attributes.get(name, 0)
+            self._rows.update((str(profile_id), row) for row, profile_id in enumerate(ids, start))
+            self.ids.extend(ids)
+
+    def add_scores(self, profile_id: Any, scores: Dict[str, float], **attributes):
+        """Append one profile given as a ``{dimension: score}`` dict, also to the journal if there is one"""
+        vector = [float(scores[d]) for d in self.dimension_keys]
+        self.add([profile_id], [vector], {name: [value] for name, value in attributes.items()})
+        if self.journal is not None:
+            line = json.dumps({"id": profile_id, "vector": vector, "attributes": attributes})
+            with self._lock, open(self.journal, "a") as f:
+                f.write(line + "\n")
+
+    def row(self, profile_id: Any) -> Optional[int]:
+        """Row of the profile with this id (compared as a string), None if it is not indexed"""
+        return self._rows.get(str(profile_id))
+
+    def _mask(self, n: int, where: Optional[Dict[str, Any]], min_scores: Optional[Dict[str, float]],
+              exclude_ids: Optional[Sequence[Any]]) -> Optional[np.ndarray]:
+        if not (where or min_scores or exclude_ids):
+            return None
+        mask = np.ones(n, dtype=bool)
+        for name, value in (where or {}).items():
+            mask &= self.attributes[name][:n] == value
+        for dim, floor in (min_scores or {}).items():
+            mask &= self.vectors[:n, self.dimension_keys.index(dim)] >= floor
+        if exclude_ids:
+            rows = [self.row(profile_id) for profile_id in exclude_ids]
+            mask[[row for row in rows if row is not None and row < n]] = False
+        return mask
+
+    def _top_k(self, scores_fn, k: int, mask: Optional[np.ndarray], n: int, largest: bool) -> List[tuple]:
+        """Blocked scan keeping the best ``k`` (row, score) pairs"""
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, n, BLOCK_ROWS):
+            end = min(start + BLOCK_ROWS, n)
+            scores = scores_fn(start, end)
+            key = -scores if largest else scores
+            if mask is not None:
+                key = np.where(mask[start:end], key, np.inf)
+            if len(key) > k:
+                part = np.argpartition(key, k)[:k]
+            else:
+                part = np.arange(len(key))
+            part = part[np.isfinite(key[part])]
+            best_rows = np.concatenate([best_rows, part + start])
+            best_scores = np.concatenate([best_scores, key[part]])
+            if len(best_rows) > k:
+                keep = np.argpartition(best_scores, k)[:k]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+        order = np.argsort(best_scores, kind="stable")
+        signed = -best_scores if largest else best_scores
+        return [(int(best_rows[i]), float(signed[i])) for i in order]
+
+    def _results(self, hits: List[tuple], score_name: str, n_rows: int) -> List[Dict]:
+        return [
+            {
+                "id": self.ids[row],
+                score_name: score,
+                "profile": dict(zip(self.dimension_keys, self.vectors[row].tolist())),
+            }
+            for row, score in hits if row < n_rows
+        ]
+
+    def similar(self, scores: Dict[str, float], k: int = 5, where: Optional[Dict[str, Any]] = None,
+                min_scores: Optional[Dict[str, float]] = None,
+                exclude_ids: Optional[Sequence[Any]] = None) -> List[Dict]:
+        """Profiles closest to ``scores`` in Euclidean distance"""
+        query = np.array([scores[d] for d in self.dimension_keys], dtype=np.float32)
+        q_norm = float(query @ query)
+        with self._lock:
+            n, vectors, sq_norms = len(self.ids), self.vectors, self.sq_norms
+
+        def distances(start, end):
+            d2 = sq_norms[start:end] - 2 * (vectors[start:end] @ query) + q_norm
+            return np.sqrt(np.maximum(d2, 0))
+
+        hits = self._top_k(distances, k, self._mask(n, where, min_scores, exclude_ids), n, largest=False)
+        return self._results(hits, "distance", n)
+
+    def complementary(self, scores: Dict[str, float], development_areas: Sequence[str], k: int = 5,
+                      where: Optional[Dict[str, Any]] = None, min_scores: Optional[Dict[str, float]] = None,
+                      exclude_ids: Optional[Sequence[Any]] = None, other_weight: float = 0.1) -> List[Dict]:
+        """Profiles strongest on the candidate's ``development_areas``
+
+        Each development dimension is weighted by how far the candidate is
+        below 100 there; other dimensions get ``other_weight`` so that, among
+        equally strong specialists, well-rounded mentors rank first.
+        """
+        gap = np.array([100.0 - scores[d] for d in self.dimension_keys]) / 100.0
+        weights = np.full(len(self.dimension_keys), other_weight)
+        for dim in development_areas:
+            weights[self.dimension_keys.index(dim)] = max(gap[self.dimension_keys.index(dim)], other_weight)
+        weights = (weights / weights.sum()).astype(np.float32)
+        with self._lock:
+            n, vectors = len(self.ids), self.vectors
+
+        def strength(start, end):
+            return vectors[start:end] @ weights
+
+        hits = self._top_k(strength, k, self._mask(n, where, min_scores, exclude_ids), n, largest=True)
+        return self._results(hits, "match_score", n)
+
+    def save(self, path: str):
+        """Write the index to ``path`` (.npz); saving to the file it was loaded from empties its journal"""
+        tmp_path = f"{path}.tmp.npz"
+        with self._lock:
+            n = len(self.ids)
+            np.savez(tmp_path, dimension_keys=np.array(self.dimension_keys), vectors=self.vectors[:n],
+                     ids=np.array(self.ids, dtype=object),
+                     **{f"attr_{name}": values[:n] for name, values in self.attributes.items()})
+            os.replace(tmp_path, path)
+            if self.journal == f"{path}.journal" and os.path.exists(self.journal):
+                os.remove(self.journal)
+
+    @classmethod
+    def load(cls, path: str) -> "ProfileIndex":
+        """Read an index and replay the profiles added to it since it was saved"""
+        with np.load(path, allow_pickle=True) as data:
+            index = cls(data["dimension_keys"].tolist(), capacity=max(len(data["ids"]), 1))
+            attributes = {key[len("attr_"):]: data[key] for key in data.files if key.startswith("attr_")}
+            index.add(data["ids"].tolist(), data["vectors"], attributes)
+        index.journal = f"{path}.journal"
+        if os.path.exists(index.journal):
+            with open(index.journal) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from an interrupted append
+                    index.add([entry["id"]], [entry["vector"]],
+                              {name: [value] for name, value in entry["attributes"].items()})
+        return index
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build a mentor-matching index from a score store")
+    parser.add_argument("store", help="score store directory (see nexus_rescoring.py)")
+    parser.add_argument("output", help="index file to write (.npz)")
+    parser.add_argument("--mentors", help="file with one store row number per line to mark as mentors")
+    args = parser.parse_args(argv)
+
+    from nexus_rescoring import ScoreStore
+
+    store = ScoreStore(args.store, mode="r")
+    is_mentor = np.zeros(len(store), dtype=bool)
+    if args.mentors:
+        with open(args.mentors) as f:
+            is_mentor[[int(line) for line in f if line.strip()]] = True
+    index = ProfileIndex(store.engine().dimension_keys, capacity=max(len(store), 1))
+    index.add(list(range(len(store))), np.asarray(store.scores), {"is_mentor": is_mentor})
+    index.save(args.output)
+    print(f"Indexed {len(index)} profiles ({int(is_mentor.sum())} mentors) into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+# nexus_replay.py
+"""Per-session interaction logs and headless replay of them.
+
+The app appends one record per script run to its session's log: when the run
+started, how long it took, and the interaction that caused it (widget values
+changed since the previous run and buttons clicked). Runs with no
+interaction, such as those after ``st.rerun()``, are logged with an empty
+payload and count towards the interaction before them. Free-text widgets
+named in ``redact`` are logged as a placeholder of the same length, so logs
+hold no typed text but replay still submits text of the recorded size.
+
+Log layout, little-endian:
+
+    MAGIC, uint16 header length, header JSON ({"started": epoch seconds})
+    per run: uint32 ms since started, uint32 run time in us, uint16 payload length,
+             payload JSON {"set": {widget key: value}, "click": [[button label, {key: value}]]}
+
+Replay feeds the recorded interactions back through the app script with
+Streamlit's ``AppTest``, as fast as possible or at the recorded pacing, and
+reports replayed against recorded time per kind of step. Replayed times
+include ``AppTest``'s own overhead, so compare them with other replays rather
+than with the recorded times. Reports from two builds can then be diffed:
+
+    python nexus_replay.py replay events/ --json base.json
+    python nexus_replay.py replay events/ --pacing recorded --speed 10 --json new.json
+    python nexus_replay.py diff base.json new.json
+
+Replayed runs write to scratch stores (see ``nexus_apptest``), so a replay
+does not add its traffic to the real statistics, histories or sessions.
+
+Like the load test, replay drives the app with the Streamlit version that
+requirements.txt pins (1.33); older AppTest re-fires buttons across reruns.
+"""
+import argparse
+import glob
+import heapq
+import json
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from nexus_apptest import APP_SCRIPT, scratch_stores, settle_widgets
+
+MAGIC = b"NXE1"
+RECORD = struct.Struct("<IIH")
+REDACTED_CHAR = "x"
+
+WIDGET_TYPES = ("radio", "selectbox", "text_input", "text_area", "checkbox", "multiselect", "number_input",
+                "slider", "toggle")
+
+
+class EventLog:
+    """Directory of append-only per-session run logs"""
+
+    def __init__(self, directory: str, max_open_sessions: int = 10_000, redact: Sequence[str] = ()):
+        self.directory = directory
+        self.max_open_sessions = max_open_sessions
+        # Widget keys (or key prefixes) whose text is replaced by a same-length placeholder
+        self.redact = tuple(redact)
+        # session -> start time, for sessions this process has written to
+        self._started: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, session: str) -> str:
+        return os.path.join(self.directory, session[:2], f"{session}.nxe")
+
+    def _session_start(self, session: str, now: float) -> float:
+        with self._lock:
+            started = self._started.get(session)
+            if started is not None:
+                self._started.move_to_end(session)
+                return started
+        path = self.path(session)
+        try:
+            started = read_header(path)["started"]
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            header = json.dumps({"started": now}).encode()
+            with open(path, "ab") as f:
+                f.write(MAGIC + struct.pack("<H", len(header)) + header)
+            started = now
+        with self._lock:
+            self._started[session] = started
+            while len(self._started) > self.max_open_sessions:
+                self._started.popitem(last=False)
+        return started
+
+    def _redacted(self, values: Dict) -> Dict:
+        return {key: REDACTED_CHAR * len(value) if isinstance(value, str) and key.startswith(self.redact) else value
+                for key, value in values.items()}
+
+    def record(self, session: str, run_started: float, run_seconds: float, interaction: Optional[Dict] = None):
+        """Append one script run; ``run_started`` is a Unix time"""
+        started = self._session_start(session, run_started)
+        if interaction and self.redact:
+            interaction = {"set": self._redacted(interaction.get("set", {})),
+                           "click": [[label, self._redacted(values)] for label, values in interaction.get("click", [])]}
+        payload = json.dumps(interaction, separators=(",", ":")).encode() if interaction else b""
+        offset_ms = min(max(int((run_started - started) * 1000), 0), 2 ** 32 - 1)
+        run_us = min(int(run_seconds * 1e6), 2 ** 32 - 1)
+        with open(self.path(session), "ab") as f:
+            f.write(RECORD.pack(offset_ms, run_us, len(payload)) + payload)
+
+
+def read_header(path: str) -> Dict:
+    with open(path, "rb") as f:
+        head = f.read(6)
+        if head[:4] != MAGIC:
+            raise ValueError(f"{path} is not a Nexus event log")
+        (length,) = struct.unpack("<H", head[4:])
+        return json.loads(f.read(length))
+
+
+def read_log(path: str) -> Tuple[Dict, List[Dict]]:
+    """``(header, interactions)``; each interaction has its offset ``t``, recorded run time and changes
+
+    The first run of a session is its page load. Runs without an interaction
+    are folded into the interaction before them.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a Nexus event log")
+    (length,) = struct.unpack_from("<H", data, 4)
+    header = json.loads(data[6:6 + length])
+    pos = 6 + length
+    interactions: List[Dict] = []
+    while pos + RECORD.size <= len(data):
+        offset_ms, run_us, size = RECORD.unpack_from(data, pos)
+        pos += RECORD.size
+        if pos + size > len(data):
+            break  # torn final record
+        payload = json.loads(data[pos:pos + size]) if size else None
+        pos += size
+        if payload is None and interactions:
+            interactions[-1]["recorded_s"] += run_us / 1e6
+            continue
+        payload = payload or {}
+        interactions.append({"t": offset_ms / 1000, "recorded_s": run_us / 1e6,
+                             "set": payload.get("set", {}), "click": payload.get("click", [])})
+    return header, interactions
+
+
+def step_label(interaction: Dict, first: bool = False) -> str:
+    """Kind of step an interaction is, for grouping timings"""
+    if first:
+        return "load"
+    if interaction["click"]:
+        return "click " + " + ".join(label for label, _ in interaction["click"])
+    changed = interaction["set"]
+    if "page" in changed:
+        return f"page {changed['page']}"
+    if any(key.startswith("q_") for key in changed):
+        return "answer"
+    if changed:
+        return "edit " + ", ".join(sorted(key.split("_")[0] for key in changed))
+    return "rerun"
+
+
+class SessionReplay:
+    """One recorded session driven through the app script"""
+
+    def __init__(self, path: str, timeout: float = 60.0):
+        from streamlit.testing.v1 import AppTest
+
+        self.path = path
+        self.header, self.interactions = read_log(path)
+        self.at = AppTest.from_file(APP_SCRIPT, default_timeout=timeout)
+        self.timings: List[Tuple[str, float, float]] = []
+        self.divergences: List[str] = []
+
+    def _widget(self, key: str):
+        for kind in WIDGET_TYPES:
+            for widget in self.at.get(kind):
+                if widget.key == key:
+                    return widget
+        return None
+
+    def _set(self, values: Dict):
+        for key, value in values.items():
+            widget = self._widget(key)
+            if widget is None:
+                self.divergences.append(f"no widget {key!r}")
+            else:
+                widget.set_value(value)
+
+    def _apply(self, interaction: Dict):
+        settle_widgets(self.at)
+        self._set(interaction["set"])
+        for label, values in interaction["click"]:
+            self._set(values)
+            button = next((b for b in self.at.button if b.label == label), None)
+            if button is None:
+                self.divergences.append(f"no button {label!r}")
+            else:
+                button.click()
+
+    def steps(self) -> Iterator[float]:
+        """Yield each interaction's offset from the session start; resuming replays it"""
+        for i, interaction in enumerate(self.interactions):
+            yield interaction["t"]
+            if i:
+                self._apply(interaction)
+            start = time.perf_counter()
+            self.at.run()
+            self.timings.append((step_label(interaction, first=i == 0), time.perf_counter() - start,
+                                 interaction["recorded_s"]))
+            if self.at.exception:
+                raise RuntimeError(self.at.exception[0].message)
+
+
+def _summary(seconds: List[float]) -> Dict:
+    ms = np.asarray(seconds) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"count": int(ms.size), "mean_ms": float(ms.mean()), "p50_ms": float(p50), "p95_ms": float(p95),
+            "p99_ms": float(p99), "max_ms": float(ms.max())}
+
+
+def replay(paths: List[str], pacing: str = "fast", speed: float = 1.0, timeout: float = 60.0) -> Dict:
+    """Replay logged sessions; ``pacing`` is "fast" (back to back) or "recorded" (interleaved in time)"""
+    with scratch_stores():
+        return _replay(paths, pacing, speed, timeout)
+
+
+def _replay(paths: List[str], pacing: str, speed: float, timeout: float) -> Dict:
+    sessions = sorted((SessionReplay(path, timeout) for path in paths), key=lambda s: s.header["started"])
+    errors, lags = [], []
+
+    def advance(session, steps) -> Optional[float]:
+        try:
+            return next(steps)
+        except StopIteration:
+            return None
+        except Exception as exc:
+            errors.append({"session": session.path, "error": repr(exc)})
+            return None
+
+    t0 = time.time()
+    if pacing == "fast":
+        for session in sessions:
+            steps = session.steps()
+            while advance(session, steps) is not None:
+                pass
+    else:
+        first = sessions[0].header["started"] if sessions else 0.0
+        heap = []
+        for n, session in enumerate(sessions):
+            steps = session.steps()
+            offset = advance(session, steps)
+            if offset is not None:
+                due = t0 + (session.header["started"] - first + offset) / speed
+                heapq.heappush(heap, (due, n, session, steps))
+        while heap:
+            due, n, session, steps = heapq.heappop(heap)
+            wait = due - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            lags.append(max(0.0, time.time() - due))
+            offset = advance(session, steps)
+            if offset is not None:
+                heapq.heappush(heap, (t0 + (session.header["started"] - first + offset) / speed, n, session, steps))
+    wall = time.time() - t0
+
+    per_step: Dict[str, Dict[str, List[float]]] = {}
+    for session in sessions:
+        for label, replayed, recorded in session.timings:
+            entry = per_step.setdefault(label, {"replayed": [], "recorded": []})
+            entry["replayed"].append(replayed)
+            entry["recorded"].append(recorded)
+    return {
+        "config": {"sessions": len(sessions), "pacing": pacing, "speed": speed},
+        "wall_time_s": wall,
+        "steps": sum(len(s.timings) for s in sessions),
+        "per_step": {label: {kind: _summary(values) for kind, values in entry.items()}
+                     for label, entry in sorted(per_step.items())},
+        "scheduling_lag": _summary(lags) if lags else {},
+        "divergences": [{"session": s.path, "problems": s.divergences[:20]} for s in sessions if s.divergences],
+        "errors": errors,
+    }
+
+
+def diff_reports(base: Dict, new: Dict, threshold: float = 1.2, min_count: int = 10) -> List[Dict]:
+    """Replayed p50/p95 per step in two reports, slowest-growing first
+
+    Steps seen at least ``min_count`` times whose p95 grew by more than
+    ``threshold`` are flagged as regressions.
+    """
+    rows = []
+    for label in sorted(set(base["per_step"]) & set(new["per_step"])):
+        old, cur = base["per_step"][label]["replayed"], new["per_step"][label]["replayed"]
+        ratio = cur["p95_ms"] / old["p95_ms"] if old["p95_ms"] else float("inf")
+        rows.append({"step": label, "count": cur["count"], "base_p50_ms": old["p50_ms"], "new_p50_ms": cur["p50_ms"],
+                     "base_p95_ms": old["p95_ms"], "new_p95_ms": cur["p95_ms"], "p95_ratio": ratio,
+                     "regression": ratio > threshold and cur["count"] >= min_count})
+    return sorted(rows, key=lambda row: row["p95_ratio"], reverse=True)
+
+
+def print_report(report: Dict):
+    cfg = report["config"]
+    print(f"Replayed {cfg['sessions']} sessions, {report['steps']} steps ({cfg['pacing']} pacing) "
+          f"in {report['wall_time_s']:.1f}s")
+    print(f"{'step':<40}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'rec p50':>10}{'rec p95':>10}")
+    for label, stats in report["per_step"].items():
+        replayed, recorded = stats["replayed"], stats["recorded"]
+        print(f"{label[:39]:<40}{replayed['count']:>7}{replayed['p50_ms']:>10.1f}{replayed['p95_ms']:>10.1f}"
+              f"{recorded['p50_ms']:>10.1f}{recorded['p95_ms']:>10.1f}")
+    if report["scheduling_lag"]:
+        print(f"scheduling lag p95 {report['scheduling_lag']['p95_ms']:.1f} ms")
+    print(f"{len(report['divergences'])} sessions diverged from their recording, {len(report['errors'])} failed")
+    for error in report["errors"][:5]:
+        print(f"  {error['session']}: {error['error']}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Replay recorded app sessions and compare latency")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("replay", help="replay a directory of session logs (NEXUS_EVENT_LOG)")
+    run.add_argument("logs", help="event log directory or a single .nxe file")
+    run.add_argument("--pacing", choices=["fast", "recorded"], default="fast")
+    run.add_argument("--speed", type=float, default=1.0, help="time compression for recorded pacing")
+    run.add_argument("--limit", type=int, help="replay at most this many sessions")
+    run.add_argument("--timeout", type=float, default=60.0, help="per script run timeout in seconds")
+    run.add_argument("--json", help="write the report to this file")
+    diff = sub.add_parser("diff", help="compare two replay reports")
+    diff.add_argument("base")
+    diff.add_argument("new")
+    diff.add_argument("--threshold", type=float, default=1.2, help="p95 ratio reported as a regression")
+    diff.add_argument("--min-count", type=int, default=10, help="fewest replays of a step to flag it")
+    args = parser.parse_args(argv)
+
+    if args.command == "replay":
+        paths = [args.logs] if os.path.isfile(args.logs) else \
+            sorted(glob.glob(os.path.join(args.logs, "*", "*.nxe")))
+        report = replay(paths[:args.limit], pacing=args.pacing, speed=args.speed, timeout=args.timeout)
+        print_report(report)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+    else:
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        rows = diff_reports(base, new, args.threshold, args.min_count)
+        print(f"{'step':<40}{'count':>7}{'p50 ms':>16}{'p95 ms':>18}{'ratio':>8}")
+        for row in rows:
+            print(f"{row['step'][:39]:<40}{row['count']:>7}{row['base_p50_ms']:>8.1f}{row['new_p50_ms']:>8.1f}"
+                  f"{row['base_p95_ms']:>9.1f}{row['new_p95_ms']:>9.1f}{row['p95_ratio']:>8.2f}"
+                  + ("  REGRESSION" if row["regression"] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# nexus_report_worker.py
+"""Bounded background pool for final report computation.
+
+Finishing an assessment enqueues scoring, recommendations and dashboard
+creation here instead of running them on the Streamlit script thread; the
+Results page shows a placeholder until the report is ready. At most
+``max_workers + max_queue`` jobs are admitted at once: when many candidates
+finish together, further submissions are refused so the caller can fall back
+to computing inline rather than growing an unbounded backlog. Queue depth,
+wait and run times are kept for the admin view.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from nexus_engine import NexusInsightAssessment
+
+
+def compute_report(engine: NexusInsightAssessment, responses: Dict, user_id: str,
+                   response_quality: Optional[Dict] = None) -> Dict:
+    """Scores, recommendations and dashboard for one finished assessment"""
+    if engine.archetypes is not None:
+        # One attribute swap, so a concurrent report sees either the old model or the new one
+        engine.archetypes = engine.archetypes.refresh()
+    if engine.action_catalog is not None:
+        engine.action_catalog.refresh()
+    if engine.correlation_adjustments is not None:
+        engine.correlation_adjustments.refresh()
+    scores = engine.calculate_dimension_scores(responses)
+    return {
+        "scores": scores,
+        "recommendations": engine.generate_ai_coach_recommendations(scores),
+        "dashboard": engine.create_executive_dashboard(
+            scores, user_id, response_quality=response_quality,
+            confidence_intervals=engine.confidence_intervals(responses)),
+    }
+
+
+class ReportWorker:
+    """Bounded executor with per-job status and queue metrics
+
+    Results are held until collected with :meth:`pop`; uncollected ones are
+    dropped after ``result_ttl`` seconds.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 64, processes: bool = False,
+                 result_ttl: float = 3600.0, history: int = 1000):
+        executor_cls = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        self.executor = executor_cls(max_workers=max_workers)
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._waits = deque(maxlen=history)
+        self._runs = deque(maxlen=history)
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self._peak_depth = 0
+
+    def submit(self, job_id: str, fn: Callable, *args, block_seconds: float = 0.0, **kwargs) -> bool:
+        """Enqueue ``fn(*args, **kwargs)``; False if the queue stays full for ``block_seconds``"""
+        acquired = self._slots.acquire(timeout=block_seconds) if block_seconds > 0 else self._slots.acquire(False)
+        if not acquired:
+            with self._lock:
+                self._counters["rejected"] += 1
+            return False
+
+        job = {"status": "queued", "enqueued": time.monotonic(), "started": None, "finished": None}
+        with self._lock:
+            self._expire_locked()
+            self._jobs[job_id] = job
+            self._counters["submitted"] += 1
+            self._peak_depth = max(self._peak_depth, self._depth_locked())
+
+        def run():
+            job["started"] = time.monotonic()
+            job["status"] = "running"
+            return fn(*args, **kwargs)
+
+        try:
+            # Process pools cannot pickle the closure, so their "running" state starts at submission
+            future = self.executor.submit(fn, *args, **kwargs) if isinstance(self.executor, ProcessPoolExecutor) \
+                else self.executor.submit(run)
+        except Exception:
+            self._slots.release()
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            raise
+        job["future"] = future
+        future.add_done_callback(lambda f: self._finished(job, f))
+        return True
+
+    def _finished(self, job: Dict, future: Future):
+        now = time.monotonic()
+        started = job["started"] or job["enqueued"]
+        with self._lock:
+            job["finished"] = now
+            job["status"] = "failed" if future.exception() is not None else "done"
+            self._counters["completed" if job["status"] == "done" else "failed"] += 1
+            self._waits.append(started - job["enqueued"])
+            self._runs.append(now - started)
+        self._slots.release()
+
+    def status(self, job_id: str) -> str:
+        """queued, running, done, failed or unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job["status"] if job is not None else "unknown"
+
+    def pop(self, job_id: str) -> Optional[Any]:
+        """The finished result, removing the job; None while pending. Re-raises a job's error."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] not in ("done", "failed"):
+                return None
+            del self._jobs[job_id]
+        return job["future"].result()
+
+    def _depth_locked(self) -> int:
+        return sum(1 for job in self._jobs.values() if job["status"] == "queued")
+
+    def _expire_locked(self):
+        cutoff = time.monotonic() - self.result_ttl
+        for job_id in [j for j, job in self._jobs.items() if job["finished"] is not None and job["finished"] < cutoff]:
+            del self._jobs[job_id]
+
+    def metrics(self) -> Dict:
+        """Queue depth, throughput counters and wait/run time percentiles in seconds"""
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job["status"] == "running")
+            waits, runs = np.array(self._waits), np.array(self._runs)
+            return {
+                **self._counters,
+                "queued": self._depth_locked(),
+                "running": running,
+                "peak_queued": self._peak_depth,
+                "capacity": self.max_workers + self.max_queue,
+                "wait_p50_s": float(np.percentile(waits, 50)) if len(waits) else None,
+                "wait_p95_s": float(np.percentile(waits, 95)) if len(waits) else None,
+                "run_p50_s": float(np.percentile(runs, 50)) if len(runs) else None,
+                "run_p95_s": float(np.percentile(runs, 95)) if len(runs) else None,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,354 @@
+# nexus_reports.py
+"""Batch rendering of standalone HTML candidate reports.
+
+Each report carries what the Results page shows: headline metrics, the radar
+and bar charts, the dimension analysis, strengths, development areas and AI
+Coach recommendations, all taken from ``create_executive_dashboard`` and
+``generate_ai_coach_recommendations``. Reports are self-contained HTML with
+inline SVG charts and print styles, so "Save as PDF" from any browser gives
+the PDF version without a rendering dependency.
+
+Charts depend only on the displayed (one decimal) scores, so they are keyed
+by a hash of those: every distinct chart is rendered once, in a process pool,
+into ``<out>/charts/`` and inlined into every report that shares it. Reports
+are then written chunk by chunk in the pool; ``<out>/manifest.json`` records
+finished chunks, so an interrupted run picks up where it stopped.
+
+    python nexus_reports.py store/ reports/ --workers 4
+    python nexus_reports.py cohort.nxa reports/ --ids candidate_ids.txt
+"""
+import argparse
+import hashlib
+import html
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from string import Template
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from nexus_engine import NexusInsightAssessment
+
+SCORE_COLORS = [(40, "#d62728"), (70, "#ff7f0e"), (math.inf, "#2ca02c")]
+
+# Compiled once per process
+REPORT_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Nexus Insight Report - $candidate</title>
+<style>
+body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; color: #222; max-width: 960px; margin: 2rem auto; }
+h1 { color: #1f77b4; } h2 { color: #2e86ab; border-bottom: 2px solid #e9ecef; padding-bottom: .3rem; }
+.metrics { display: flex; gap: 1rem; } .metric { flex: 1; border: 2px solid #e9ecef; border-radius: 10px; padding: 1rem; }
+.metric b { display: block; font-size: 1.4rem; } .charts { display: flex; gap: 1rem; } .charts svg { flex: 1; }
+.dimension { display: flex; gap: 1rem; align-items: center; margin: .5rem 0; }
+.badge { color: white; border-radius: 5px; padding: .4rem .8rem; font-weight: bold; min-width: 5rem; text-align: center; }
+.rec { background: #f8f9fa; border-left: 5px solid #764ba2; padding: .6rem 1rem; margin: .6rem 0; }
+@page { margin: 1.5cm; } @media print { body { margin: 0; } .rec, .dimension { break-inside: avoid; } }
+</style></head><body>
+<h1>Nexus Insight Assessment Report</h1>
+<p>Candidate <b>$candidate</b> &middot; $report_date</p>
+<div class="metrics">
+<div class="metric">Overall Score<b>$overall/100</b></div>
+<div class="metric">Leadership Style<b>$style</b></div>
+<div class="metric">Innovation Potential<b>$innovation/100</b></div>
+<div class="metric">Performance Level<b>$level</b></div>
+</div>
+$archetype
+<div class="charts">$radar$bar</div>
+<h2>Detailed Dimension Analysis</h2>
+$dimensions
+<h2>Top Strengths</h2><ul>$strengths</ul>
+<h2>Development Areas</h2><ul>$development</ul>
+<h2>AI Coach Recommendations</h2>
+$recommendations
+</body></html>
+""")
+DIMENSION_TEMPLATE = Template(
+    '<div class="dimension"><span class="badge" style="background:$color">$score/100</span>'
+    '<span><b>$name</b> - $level<br>$interpretation</span></div>')
+RECOMMENDATION_TEMPLATE = Template(
+    '<div class="rec"><b>$title</b> - $priority PRIORITY<p>$description</p><ul>$actions</ul></div>')
+
+
+def score_color(score: float) -> str:
+    return next(color for limit, color in SCORE_COLORS if score < limit)
+
+
+def chart_key(values: np.ndarray) -> str:
+    """Hash of the scores as displayed; equal keys mean identical charts"""
+    return hashlib.sha1(np.rint(np.asarray(values) * 10).astype("<i2").tobytes()).hexdigest()[:16]
+
+
+def radar_svg(labels: Sequence[str], values: Sequence[float], size: int = 400) -> str:
+    """Filled radar polygon on a 0-100 scale with rings every 20 points"""
+    c, radius = size / 2, size / 2 - 70
+    angles = [math.pi / 2 - 2 * math.pi * i / len(labels) for i in range(len(labels))]
+
+    def xy(angle, r):
+        return c + r * math.cos(angle), c - r * math.sin(angle)
+
+    def point(angle, r):
+        return "{:.1f},{:.1f}".format(*xy(angle, r))
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" role="img">',
+             f'<text x="{c}" y="18" text-anchor="middle" font-size="15">Competency Radar Profile</text>']
+    for ring in range(20, 101, 20):
+        parts.append(f'<polygon points="{" ".join(point(a, radius * ring / 100) for a in angles)}" '
+                     f'fill="none" stroke="#ddd"/>')
+    for angle, label in zip(angles, labels):
+        x, y = xy(angle, radius)
+        parts.append(f'<line x1="{c}" y1="{c}" x2="{x:.1f}" y2="{y:.1f}" stroke="#ddd"/>')
+        x, y = xy(angle, radius + 14)
+        anchor = "middle" if abs(math.cos(angle)) < 0.3 else "start" if math.cos(angle) > 0 else "end"
+        parts.append(f'<text x="{x:.1f}" y="{y:.1f}" text-anchor="{anchor}" font-size="11">{html.escape(label)}</text>')
+    polygon = " ".join(point(a, radius * min(max(v, 0), 100) / 100) for a, v in zip(angles, values))
+    parts.append(f'<polygon points="{polygon}" fill="rgba(30,144,255,0.3)" stroke="blue" stroke-width="2"/>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def bar_svg(labels: Sequence[str], values: Sequence[float], width: int = 440, height: int = 400) -> str:
+    """Vertical bars colored by score band, value printed on each bar"""
+    left, bottom, top = 34, 80, 34
+    plot_h = height - bottom - top
+    slot = (width - left - 10) / len(labels)
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" role="img">',
+             f'<text x="{width / 2}" y="18" text-anchor="middle" font-size="15">Dimension Scores</text>']
+    for tick in range(0, 101, 20):
+        y = top + plot_h * (1 - tick / 100)
+        parts.append(f'<line x1="{left}" y1="{y:.1f}" x2="{width - 10}" y2="{y:.1f}" stroke="#eee"/>'
+                     f'<text x="{left - 4}" y="{y + 4:.1f}" text-anchor="end" font-size="10">{tick}</text>')
+    for i, (label, value) in enumerate(zip(labels, values)):
+        h = plot_h * min(max(value, 0), 100) / 100
+        x = left + i * slot + slot * 0.15
+        parts.append(f'<rect x="{x:.1f}" y="{top + plot_h - h:.1f}" width="{slot * 0.7:.1f}" height="{h:.1f}" '
+                     f'fill="{score_color(value)}"/>')
+        parts.append(f'<text x="{x + slot * 0.35:.1f}" y="{top + plot_h - h - 4:.1f}" text-anchor="middle" '
+                     f'font-size="11">{value:.1f}</text>')
+        lx, ly = x + slot * 0.35, top + plot_h + 12
+        parts.append(f'<text x="{lx:.1f}" y="{ly:.1f}" text-anchor="end" font-size="10" '
+                     f'transform="rotate(-35 {lx:.1f} {ly:.1f})">{html.escape(label)}</text>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+# Per worker process: the engine and the charts it has already read
+_engine: Optional[NexusInsightAssessment] = None
+_chart_cache: Dict[str, str] = {}
+
+
+def _init_worker(bank: List[Dict]):
+    global _engine
+    _engine = NexusInsightAssessment(questions=bank)
+
+
+def _render_charts(charts_dir: str, rounded: np.ndarray) -> int:
+    """Write radar and bar SVGs for each row of displayed scores (measured dimensions)"""
+    labels = [_engine.dimensions[d] for d in _engine.measured_dimensions]
+    for values in rounded:
+        key = chart_key(values)
+        for kind, render in (("radar", radar_svg), ("bar", bar_svg)):
+            path = os.path.join(charts_dir, f"{key}-{kind}.svg")
+            with open(f"{path}.tmp", "w") as f:
+                f.write(render(labels, values.tolist()))
+            os.replace(f"{path}.tmp", path)
+    return len(rounded)
+
+
+def _chart(charts_dir: str, key: str, kind: str) -> str:
+    name = f"{key}-{kind}"
+    svg = _chart_cache.get(name)
+    if svg is None:
+        with open(os.path.join(charts_dir, f"{name}.svg")) as f:
+            svg = f.read()
+        if len(_chart_cache) > 4096:
+            _chart_cache.clear()
+        _chart_cache[name] = svg
+    return svg
+
+
+def render_report(engine: NexusInsightAssessment, candidate: str, scores: Dict[str, float],
+                  radar: str, bar: str) -> str:
+    """One candidate's report from the engine's dashboard and recommendations"""
+    dashboard = engine.create_executive_dashboard(scores, candidate)
+    recommendations = engine.generate_ai_coach_recommendations(scores)
+    overall = dashboard["overall_score"]
+    esc = html.escape
+    dimensions = "".join(
+        DIMENSION_TEMPLATE.substitute(
+            color=score_color(data["score"]) if data["level"] != "Not Measured" else "#999",
+            score=f"{data['score']:.1f}", name=esc(engine.dimensions[dim]), level=esc(data["level"]),
+            interpretation=esc(engine._get_interpretation(dim, data["score"]))
+            if data["level"] != "Not Measured" else "Not measured by this question bank")
+        for dim, data in dashboard["dimension_scores"].items()
+    )
+    archetype = dashboard.get("archetype")
+    return REPORT_TEMPLATE.substitute(
+        candidate=esc(candidate),
+        report_date=esc(dashboard["report_date"]),
+        overall=f"{overall:.1f}",
+        style=esc(dashboard["leadership_style"].split(":")[0]),
+        innovation=f"{dashboard['innovation_potential']:.1f}",
+        level="High" if overall > 70 else "Medium" if overall > 40 else "Low",
+        archetype=f"<p><b>Profile Archetype:</b> {esc(archetype['name'])}</p>" if archetype else "",
+        radar=radar,
+        bar=bar,
+        dimensions=dimensions,
+        strengths="".join(f"<li><b>{esc(s['name'])}</b> ({s['score']:.1f}) - {esc(s['interpretation'])}</li>"
+                          for s in dashboard["top_strengths"]),
+        development="".join(
+            f"<li><b>{esc(a['name'])}</b> ({a['score']:.1f}): {esc('; '.join(a['recommendations']))}</li>"
+            for a in dashboard["development_areas"]),
+        recommendations="".join(
+            RECOMMENDATION_TEMPLATE.substitute(
+                title=esc(rec["title"]), priority=esc(rec["priority"].upper()), description=esc(rec["description"]),
+                actions="".join(f"<li>{esc(action)}</li>" for action in rec["actions"]))
+            for rec in recommendations) or "<p>No specific recommendations.</p>",
+    )
+
+
+def _write_reports(out_dir: str, chunk: int, candidates: List[str], scores: np.ndarray) -> int:
+    charts_dir = os.path.join(out_dir, "charts")
+    measured = [_engine.dimension_keys.index(d) for d in _engine.measured_dimensions]
+    for candidate, row in zip(candidates, scores):
+        key = chart_key(np.round(row[measured], 1))
+        html_text = render_report(_engine, candidate, dict(zip(_engine.dimension_keys, row.tolist())),
+                                  _chart(charts_dir, key, "radar"), _chart(charts_dir, key, "bar"))
+        path = os.path.join(out_dir, f"{safe_filename(candidate)}.html")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            f.write(html_text)
+        os.replace(f"{path}.tmp", path)
+    return chunk
+
+
+def safe_filename(candidate: str) -> str:
+    """File name for a candidate id: readable, and distinct for ids that only differ in replaced characters
+
+    ``a/b`` and ``a_b`` both read as ``a_b``, so a short hash of the raw id
+    is appended.
+    """
+    readable = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in candidate)[:100]
+    return f"{readable}-{hashlib.sha1(candidate.encode()).hexdigest()[:10]}"
+
+
+def source_fingerprint(engine: NexusInsightAssessment, scores: np.ndarray, candidates: Sequence[str]) -> str:
+    digest = hashlib.sha1(np.ascontiguousarray(scores).tobytes())
+    digest.update("\n".join(candidates).encode())
+    digest.update(json.dumps(engine.questions, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def render_batch(engine: NexusInsightAssessment, scores: np.ndarray, candidates: Sequence[str], out_dir: str,
+                 workers: int = 4, chunk_size: int = 500,
+                 progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """Write one report per row of ``scores`` into ``out_dir``, resuming a previous run"""
+    scores = np.asarray(scores, dtype=np.float32)
+    candidates = list(candidates)
+    if len(candidates) != len(scores):
+        raise ValueError(f"{len(candidates)} candidate ids for {len(scores)} score rows")
+    charts_dir = os.path.join(out_dir, "charts")
+    os.makedirs(charts_dir, exist_ok=True)
+
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    fingerprint = source_fingerprint(engine, scores, candidates)
+    manifest = {"source": fingerprint, "chunk_size": chunk_size, "done": []}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = json.load(f)
+        if previous["source"] != fingerprint or previous["chunk_size"] != chunk_size:
+            raise ValueError(f"{out_dir} holds reports from different inputs; use a new output directory")
+        manifest = previous
+    done = set(manifest["done"])
+
+    measured = [engine.dimension_keys.index(d) for d in engine.measured_dimensions]
+    displayed = np.round(scores[:, measured], 1)
+    unique = np.unique(displayed, axis=0)
+    missing = np.array([not os.path.exists(os.path.join(charts_dir, f"{chart_key(v)}-bar.svg")) for v in unique],
+                       dtype=bool)
+    to_render = unique[missing]
+
+    def chunk_rows(i):
+        return min(chunk_size, len(scores) - i * chunk_size)
+
+    pending = [i for i in range(math.ceil(len(scores) / chunk_size)) if i not in done]
+    resumed_from = written = sum(chunk_rows(i) for i in done)
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(engine.questions,)) as pool:
+        chart_jobs = [pool.submit(_render_charts, charts_dir, block)
+                      for block in np.array_split(to_render, max(1, min(len(to_render), workers * 4)))
+                      if len(block)]
+        for job in as_completed(chart_jobs):
+            job.result()
+
+        report_jobs = [
+            pool.submit(_write_reports, out_dir, i, candidates[i * chunk_size:(i + 1) * chunk_size],
+                        scores[i * chunk_size:(i + 1) * chunk_size])
+            for i in pending
+        ]
+        for job in as_completed(report_jobs):
+            chunk = job.result()
+            done.add(chunk)
+            written += chunk_rows(chunk)
+            manifest["done"] = sorted(done)
+            with open(f"{manifest_path}.tmp", "w") as f:
+                json.dump(manifest, f)
+            os.replace(f"{manifest_path}.tmp", manifest_path)
+            if progress is not None:
+                progress(written, len(scores))
+
+    return {
+        "reports": len(scores),
+        "written_this_run": written - resumed_from,
+        "distinct_charts": len(unique),
+        "charts_rendered": len(to_render),
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+def load_source(path: str):
+    """``(engine, scores)`` from a score store directory or a .nxa archive"""
+    if os.path.isdir(path):
+        from nexus_rescoring import ScoreStore
+
+        store = ScoreStore(path, mode="r")
+        return store.engine(), np.asarray(store.scores)
+
+    from nexus_archive import ArchiveReader
+
+    engine = NexusInsightAssessment()
+    with ArchiveReader(path, engine) as reader:
+        choices = reader.choices()
+    return engine, engine.score_matrix(choices)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Render standalone HTML candidate reports")
+    parser.add_argument("source", help="score store directory or .nxa archive")
+    parser.add_argument("out", help="output directory; rerun with the same arguments to resume")
+    parser.add_argument("--ids", help="text file with one candidate id per row (default: row numbers)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    engine, scores = load_source(args.source)
+    if args.ids:
+        with open(args.ids) as f:
+            candidates = [line.strip() for line in f if line.strip()]
+    else:
+        candidates = [f"candidate-{i:07d}" for i in range(len(scores))]
+
+    def progress(done, total):
+        sys.stdout.write(f"\r{done}/{total} reports")
+        sys.stdout.flush()
+
+    result = render_batch(engine, scores, candidates, args.out, workers=args.workers,
+                          chunk_size=args.chunk_size, progress=progress)
+    print(f"\n{result['written_this_run']} reports written in {result['seconds']:.1f}s; "
+          f"{result['charts_rendered']} of {result['distinct_charts']} distinct charts rendered")
+
+
+if __name__ == "__main__":
+    main()
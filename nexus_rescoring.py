@@ -0,0 +1,380 @@
+# nexus_rescoring.py
+"""Stored score matrices and delta re-scoring when option weights change.
+
+A score store is a directory of memory-mapped arrays, one row per completed
+assessment:
+
+    choices.npy   int8    (n, questions)   selected option, -1 if unanswered (column-major)
+    totals.npy    float32 (n, dimensions)  raw weight totals
+    lower.npy     float32 (n, dimensions)  lowest total the answered questions allow
+    upper.npy     float32 (n, dimensions)  highest total the answered questions allow
+    scores.npy    float32 (n, dimensions)  normalized scores, columns in engine.dimension_keys
+    bank.json                              the question bank the store is scored against
+    adjustments.json                       the engine's adjustment_version() the scores carry
+
+When psychologists edit option weights, only the response columns of the
+changed questions are read: the weight difference for each row's chosen
+option and the change in the questions' ranges are added to the stored
+totals and bounds in place, and only the affected rows are renormalized.
+If the engine applies a different cross-dimension adjustment set than the
+store was scored with, every row is renormalized from the stored totals so
+the store never mixes adjustment sets. Stores without ``adjustments.json``
+predate the record and are treated as a change.
+
+A delta re-score changes the arrays in place before it saves the new bank,
+so it journals its progress to be safe to run again after a crash:
+
+    pending.json                           digest of the bank being applied and the next row to do
+    redo.npz                               new values of one chunk's rows, written before the chunk
+
+Running the same re-score again replays the journaled chunk, resumes at the
+next row and never applies a delta twice; a re-score to another bank is
+refused until it has finished.
+
+Stores written before normalization used exact bank bounds hold a
+``counts.npy`` instead of the bounds; ``migrate`` rebuilds them and
+re-scores every row.
+
+    python nexus_rescoring.py export-bank bank.json
+    python nexus_rescoring.py create store/ cohort.parquet
+    python nexus_rescoring.py rescore store/ edited_bank.json
+    python nexus_rescoring.py migrate store/
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from nexus_engine import NexusInsightAssessment
+
+ARRAYS = {
+    "choices": np.int8,
+    "totals": np.float32,
+    "lower": np.float32,
+    "upper": np.float32,
+    "scores": np.float32,
+}
+
+
+class ScoreStore:
+    """Directory of memory-mapped per-assessment arrays"""
+
+    def __init__(self, directory: str, mode: str = "r+"):
+        self.directory = directory
+        if not os.path.exists(os.path.join(directory, "lower.npy")):
+            raise ValueError(f"{directory} was scored with count-based bounds; "
+                             f"run 'python nexus_rescoring.py migrate {directory}' first")
+        self.arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode)
+            for name in ARRAYS
+        }
+        self.choices = self.arrays["choices"]
+        self.totals = self.arrays["totals"]
+        self.lower = self.arrays["lower"]
+        self.upper = self.arrays["upper"]
+        self.scores = self.arrays["scores"]
+        with open(os.path.join(directory, "bank.json")) as f:
+            self.bank = json.load(f)
+        try:
+            with open(os.path.join(directory, "adjustments.json")) as f:
+                self.adjustment_version = json.load(f)["version"]
+        except FileNotFoundError:
+            self.adjustment_version = None
+
+    def __len__(self) -> int:
+        return len(self.arrays["choices"])
+
+    def engine(self) -> NexusInsightAssessment:
+        """Engine for the bank this store is currently scored against"""
+        return NexusInsightAssessment(questions=self.bank)
+
+    def flush(self):
+        for array in self.arrays.values():
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def save_bank(self, questions: List[Dict]):
+        path = os.path.join(self.directory, "bank.json")
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(questions, f)
+        os.replace(f"{path}.tmp", path)
+        self.bank = questions
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def pending(self) -> Optional[Dict]:
+        """The unfinished delta re-score recorded in this store, if any"""
+        try:
+            with open(self._path("pending.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save_pending(self, bank_digest: str, next_row: int):
+        path = self._path("pending.json")
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({"bank": bank_digest, "next_row": next_row}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{path}.tmp", path)
+
+    def save_redo(self, rows: np.ndarray, end: int, totals: np.ndarray, lower: np.ndarray, upper: np.ndarray,
+                  scores: np.ndarray):
+        """Journal a chunk's new values; the chunk ends before row ``end``"""
+        path = self._path("redo.npz")
+        with open(f"{path}.tmp", "wb") as f:
+            np.savez(f, rows=rows, end=np.array(end), totals=totals, lower=lower, upper=upper, scores=scores)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{path}.tmp", path)
+
+    def replay_redo(self, bank_digest: str):
+        """Write a journaled chunk (again) and move the pending row past it"""
+        path = self._path("redo.npz")
+        if not os.path.exists(path):
+            return
+        with np.load(path) as redo:
+            rows = redo["rows"]
+            for name in ("totals", "lower", "upper", "scores"):
+                self.arrays[name][rows] = redo[name]
+            end = int(redo["end"])
+        self.flush()
+        self.save_pending(bank_digest, end)
+        os.remove(path)
+
+    def clear_pending(self):
+        for name in ("redo.npz", "pending.json"):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+
+    def save_adjustment_version(self, version):
+        path = os.path.join(self.directory, "adjustments.json")
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({"version": version}, f)
+        os.replace(f"{path}.tmp", path)
+        self.adjustment_version = version
+
+    @classmethod
+    def create(cls, directory: str, engine: NexusInsightAssessment, choices: np.ndarray,
+               chunk_size: int = 500_000) -> "ScoreStore":
+        """Score ``choices`` with ``engine`` and write a new store"""
+        os.makedirs(directory, exist_ok=True)
+        n = len(choices)
+        shapes = {
+            "choices": (n, len(engine.questions)),
+            "totals": (n, len(engine.dimension_keys)),
+            "lower": (n, len(engine.dimension_keys)),
+            "upper": (n, len(engine.dimension_keys)),
+            "scores": (n, len(engine.dimension_keys)),
+        }
+        # Choices are stored column-major so a delta re-score reads only the changed questions
+        arrays = {
+            name: np.lib.format.open_memmap(os.path.join(directory, f"{name}.npy"), mode="w+",
+                                            dtype=ARRAYS[name], shape=shapes[name],
+                                            fortran_order=name == "choices")
+            for name in ARRAYS
+        }
+        for start in range(0, n, chunk_size):
+            rows = slice(start, min(start + chunk_size, n))
+            block = np.asarray(choices[rows], dtype=np.int8)
+            totals, lower, upper = engine.raw_dimension_totals(block)
+            arrays["choices"][rows] = block
+            arrays["totals"][rows] = totals
+            arrays["lower"][rows] = lower
+            arrays["upper"][rows] = upper
+            arrays["scores"][rows] = engine.normalize_dimension_totals(totals, lower, upper)
+        for array in arrays.values():
+            array.flush()
+        del arrays
+        with open(os.path.join(directory, "bank.json"), "w") as f:
+            json.dump(engine.questions, f)
+        with open(os.path.join(directory, "adjustments.json"), "w") as f:
+            json.dump({"version": engine.adjustment_version()}, f)
+        return cls(directory)
+
+
+def weight_delta(old: NexusInsightAssessment, new: NexusInsightAssessment):
+    """Weight and question-range differences between two versions of the same bank
+
+    Returns ``(delta_weights, delta_min, delta_max, changed)`` where
+    ``changed`` lists the question indices whose weights differ. Only weight edits can be applied
+    as a delta; adding, removing or reordering questions, options or
+    dimensions needs a full re-score.
+    """
+    if [q["id"] for q in old.questions] != [q["id"] for q in new.questions]:
+        raise ValueError("Question ids or order differ between bank versions; run a full re-score")
+    if old.dimension_keys != new.dimension_keys:
+        raise ValueError("Dimensions differ between bank versions; run a full re-score")
+    if old.weight_tensor.shape != new.weight_tensor.shape or not np.array_equal(old.option_mask, new.option_mask):
+        raise ValueError("Option counts differ between bank versions; run a full re-score")
+
+    delta_weights = new.weight_tensor - old.weight_tensor
+    changed = np.flatnonzero((delta_weights != 0).any(axis=(1, 2)))
+    return delta_weights, new.option_min - old.option_min, new.option_max - old.option_max, changed
+
+
+def bank_digest(questions: List[Dict]) -> str:
+    return hashlib.sha1(json.dumps(questions, sort_keys=True).encode()).hexdigest()
+
+
+def delta_rescore(store: ScoreStore, new_engine: NexusInsightAssessment,
+                  chunk_size: int = 2_000_000) -> Dict:
+    """Bring a store up to ``new_engine``'s weights, touching only the changed questions
+
+    Every row is renormalized instead when ``new_engine`` applies a
+    different adjustment set than the stored scores carry. An interrupted
+    run is finished by running it again.
+    """
+    started = time.perf_counter()
+    old_engine = store.engine()
+    delta_weights, delta_min, delta_max, changed = weight_delta(old_engine, new_engine)
+    adjustment_version = new_engine.adjustment_version()
+    readjust = store.adjustment_version != adjustment_version
+    digest = bank_digest(new_engine.questions)
+    pending = store.pending()
+    if pending is not None and pending["bank"] != digest:
+        raise ValueError(f"{store.directory} has an unfinished re-score to another bank; run that one again first")
+    if pending is None:
+        store.save_pending(digest, 0)
+    store.replay_redo(digest)
+    first_row = store.pending()["next_row"]
+
+    rows_updated = 0
+    if len(changed):
+        # Only the changed question columns are read; the rest of the matrix stays on disk
+        for start in range(first_row, len(store), chunk_size):
+            end = min(start + chunk_size, len(store))
+            rows = slice(start, end)
+            picked = np.column_stack([store.choices[rows, q] for q in changed]).astype(np.intp)
+            answered = picked >= 0
+            picked = np.where(answered, picked, 0)
+            d_totals = (delta_weights[changed, picked] * answered[:, :, None]).sum(axis=1)
+            d_lower = answered.astype(np.float32) @ delta_min[changed]
+            d_upper = answered.astype(np.float32) @ delta_max[changed]
+
+            affected = np.flatnonzero((d_totals != 0).any(axis=1) | (d_lower != 0).any(axis=1)
+                                      | (d_upper != 0).any(axis=1))
+            if not len(affected):
+                store.save_pending(digest, end)
+                continue
+            idx = affected + start
+            totals = store.totals[idx] + d_totals[affected]
+            lower = store.lower[idx] + d_lower[affected]
+            upper = store.upper[idx] + d_upper[affected]
+            # Journaled before the arrays change, so a crash part-way through the chunk is replayed, not redone
+            store.save_redo(idx, end, totals, lower, upper, new_engine.normalize_dimension_totals(totals, lower, upper))
+            store.replay_redo(digest)
+            rows_updated += len(affected)
+
+    if readjust:
+        for start in range(0, len(store), chunk_size):
+            rows = slice(start, min(start + chunk_size, len(store)))
+            store.scores[rows] = new_engine.normalize_dimension_totals(store.totals[rows], store.lower[rows],
+                                                                       store.upper[rows])
+        rows_updated = len(store)
+
+    store.flush()
+    store.save_bank(new_engine.questions)
+    store.save_adjustment_version(adjustment_version)
+    store.clear_pending()
+    return {
+        "changed_questions": [new_engine.questions[i]["id"] for i in changed],
+        "adjustments": adjustment_version,
+        "rows": len(store),
+        "rows_updated": rows_updated,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def full_rescore(store: ScoreStore, new_engine: NexusInsightAssessment, chunk_size: int = 500_000) -> Dict:
+    """Re-score every row from the stored choices"""
+    started = time.perf_counter()
+    for start in range(0, len(store), chunk_size):
+        rows = slice(start, min(start + chunk_size, len(store)))
+        totals, lower, upper = new_engine.raw_dimension_totals(np.asarray(store.choices[rows]))
+        store.totals[rows] = totals
+        store.lower[rows] = lower
+        store.upper[rows] = upper
+        store.scores[rows] = new_engine.normalize_dimension_totals(totals, lower, upper)
+    store.flush()
+    store.save_bank(new_engine.questions)
+    store.save_adjustment_version(new_engine.adjustment_version())
+    # Every row now follows from the stored choices, so an unfinished delta re-score is moot
+    store.clear_pending()
+    return {"rows": len(store), "rows_updated": len(store), "adjustments": new_engine.adjustment_version(),
+            "seconds": time.perf_counter() - started}
+
+
+def migrate_store(directory: str) -> Dict:
+    """Replace a count-based store's touch counts with exact bounds and re-score every row"""
+    counts_path = os.path.join(directory, "counts.npy")
+    if os.path.exists(os.path.join(directory, "lower.npy")):
+        return {"rows": len(ScoreStore(directory, mode="r")), "rows_updated": 0, "seconds": 0.0}
+    with open(os.path.join(directory, "bank.json")) as f:
+        engine = NexusInsightAssessment(questions=json.load(f))
+    n = len(np.load(os.path.join(directory, "choices.npy"), mmap_mode="r"))
+    for name in ("lower", "upper"):
+        array = np.lib.format.open_memmap(os.path.join(directory, f"{name}.npy"), mode="w+", dtype=ARRAYS[name],
+                                          shape=(n, len(engine.dimension_keys)))
+        array.flush()
+        del array
+    result = full_rescore(ScoreStore(directory), engine)
+    if os.path.exists(counts_path):
+        os.remove(counts_path)
+    return result
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Manage stored Nexus Insight score matrices")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export-bank", help="write the built-in question bank to JSON for editing")
+    export.add_argument("path")
+
+    create = sub.add_parser("create", help="build a store from a cohort Parquet file")
+    create.add_argument("store")
+    create.add_argument("parquet")
+
+    rescore = sub.add_parser("rescore", help="apply an edited bank to a store")
+    rescore.add_argument("store")
+    rescore.add_argument("bank")
+    rescore.add_argument("--full", action="store_true", help="re-score every row instead of the delta")
+
+    migrate = sub.add_parser("migrate", help="move a count-based store to exact bank bounds")
+    migrate.add_argument("store")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "export-bank":
+        with open(args.path, "w") as f:
+            json.dump(NexusInsightAssessment().questions, f, indent=2)
+        print(f"Wrote question bank to {args.path}")
+
+    elif args.command == "create":
+        import pyarrow.parquet as pq
+
+        engine = NexusInsightAssessment()
+        columns = [f"q{q['id']}" for q in engine.questions]
+        table = pq.read_table(args.parquet, columns=columns)
+        choices = np.column_stack([table[c].to_numpy() for c in columns]).astype(np.int8)
+        store = ScoreStore.create(args.store, engine, choices)
+        print(f"Created store with {len(store)} rows in {args.store}")
+
+    elif args.command == "rescore":
+        with open(args.bank) as f:
+            new_engine = NexusInsightAssessment(questions=json.load(f))
+        store = ScoreStore(args.store)
+        result = full_rescore(store, new_engine) if args.full else delta_rescore(store, new_engine)
+        print(json.dumps(result, indent=2))
+
+    elif args.command == "migrate":
+        print(json.dumps(migrate_store(args.store), indent=2))
+
+
+if __name__ == "__main__":
+    main()
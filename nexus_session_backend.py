@@ -0,0 +1,178 @@
+# nexus_session_backend.py
+"""Session state shared by every app process, so nodes need no sticky sessions.
+
+A backend stores one versioned blob per session id. Every write is a single
+upsert of that row that bumps its version; every read first compares the
+stored version with the locally cached one and only transfers the blob when
+another node has written since. Blobs are msgpack when it is installed and
+zlib-compressed JSON otherwise, tagged so either reader can tell them apart.
+
+Writes are conditional on the version the writer read. A writer that loses
+the race reloads the session and merges with ``merge_states``.
+
+The SQLite backend works for any number of processes sharing a filesystem
+(WAL mode, so readers never block the writer). Other stores can be plugged in
+by implementing :class:`SessionBackend`.
+"""
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_TAG = b"M"
+JSON_TAG = b"J"
+
+
+def _plain(value: Any) -> Any:
+    """Numpy scalars and arrays as built-in types"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot serialize {type(value).__name__} in session state")
+
+
+def encode_state(state: Dict[str, Any]) -> bytes:
+    if msgpack is not None:
+        return MSGPACK_TAG + msgpack.packb(state, default=_plain, use_bin_type=True)
+    return JSON_TAG + zlib.compress(json.dumps(state, default=_plain, separators=(",", ":")).encode(), 6)
+
+
+def decode_state(blob: bytes) -> Dict[str, Any]:
+    tag, body = blob[:1], blob[1:]
+    if tag == MSGPACK_TAG:
+        if msgpack is None:
+            raise ValueError("Session was written with msgpack, which is not installed on this node")
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    if tag == JSON_TAG:
+        return json.loads(zlib.decompress(body))
+    raise ValueError(f"Unknown session encoding {tag!r}")
+
+
+def merge_states(base: Dict[str, Any], ours: Dict[str, Any], theirs: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """Three-way merge of a session written concurrently by this run (``ours``) and another node (``theirs``)
+
+    ``base`` is the state both started from. A key changed on one side only
+    takes that side's value. Keys both sides changed differently are
+    conflicts: the stored value is kept, since the other node has already
+    shown it, and the keys are returned so the conflict can be reported.
+    States are compared as decoded blobs, so pass each through
+    ``decode_state(encode_state(...))`` first.
+    """
+    merged, conflicts = dict(theirs), []
+    for key in set(ours) | set(theirs):
+        mine, stored, before = ours.get(key), theirs.get(key), base.get(key)
+        if mine == stored or mine == before:
+            continue
+        if stored == before:
+            merged[key] = mine
+        else:
+            conflicts.append(key)
+    return merged, sorted(conflicts)
+
+
+class SessionBackend:
+    """Interface for shared session stores"""
+
+    def load(self, session_id: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """``(version, state)`` of a session; ``(0, None)`` if it does not exist"""
+        raise NotImplementedError
+
+    def save(self, session_id: str, state: Dict[str, Any], base_version: int) -> Optional[int]:
+        """Write ``state`` if the stored version is still ``base_version``
+
+        Returns the new version, or None when another node wrote first.
+        """
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        raise NotImplementedError
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """Sessions in one SQLite table with a per-process read cache"""
+
+    def __init__(self, path: str, timeout: float = 10.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._cache_lock = threading.Lock()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY, version INTEGER NOT NULL, updated REAL NOT NULL, data BLOB NOT NULL)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; Streamlit runs each session's script on its own thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+        with self._cache_lock:
+            cached = self._cache.get(session_id)
+        cached_version = cached[0] if cached else -1
+        # The blob only comes back when the stored version differs from the cached one
+        row = self._conn().execute(
+            "SELECT version, CASE WHEN version != ? THEN data END FROM sessions WHERE id = ?",
+            (cached_version, session_id),
+        ).fetchone()
+        if row is None:
+            return 0, None
+        version, blob = row
+        if blob is None:
+            return version, cached[1]
+        state = decode_state(blob)
+        with self._cache_lock:
+            self._cache[session_id] = (version, state)
+        return version, state
+
+    def save(self, session_id: str, state: Dict[str, Any], base_version: int) -> Optional[int]:
+        blob = encode_state(state)
+        conn = self._conn()
+        with conn:
+            if base_version == 0:
+                cursor = conn.execute(
+                    "INSERT INTO sessions (id, version, updated, data) VALUES (?, 1, ?, ?) ON CONFLICT(id) DO NOTHING",
+                    (session_id, time.time(), blob),
+                )
+            else:
+                cursor = conn.execute(
+                    "UPDATE sessions SET version = version + 1, updated = ?, data = ? WHERE id = ? AND version = ?",
+                    (time.time(), blob, session_id, base_version),
+                )
+        if cursor.rowcount != 1:
+            return None
+        with self._cache_lock:
+            self._cache[session_id] = (base_version + 1, state)
+        return base_version + 1
+
+    def delete(self, session_id: str):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        with self._cache_lock:
+            self._cache.pop(session_id, None)
+
+    def purge(self, older_than_seconds: float) -> int:
+        """Drop sessions not written for ``older_than_seconds``; returns how many"""
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute("DELETE FROM sessions WHERE updated < ?", (time.time() - older_than_seconds,))
+        return cursor.rowcount
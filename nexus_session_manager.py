@@ -0,0 +1,168 @@
+# nexus_session_manager.py
+"""Idle-session spill to disk for memory-bounded servers.
+
+Session state lives in Streamlit's session state while a session is in use.
+Each run tells the manager when it starts and when it ends, passing a
+``spill`` callable that removes the session's bulky state (responses,
+scores, dashboard, ...) from Streamlit's session state and returns it. The
+manager tracks activity and, without ever touching a session during a run:
+
+- spills sessions idle for ``idle_seconds`` to one compact file each
+  (the tagged msgpack / zlib-JSON encoding of nexus_session_backend), from a
+  background sweep,
+- spills least recently used idle sessions whenever the in-memory total
+  exceeds ``memory_budget`` bytes,
+- hands a spilled session's state back when its next run starts.
+
+Sizes are a recursive ``sys.getsizeof`` of the state, an estimate of what a
+session pins in memory. Transient values (caches the app can rebuild) are
+dropped on spill. Spill files of sessions that never come back are removed
+after ``spill_ttl`` seconds.
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from nexus_session_backend import decode_state, encode_state
+
+SPILL_SUFFIX = ".nxs"
+
+
+def deep_size(value: Any) -> int:
+    """Approximate bytes held by a tree of dicts, lists, strings, numbers and arrays"""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(deep_size(k) + deep_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(deep_size(v) for v in value)
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + (0 if value.flags.owndata else value.nbytes)
+    return sys.getsizeof(value)
+
+
+class SessionManager:
+    """Per-process activity LRU of live sessions with idle spill to disk"""
+
+    def __init__(self, spill_dir: str = "session_spill", idle_seconds: float = 900.0,
+                 memory_budget: int = 256 * 1024 * 1024, spill_ttl: float = 7 * 86_400.0,
+                 sweep_seconds: float = 30.0):
+        self.spill_dir = spill_dir
+        self.idle_seconds = idle_seconds
+        self.memory_budget = memory_budget
+        self.spill_ttl = spill_ttl
+        self._lock = threading.Lock()
+        # session id -> {"spill", "size", "active", "running"}, least recently active first
+        self._live: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._counters = {"runs": 0, "spilled_idle": 0, "spilled_budget": 0, "rehydrated": 0, "expired": 0}
+        os.makedirs(spill_dir, exist_ok=True)
+        self._stop = threading.Event()
+        if sweep_seconds > 0:
+            threading.Thread(target=self._sweep_loop, args=(sweep_seconds,), daemon=True).start()
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.spill_dir, f"{session_id}{SPILL_SUFFIX}")
+
+    def begin(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Mark a run of the session as started; a running session is never spilled
+
+        Returns the session's state if it was spilled since its last run, for
+        the caller to put back, and None otherwise.
+        """
+        with self._lock:
+            entry = self._live.get(session_id)
+            if entry is not None:
+                entry["running"] = True
+                self._live.move_to_end(session_id)
+                return None
+            self._live[session_id] = {"spill": None, "size": 0, "active": time.monotonic(), "running": True}
+            path = self._path(session_id)
+            try:
+                with open(path, "rb") as f:
+                    blob = f.read()
+            except FileNotFoundError:
+                return None
+            os.remove(path)
+            self._counters["rehydrated"] += 1
+        return decode_state(blob)
+
+    def end(self, session_id: str, spill: Callable[[], Dict[str, Any]], size: int):
+        """Mark the run finished; ``spill`` takes the state out of the session when it is spilled
+
+        ``size`` is the session's current :func:`deep_size`.
+        """
+        with self._lock:
+            old = self._live.pop(session_id, None)
+            if old is not None:
+                self._bytes -= old["size"]
+            self._live[session_id] = {"spill": spill, "size": size, "active": time.monotonic(), "running": False}
+            self._bytes += size
+            self._counters["runs"] += 1
+            if self._bytes > self.memory_budget:
+                for other in [sid for sid, e in self._live.items() if not e["running"] and sid != session_id]:
+                    self._spill_locked(other, "spilled_budget")
+                    if self._bytes <= self.memory_budget:
+                        break
+
+    def _spill_locked(self, session_id: str, reason: str):
+        # Spill files are a few KB; writing them under the lock keeps a run of the
+        # same session from starting while its state is half moved to disk
+        entry = self._live.pop(session_id)
+        self._bytes -= entry["size"]
+        try:
+            state = entry["spill"]()
+        except Exception:
+            return  # the session is gone; nothing left to keep
+        path = self._path(session_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encode_state(state))
+        os.replace(tmp_path, path)
+        self._counters[reason] += 1
+
+    def sweep(self):
+        """Spill sessions idle past the timeout and delete expired spill files"""
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._lock:
+            # Activity order, so idle sessions are at the front
+            idle = []
+            for session_id, entry in self._live.items():
+                if entry["active"] >= cutoff:
+                    break
+                if not entry["running"]:
+                    idle.append(session_id)
+            for session_id in idle:
+                self._spill_locked(session_id, "spilled_idle")
+
+        expire_before = time.time() - self.spill_ttl
+        for name in os.listdir(self.spill_dir):
+            path = os.path.join(self.spill_dir, name)
+            with self._lock:
+                try:
+                    if os.path.getmtime(path) < expire_before:
+                        os.remove(path)
+                        self._counters["expired"] += 1
+                except FileNotFoundError:
+                    pass
+
+    def _sweep_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.sweep()
+            except OSError:
+                pass
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            in_memory, used = len(self._live), self._bytes
+            counters = dict(self._counters)
+        spilled = sum(1 for name in os.listdir(self.spill_dir) if name.endswith(SPILL_SUFFIX))
+        return {**counters, "in_memory": in_memory, "bytes": used, "budget": self.memory_budget,
+                "on_disk": spilled}
+
+    def close(self):
+        self._stop.set()
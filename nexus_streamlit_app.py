@@ -1,16 +1,40 @@
 # nexus_streamlit_app.py
 import streamlit as st
 import pandas as pd
-import numpy as np
-import json
-import random
-from typing import Dict, List, Any
+import os
+import time
+import uuid
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from streamlit.web.server.websocket_headers import _get_websocket_headers
+from nexus_engine import NexusInsightAssessment
+from nexus_archetypes import ArchetypeModel
+from nexus_careless import CarelessMonitor, centered_weights
+from nexus_catalog import ActionCatalog
+from nexus_correlations import AdjustmentRegistry, CorrelationAggregator
+from nexus_drafts import DraftStore
+from nexus_history import HistoryStore
+from nexus_item_analysis import ItemStatsAggregator, bank_fingerprint
+from nexus_latency import LatencyAggregator
+from nexus_locale import SOURCE_LOCALE, LocaleCatalog
+from nexus_mentor import ProfileIndex
+from nexus_replay import EventLog
+from nexus_report_worker import ReportWorker, compute_report
+from nexus_session_backend import SQLiteSessionBackend, decode_state, encode_state, merge_states
+from nexus_session_manager import SessionManager, deep_size
+from nexus_team_compare import TeamDistanceCache
+from nexus_whatif import WhatIfSimulator
 import warnings
 warnings.filterwarnings('ignore')
 
+# Admin-only pages are hidden from candidates unless the server opts in
+ADMIN_MODE = os.environ.get("NEXUS_ADMIN") == "1"
+# Request header in which an authenticating reverse proxy passes the signed-in user.
+# Without it every session is anonymous and repeat assessments are not tracked.
+USER_HEADER = os.environ.get("NEXUS_USER_HEADER")
+
 # Set page configuration
 st.set_page_config(
     page_title="Nexus Insight Assessment",
@@ -69,401 +93,89 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-class NexusInsightAssessment:
-    def __init__(self):
-        self.dimensions = {
-            'Psy': 'Psychological Metrics',
-            'CT': 'Critical Thinking', 
-            'LT': 'Logical Thinking',
-            'LD': 'Leadership',
-            'Cog': 'Cognitive Skills',
-            'TR': 'Team Roles'
-        }
-        
-        self.thresholds = {
-            'Low': (0, 40),
-            'Medium': (40, 70), 
-            'High': (70, 100)
-        }
-        
-        self.questions = self._create_innovative_questions()
-        
-    def _create_innovative_questions(self) -> List[Dict]:
-        """Create innovative assessment questions with real-world scenarios"""
-        questions = [
-            {
-                "id": 1,
-                "text": "You're the young founder of an AI startup. After 6 months of launch, a major competitor copies your product and offers it at 50% lower price. Your team is demotivated. What do you do?",
-                "type": "situational_judgment",
-                "scenario_type": "startup_crisis",
-                "options": [
-                    {"text": "Rush to develop unique features and lower prices to compete", "weights": {"Psy": -3, "LD": 2, "CT": 1}},
-                    {"text": "Host brainstorming session with team for creative solutions", "weights": {"LD": 4, "TR": 3, "Cog": 2}},
-                    {"text": "Focus on different customer segment not served by competitor", "weights": {"CT": 4, "LD": 3, "Psy": 2}},
-                    {"text": "Seek strategic partnership with larger company", "weights": {"TR": 4, "LD": 3, "CT": 2}}
-                ],
-                "creative_elements": ["Startup environment", "Fierce competition", "Creative problem-solving"],
-                "dimensions": ["Psy", "LD", "CT", "TR"]
-            },
-            {
-                "id": 2,
-                "text": "An investor asks you to completely change your business model for funding. This conflicts with your core vision. How do you handle this dilemma?",
-                "type": "ethical_dilemma", 
-                "scenario_type": "investor_pressure",
-                "options": [
-                    {"text": "Reject the offer and maintain your vision", "weights": {"Psy": 4, "LD": 3, "CT": -2}},
-                    {"text": "Accept with reservations and minor adjustments", "weights": {"TR": 3, "LD": 2, "Psy": 1}},
-                    {"text": "Negotiate to find middle ground satisfying both parties", "weights": {"LD": 4, "CT": 3, "TR": 3}},
-                    {"text": "Request time to think and consult mentors", "weights": {"CT": 4, "Psy": 3, "Cog": 2}}
-                ],
-                "creative_elements": ["Ethical dilemma", "Investor pressure", "Vision preservation"],
-                "dimensions": ["Psy", "LD", "CT", "TR"]
-            },
-            {
-                "id": 3,
-                "text": "Your top performer is highly productive but creates team conflicts. Do you prioritize results or team harmony?",
-                "type": "leadership_dilemma",
-                "scenario_type": "team_management",
-                "options": [
-                    {"text": "Focus on results and manage conflicts separately", "weights": {"LD": 3, "Psy": -2, "TR": -3}},
-                    {"text": "Coach the employee on teamwork while acknowledging contributions", "weights": {"LD": 4, "Psy": 3, "TR": 4}},
-                    {"text": "Reassign to individual contributor role", "weights": {"TR": 3, "LD": 2, "CT": 2}},
-                    {"text": "Implement team-building activities addressing the issue", "weights": {"TR": 4, "LD": 3, "Psy": 3}}
-                ],
-                "creative_elements": ["Performance vs harmony", "Leadership challenge", "Conflict resolution"],
-                "dimensions": ["LD", "TR", "Psy", "CT"]
-            },
-            {
-                "id": 4,
-                "text": "As a manager in traditional manufacturing company, you need to lead digital transformation. 60% of employees resist change. What's your strategy?",
-                "type": "change_management",
-                "scenario_type": "digital_resistance", 
-                "options": [
-                    {"text": "Enforce change gradually with intensive training", "weights": {"LD": 3, "Psy": -2, "TR": 1}},
-                    {"text": "Identify 'change champions' and make them transformation ambassadors", "weights": {"TR": 4, "LD": 4, "Psy": 3}},
-                    {"text": "Start with small pilot project to demonstrate success", "weights": {"CT": 4, "LD": 3, "Cog": 2}},
-                    {"text": "Redesign incentives to encourage voluntary adoption", "weights": {"LD": 4, "Psy": 3, "CT": 3}}
-                ],
-                "creative_elements": ["Digital transformation", "Change resistance", "Adoption strategy"],
-                "dimensions": ["LD", "TR", "Psy", "CT"]
-            },
-            {
-                "id": 5,
-                "text": "AI implementation will replace 30% of manual jobs in your department. How do you lead this transition ethically?",
-                "type": "ethical_leadership",
-                "scenario_type": "ai_implementation",
-                "options": [
-                    {"text": "Implement quickly and offer severance packages", "weights": {"LD": 2, "Psy": -4, "CT": 1}},
-                    {"text": "Create upskilling programs and gradual transition plan", "weights": {"LD": 5, "TR": 4, "Psy": 4}},
-                    {"text": "Slow implementation and seek alternative roles", "weights": {"CT": 3, "LD": 3, "TR": 3}},
-                    {"text": "Form employee committee to co-design transition", "weights": {"TR": 5, "LD": 4, "CT": 4}}
-                ],
-                "creative_elements": ["AI ethics", "Workforce transition", "Inclusive decision-making"],
-                "dimensions": ["LD", "CT", "TR", "Psy"]
-            },
-            {
-                "id": 6,
-                "text": "Market research shows your product is becoming obsolete. Do you invest in incremental improvements or radical innovation?",
-                "type": "strategic_decision",
-                "scenario_type": "innovation_crossroads",
-                "options": [
-                    {"text": "Focus on improving existing product features", "weights": {"CT": 3, "LD": 2, "Psy": -2}},
-                    {"text": "Allocate resources for breakthrough innovation", "weights": {"LD": 4, "CT": 4, "Cog": 3}},
-                    {"text": "Pursue both paths with separate teams", "weights": {"TR": 4, "LD": 3, "CT": 3}},
-                    {"text": "Acquire innovative startup instead of internal development", "weights": {"CT": 4, "LD": 3, "TR": 2}}
-                ],
-                "creative_elements": ["Innovation strategy", "Risk assessment", "Strategic thinking"],
-                "dimensions": ["LD", "CT", "TR", "Cog"]
-            },
-            {
-                "id": 7,
-                "text": "Major data breach exposes customer information. Media is calling, stock price is dropping. What's your first response?",
-                "type": "crisis_management",
-                "scenario_type": "data_breach",
-                "options": [
-                    {"text": "Issue immediate public apology and transparency", "weights": {"LD": 4, "CT": 3, "Psy": 3}},
-                    {"text": "First contain breach internally, then communicate", "weights": {"CT": 4, "LD": 3, "Cog": 3}},
-                    {"text": "Blame technical issues and minimize responsibility", "weights": {"LD": -4, "Psy": -3, "CT": -2}},
-                    {"text": "Activate crisis team and follow pre-established protocol", "weights": {"LD": 5, "CT": 4, "TR": 4}}
-                ],
-                "creative_elements": ["Crisis leadership", "Stakeholder management", "Quick decision-making"],
-                "dimensions": ["LD", "CT", "Psy", "TR"]
-            },
-            {
-                "id": 8,
-                "text": "Expanding to new international market, you discover cultural practices conflicting with company values. How do you proceed?",
-                "type": "cross_cultural",
-                "scenario_type": "global_expansion",
-                "options": [
-                    {"text": "Adapt company practices to local culture", "weights": {"TR": 3, "LD": 2, "Psy": 2}},
-                    {"text": "Maintain company values and educate local partners", "weights": {"LD": 4, "CT": 3, "Psy": 3}},
-                    {"text": "Find compromise respecting both perspectives", "weights": {"CT": 4, "LD": 4, "TR": 3}},
-                    {"text": "Reconsider market entry if values conflict irreconcilably", "weights": {"CT": 5, "LD": 3, "Psy": 4}}
-                ],
-                "creative_elements": ["Cultural intelligence", "Values-based leadership", "Global mindset"],
-                "dimensions": ["LD", "CT", "Psy", "TR"]
-            },
-            {
-                "id": 9,
-                "text": "Metaverse technology could transform your industry in 5 years. Do you invest heavily now or wait for market maturity?",
-                "type": "future_strategy",
-                "scenario_type": "emerging_technology",
-                "options": [
-                    {"text": "Heavy investment to become early leader", "weights": {"LD": 4, "CT": 3, "Psy": 2}},
-                    {"text": "Wait for clear ROI and proven use cases", "weights": {"CT": 4, "LD": 2, "Psy": 3}},
-                    {"text": "Form strategic partnerships to share risk", "weights": {"TR": 4, "LD": 3, "CT": 3}},
-                    {"text": "Create innovation lab for experimentation", "weights": {"Cog": 4, "LD": 3, "CT": 4}}
-                ],
-                "creative_elements": ["Future thinking", "Technology adoption", "Strategic foresight"],
-                "dimensions": ["LD", "CT", "TR", "Cog"]
-            },
-            {
-                "id": 10,
-                "text": "Your company is accused of greenwashing. Environmental groups are protesting. How do you restore trust?",
-                "type": "reputation_management",
-                "scenario_type": "crisis_communication",
-                "options": [
-                    {"text": "Issue strong denial and defend current practices", "weights": {"LD": -3, "CT": -2, "Psy": -4}},
-                    {"text": "Admit shortcomings and present concrete improvement plan", "weights": {"LD": 5, "CT": 4, "Psy": 4}},
-                    {"text": "Hire PR firm to manage the narrative", "weights": {"CT": 2, "LD": 2, "TR": 1}},
-                    {"text": "Engage with protesters and co-create sustainability goals", "weights": {"TR": 5, "LD": 4, "CT": 4}}
-                ],
-                "creative_elements": ["Reputation crisis", "Stakeholder engagement", "Authentic leadership"],
-                "dimensions": ["LD", "CT", "TR", "Psy"]
-            }
-        ]
-        return questions
-
-    def calculate_dimension_scores(self, responses: Dict) -> Dict[str, float]:
-        """Calculate scores using advanced algorithm"""
-        dimension_totals = {dim: 0 for dim in self.dimensions.keys()}
-        question_counts = {dim: 0 for dim in self.dimensions.keys()}
-        
-        for q_id, response in responses.items():
-            question = next((q for q in self.questions if q["id"] == int(q_id)), None)
-            if question and "selected_option" in response:
-                option_index = response["selected_option"]
-                if 0 <= option_index < len(question["options"]):
-                    selected_option = question["options"][option_index]
-                    
-                    for dim, weight in selected_option["weights"].items():
-                        dimension_totals[dim] += weight
-                        question_counts[dim] += 1
-        
-        # Normalize scores to 0-100 scale
-        normalized_scores = {}
-        for dim in self.dimensions.keys():
-            if question_counts[dim] > 0:
-                raw_score = dimension_totals[dim]
-                max_possible = question_counts[dim] * 5
-                min_possible = question_counts[dim] * -4
-                
-                if max_possible != min_possible:
-                    normalized = ((raw_score - min_possible) / (max_possible - min_possible)) * 100
-                    normalized_scores[dim] = max(0, min(100, normalized))
-                else:
-                    normalized_scores[dim] = 50
-            else:
-                normalized_scores[dim] = 0
-        
-        # Apply cross-dimension correlations
-        normalized_scores = self._apply_cross_dimension_correlations(normalized_scores)
-        
-        return normalized_scores
-
-    def _apply_cross_dimension_correlations(self, scores: Dict[str, float]) -> Dict[str, float]:
-        """Apply advanced correlations between dimensions"""
-        adjusted_scores = scores.copy()
-        
-        if adjusted_scores['LD'] > 70:
-            adjusted_scores['TR'] = min(100, adjusted_scores['TR'] * 1.1)
-        
-        if adjusted_scores['CT'] > 70:
-            adjusted_scores['LD'] = min(100, adjusted_scores['LD'] * 1.08)
-        
-        if adjusted_scores['Psy'] > 70:
-            adjusted_scores['Cog'] = min(100, adjusted_scores['Cog'] * 1.05)
-        
-        if adjusted_scores['LT'] > 70:
-            adjusted_scores['CT'] = min(100, adjusted_scores['CT'] * 1.06)
-        
-        return adjusted_scores
-
-    def generate_ai_coach_recommendations(self, scores: Dict[str, float]) -> List[Dict]:
-        """Generate personalized AI Coach recommendations"""
-        recommendations = []
-        
-        if scores['LD'] < 40:
-            recommendations.append({
-                "dimension": "LD",
-                "priority": "high",
-                "title": "Develop Leadership Skills",
-                "description": "Leadership score indicates need for development in decision-making and team guidance.",
-                "actions": [
-                    "Enroll in strategic leadership course",
-                    "Find leadership mentor",
-                    "Practice leading small project teams"
-                ]
-            })
-        
-        if scores['CT'] < 40:
-            recommendations.append({
-                "dimension": "CT", 
-                "priority": "high",
-                "title": "Enhance Critical Thinking",
-                "description": "Critical thinking skills need development for better analysis and decision-making.",
-                "actions": [
-                    "Read books on critical thinking",
-                    "Practice analyzing complex case studies",
-                    "Train on detecting cognitive biases"
-                ]
-            })
-        
-        if scores['Psy'] < 40:
-            recommendations.append({
-                "dimension": "Psy",
-                "priority": "medium", 
-                "title": "Build Psychological Resilience",
-                "description": "Psychological resilience can be enhanced for better stress management.",
-                "actions": [
-                    "Practice mindfulness and meditation",
-                    "Develop emotional intelligence skills",
-                    "Learn stress management techniques"
-                ]
-            })
-
-        if scores['TR'] < 40:
-            recommendations.append({
-                "dimension": "TR",
-                "priority": "medium",
-                "title": "Improve Team Collaboration",
-                "description": "Team role effectiveness needs enhancement for better collaboration.",
-                "actions": [
-                    "Take team role assessment",
-                    "Participate in team-building activities",
-                    "Learn conflict resolution techniques"
-                ]
-            })
-        
-        return recommendations
-
-    def create_executive_dashboard(self, scores: Dict[str, float], user_id: str) -> Dict:
-        """Create comprehensive executive dashboard"""
-        score_analysis = {}
-        for dim, score in scores.items():
-            if score < 40:
-                level = "Low"
-                color = "🔴"
-            elif score < 70:
-                level = "Medium" 
-                color = "🟡"
-            else:
-                level = "High"
-                color = "🟢"
-            
-            score_analysis[dim] = {
-                "score": score,
-                "level": level,
-                "color": color,
-                "description": f"{self.dimensions[dim]}: {level} ({score:.1f}/100)"
-            }
-        
-        sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-        top_3 = sorted_scores[:3]
-        bottom_3 = sorted_scores[-3:]
-        
-        dashboard = {
-            "user_id": user_id,
-            "report_date": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "overall_score": np.mean(list(scores.values())),
-            "dimension_scores": score_analysis,
-            "top_strengths": [
-                {
-                    "dimension": dim,
-                    "name": self.dimensions[dim],
-                    "score": score,
-                    "interpretation": self._get_interpretation(dim, score)
-                } for dim, score in top_3
-            ],
-            "development_areas": [
-                {
-                    "dimension": dim, 
-                    "name": self.dimensions[dim],
-                    "score": score,
-                    "recommendations": self._get_development_recommendations(dim, score)
-                } for dim, score in bottom_3
-            ],
-            "leadership_style": self._analyze_leadership_style(scores),
-            "innovation_potential": self._calculate_innovation_potential(scores)
-        }
-        
-        return dashboard
-
-    def _get_interpretation(self, dimension: str, score: float) -> str:
-        interpretations = {
-            'LD': {
-                'low': 'Cautious leadership style, needs to develop confidence in decision-making',
-                'medium': 'Balanced leader, can improve influence and guidance skills',
-                'high': 'Inspiring leader with clear vision and ability to motivate teams'
-            },
-            'CT': {
-                'low': 'Tends toward superficial acceptance, needs to develop critical analysis',
-                'medium': 'Capable of analysis in familiar contexts, needs to broaden thinking scope',
-                'high': 'Excellent analyst, detects biases and offers innovative problem solutions'
-            },
-            'Psy': {
-                'low': 'Needs to enhance psychological resilience and stress management',
-                'medium': 'Psychologically balanced, can improve handling change',
-                'high': 'Psychologically resilient, quickly adapts to challenges and difficult conditions'
-            }
-        }
-        
-        level = 'low' if score < 40 else 'medium' if score < 70 else 'high'
-        return interpretations.get(dimension, {}).get(level, 'Strong capabilities in this area')
-
-    def _get_development_recommendations(self, dimension: str, score: float) -> List[str]:
-        recommendations = {
-            'LD': [
-                'Situational Leadership workshops',
-                'Decision-making training',
-                'Influence and persuasion exercises'
-            ],
-            'CT': [
-                'Critical thinking courses',
-                'Case study analysis exercises',
-                'Bias detection training'
-            ],
-            'Psy': [
-                'Resilience enhancement programs',
-                'Stress management training',
-                'Emotional intelligence exercises'
-            ]
-        }
-        return recommendations.get(dimension, ['Professional development programs'])
-
-    def _analyze_leadership_style(self, scores: Dict[str, float]) -> str:
-        if scores['LD'] > 70 and scores['CT'] > 60:
-            return "Strategic Leader: Combines vision with precise analysis"
-        elif scores['LD'] > 70 and scores['Psy'] > 70:
-            return "Inspirational Leader: Focuses on motivating teams and building relationships"
-        elif scores['CT'] > 70 and scores['LT'] > 70:
-            return "Analytical Leader: Relies on data and logic in leadership"
-        else:
-            return "Balanced Leader: Combines multiple leadership approaches"
-
-    def _calculate_innovation_potential(self, scores: Dict[str, float]) -> float:
-        innovation_score = (
-            scores['CT'] * 0.3 +
-            scores['Psy'] * 0.3 + 
-            scores['LD'] * 0.2 +
-            scores['Cog'] * 0.2
-        )
-        return innovation_score
-
 # Initialize the assessment system
 @st.cache_resource
 def get_assessment_system():
-    return NexusInsightAssessment()
+    nia = NexusInsightAssessment()
+    archetypes_path = os.environ.get("NEXUS_ARCHETYPES")
+    if archetypes_path and os.path.exists(archetypes_path):
+        nia.archetypes = ArchetypeModel.load(archetypes_path)
+    catalog_path = os.environ.get("NEXUS_ACTION_CATALOG")
+    if catalog_path and os.path.exists(catalog_path):
+        nia.action_catalog = ActionCatalog.load(catalog_path, nia.dimension_keys, nia.thresholds)
+    nia.correlation_adjustments = AdjustmentRegistry(
+        os.path.join(os.environ.get("NEXUS_CORRELATION_DIR", "correlation_stats"), "adjustments"), bank_fingerprint(nia))
+    return nia
+
+@st.cache_resource
+def get_centered_weights():
+    return centered_weights(get_assessment_system())
+
+@st.cache_resource
+def get_latency_aggregator():
+    n_questions, n_options, _ = get_assessment_system().weight_tensor.shape
+    return LatencyAggregator(n_questions, n_options, directory=os.environ.get("NEXUS_LATENCY_DIR", "latency_stats"),
+                             fingerprint=bank_fingerprint(get_assessment_system()))
+
+@st.cache_resource
+def get_item_stats_aggregator():
+    return ItemStatsAggregator(get_assessment_system(), directory=os.environ.get("NEXUS_ITEM_STATS_DIR", "item_stats"))
+
+@st.cache_resource
+def get_correlation_aggregator():
+    nia = get_assessment_system()
+    return CorrelationAggregator(nia, directory=os.environ.get("NEXUS_CORRELATION_DIR", "correlation_stats"),
+                                 derive_every=int(os.environ.get("NEXUS_AUTO_DERIVE_EVERY", "0")),
+                                 registry=nia.correlation_adjustments)
+
+@st.cache_resource
+def get_history_store():
+    return HistoryStore(os.environ.get("NEXUS_HISTORY_DIR", "assessment_history"),
+                        get_assessment_system().dimension_keys)
+
+@st.cache_resource
+def get_report_worker():
+    return ReportWorker(max_workers=int(os.environ.get("NEXUS_REPORT_WORKERS", "2")),
+                        max_queue=int(os.environ.get("NEXUS_REPORT_QUEUE", "64")))
+
+@st.cache_resource
+def get_session_backend():
+    # Shared by every app node when set, so any node can serve any session
+    path = os.environ.get("NEXUS_SESSION_DB")
+    return SQLiteSessionBackend(path) if path else None
+
+@st.cache_resource
+def get_session_manager():
+    return SessionManager(os.environ.get("NEXUS_SPILL_DIR", "session_spill"),
+                          idle_seconds=float(os.environ.get("NEXUS_SESSION_IDLE", "900")),
+                          memory_budget=int(float(os.environ.get("NEXUS_SESSION_BUDGET_MB", "256")) * 1024 * 1024))
+
+@st.cache_resource
+def get_draft_store():
+    return DraftStore(os.environ.get("NEXUS_DRAFTS_DB", "drafts.db"),
+                      debounce_seconds=float(os.environ.get("NEXUS_DRAFT_DEBOUNCE", "5")))
+
+@st.cache_resource
+def get_locale_catalog():
+    # One mapped catalog per process; each language's strings load on first use
+    path = os.environ.get("NEXUS_LOCALE_CATALOG")
+    return LocaleCatalog(path, get_assessment_system().questions) if path and os.path.exists(path) else None
+
+@st.cache_resource
+def get_event_log():
+    # Interaction logs for nexus_replay.py; off unless a directory is configured
+    path = os.environ.get("NEXUS_EVENT_LOG")
+    return EventLog(path, redact=FREE_TEXT_WIDGETS) if path else None
+
+@st.cache_resource
+def get_team_cache():
+    nia = get_assessment_system()
+    return TeamDistanceCache(os.environ.get("NEXUS_TEAM_CACHE", "team_cache"), nia.dimension_keys, nia.measured_dimensions)
+
+@st.cache_resource
+def get_mentor_index():
+    path = os.environ.get("NEXUS_MENTOR_INDEX")
+    return ProfileIndex.load(path) if path and os.path.exists(path) else None
 
 # Initialize session state
 if 'assessment_started' not in st.session_state:
@@ -480,30 +192,301 @@ if 'dashboard' not in st.session_state:
     st.session_state.dashboard = {}
 if 'recommendations' not in st.session_state:
     st.session_state.recommendations = []
+if 'careless_monitor' not in st.session_state:
+    st.session_state.careless_monitor = None
+if 'last_answer_at' not in st.session_state:
+    st.session_state.last_answer_at = None
+if 'user_id' not in st.session_state:
+    # Replaced by the verified user when there is one; anonymous sessions share nothing
+    st.session_state.user_id = uuid.uuid4().hex
+if 'report_job' not in st.session_state:
+    st.session_state.report_job = None
+
+# Session keys stored in the shared backend; the careless monitor is stored separately
+PERSISTED_KEYS = ['assessment_started', 'current_question', 'responses', 'assessment_completed', 'scores',
+                  'dashboard', 'recommendations', 'user_id', 'last_answer_at', 'completed_at', 'profile_id',
+                  'report_job']
+
+# Moved to disk by the session manager once the session is idle; other widget values and the user id stay
+SPILLED_KEYS = [key for key in PERSISTED_KEYS if key != 'user_id']
+# Improvement page widgets (key prefixes); kept by the draft store, so dropped on spill and reloaded by restore_drafts
+DRAFTED_WIDGETS = ('goal_', 'actions_', 'timeline_', 'progress_notes')
+# Rebuilt on demand, so dropped rather than spilled
+TRANSIENT_KEYS = ['whatif_simulator']
+
+# Tries at writing the shared session before giving up on a contended one
+SAVE_ATTEMPTS = 5
+
+# Widget keys (or key prefixes) whose changes are written to the event log
+RECORDED_WIDGETS = ('page', 'locale', 'q_', 'goal_', 'actions_', 'timeline_', 'progress_notes',
+                    'whatif_question', 'whatif_option_', 'team_')
+# Recorded widgets holding typed text or profile ids (which contain user ids); the log keeps only their length
+FREE_TEXT_WIDGETS = ('goal_', 'actions_', 'timeline_', 'progress_notes', 'team_members')
+
+def question_text(question):
+    """Question text in the session's language"""
+    catalog, locale = get_locale_catalog(), st.session_state.get('locale', SOURCE_LOCALE)
+    if catalog is None or locale == catalog.source:
+        return question['text']
+    return catalog.question_text(locale, question)
+
+def option_texts(question):
+    """Option texts in the session's language, in option order"""
+    catalog, locale = get_locale_catalog(), st.session_state.get('locale', SOURCE_LOCALE)
+    if catalog is None or locale == catalog.source:
+        return [opt['text'] for opt in question['options']]
+    return catalog.option_texts(locale, question)
+
+def park_key():
+    """This browser session's key in the session manager
+
+    A random token kept in Streamlit's own session state rather than the runtime
+    session id, which headless test sessions all share.
+    """
+    if 'park_key' not in st.session_state:
+        st.session_state.park_key = uuid.uuid4().hex
+    return st.session_state.park_key
+
+def verified_user():
+    """The user the authenticating proxy signed in, or None for an anonymous session"""
+    if not USER_HEADER:
+        return None
+    return (_get_websocket_headers() or {}).get(USER_HEADER) or None
+
+def identify_user():
+    """Key this session's history and drafts by the verified user, if any"""
+    user = verified_user()
+    if user is not None:
+        st.session_state.user_id = user
+
+def checkout_session():
+    """Start this run with the session manager, bringing the state back if it was spilled while idle"""
+    state = get_session_manager().begin(park_key())
+    if state is None:
+        return
+    monitor_state = state.pop('careless_monitor', None)
+    for key, value in state.items():
+        st.session_state[key] = value
+    st.session_state.careless_monitor = CarelessMonitor.from_state(get_centered_weights(), monitor_state) \
+        if monitor_state is not None else None
+
+def release_session():
+    """End this run with the session manager, which may spill the state once the session is idle
+
+    The state stays in Streamlit's session state; the spill callback is run
+    by the manager's sweep, never during a run of this session.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    session_state = ctx.session_state
+
+    def drafted():
+        return {key: value for key, value in session_state.filtered_state.items() if key.startswith(DRAFTED_WIDGETS)}
+
+    def spill():
+        state = {key: session_state[key] for key in SPILLED_KEYS if key in session_state}
+        monitor = session_state['careless_monitor'] if 'careless_monitor' in session_state else None
+        state['careless_monitor'] = monitor.to_state() if monitor is not None else None
+        for key in [*SPILLED_KEYS, 'careless_monitor', *TRANSIENT_KEYS, *drafted()]:
+            if key in session_state:
+                del session_state[key]
+        return state
+
+    size = deep_size({**{key: st.session_state[key] for key in SPILLED_KEYS if key in st.session_state},
+                      **drafted()})
+    get_session_manager().end(park_key(), spill, size)
+
+def session_id():
+    """The session id carried in the URL, so a reload or another node finds the same session"""
+    return st.query_params.get("sid") or new_session_id()
+
+def new_session_id():
+    sid = uuid.uuid4().hex
+    st.query_params["sid"] = sid
+    return sid
+
+def session_snapshot():
+    state = {key: st.session_state.get(key) for key in PERSISTED_KEYS}
+    state['owner'] = verified_user()
+    monitor = st.session_state.careless_monitor
+    state['careless_monitor'] = monitor.to_state() if monitor is not None else None
+    return state
+
+def restore_session():
+    """Load the shared session if another run or node has written a newer version"""
+    backend = get_session_backend()
+    if backend is None:
+        return
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = session_id()
+    version, state = backend.load(st.session_state.session_id)
+    if state is None or version <= st.session_state.get('session_version', 0):
+        return
+    if USER_HEADER and state.get('owner') != verified_user():
+        # A link to somebody else's session: start this user's own instead
+        st.session_state.session_id = new_session_id()
+        return
+    adopt_session(version, state)
+
+def adopt_session(version, state):
+    """Make a stored version of the shared session this session's state"""
+    for key in PERSISTED_KEYS:
+        if key in state:
+            st.session_state[key] = state[key]
+    monitor_state = state.get('careless_monitor')
+    st.session_state.careless_monitor = CarelessMonitor.from_state(get_centered_weights(), monitor_state) \
+        if monitor_state is not None else None
+    st.session_state.session_version = version
+    st.session_state.session_blob = encode_state(state)
+
+def persist_session():
+    """Write the session back if this run changed it
+
+    If another node wrote the session since this run loaded it, the two
+    writes are merged key by key. Where both changed the same key the stored
+    value is kept and the conflict is reported on the next run.
+    """
+    backend = get_session_backend()
+    if backend is None:
+        return
+    blob = encode_state(session_snapshot())
+    if blob == st.session_state.get('session_blob'):
+        return
+    sid = st.session_state.session_id
+    base_blob = st.session_state.get('session_blob')
+    base = decode_state(base_blob) if base_blob is not None else {}
+    state = decode_state(blob)
+    version = st.session_state.get('session_version', 0)
+    conflicts = set()
+    for _ in range(SAVE_ATTEMPTS):
+        saved = backend.save(sid, state, version)
+        if saved is not None:
+            if conflicts or encode_state(state) != blob:
+                adopt_session(saved, state)
+            else:
+                st.session_state.session_version = saved
+                st.session_state.session_blob = blob
+            break
+        version, theirs = backend.load(sid)
+        theirs = theirs if theirs is not None else {}
+        state, clashed = merge_states(base, state, theirs)
+        base = theirs
+        conflicts.update(clashed)
+    else:
+        # Still contended: the next run loads the stored session, without this run's change
+        conflicts.update(state)
+    if conflicts:
+        st.session_state.session_conflicts = sorted(conflicts)
+
+def install_report(report):
+    """Put a finished report into the session and record it in the history and mentor index"""
+    st.session_state.scores = report['scores']
+    st.session_state.recommendations = report['recommendations']
+    st.session_state.dashboard = report['dashboard']
+    get_history_store().append(st.session_state.user_id, report['scores'], st.session_state.completed_at,
+                               report['dashboard'].get('correlation_adjustments'))
+    mentor_index = get_mentor_index()
+    if mentor_index is not None:
+        mentor_index.add_scores(st.session_state.profile_id, report['scores'])
+
+def collect_report(nia):
+    """Pick up a report computed in the background, recomputing inline if the job was lost or failed"""
+    job_id = st.session_state.report_job
+    if job_id is None:
+        return
+    worker = get_report_worker()
+    if worker.status(job_id) in ("queued", "running"):
+        return
+    try:
+        report = worker.pop(job_id)
+    except Exception:
+        report = None
+    if report is None:
+        monitor = st.session_state.careless_monitor
+        report = compute_report(nia, st.session_state.responses, st.session_state.user_id,
+                                monitor.flags() if monitor is not None else None)
+    st.session_state.report_job = None
+    install_report(report)
 
 # Main app
+def recorded_widget_values():
+    return {key: st.session_state[key] for key in st.session_state
+            if isinstance(key, str) and key.startswith(RECORDED_WIDGETS)}
+
+def log_click(label, values=None):
+    """Button callback noting the click, and any widget values it consumes, for the event log"""
+    st.session_state.setdefault('event_clicks', []).append([label, values or {}])
+
+def take_interaction():
+    """Widget changes since the last run and buttons clicked for this one"""
+    clicks = st.session_state.pop('event_clicks', [])
+    if get_event_log() is None:
+        return None
+    snapshot = st.session_state.get('event_snapshot', {})
+    changed = {key: value for key, value in recorded_widget_values().items()
+               if key not in snapshot or snapshot[key] != value}
+    return {"set": changed, "click": clicks} if changed or clicks else None
+
+def record_run(interaction, started_at, run_seconds):
+    log = get_event_log()
+    if log is None:
+        return
+    # Values the script itself set this run are not the next run's interaction
+    st.session_state.event_snapshot = recorded_widget_values()
+    log.record(park_key(), started_at, run_seconds, interaction)
+
 def main():
-    nia = get_assessment_system()
+    started_at, started = time.time(), time.perf_counter()
+    interaction = take_interaction()
+    checkout_session()
+    restore_session()
+    identify_user()
+    try:
+        render(get_assessment_system())
+    finally:
+        # Also runs when st.rerun() interrupts the script
+        persist_session()
+        release_session()
+        record_run(interaction, started_at, time.perf_counter() - started)
+
+def render(nia):
+    collect_report(nia)
+    if st.session_state.pop('session_conflicts', None):
+        st.warning("This session was also changed in another tab or window at the same moment. "
+                   "Both changes were kept where they did not overlap; otherwise the other tab's version was kept.")
     
     # Sidebar
     with st.sidebar:
         st.image("https://via.placeholder.com/150x150/1f77b4/ffffff?text=NIA", width=150)
         st.title("Nexus Insight Assessment")
+        user = verified_user()
+        if user is not None:
+            st.caption(f"Signed in as {user}")
+        catalog = get_locale_catalog()
+        if catalog is not None and len(catalog.locales) > 1:
+            st.selectbox("Language", catalog.locales, key="locale")
         st.markdown("---")
         
         if not st.session_state.assessment_started:
             st.info("Start your assessment to discover your leadership potential and development areas.")
         elif st.session_state.assessment_started and not st.session_state.assessment_completed:
             progress = (st.session_state.current_question / len(nia.questions)) * 100
-            st.progress(progress)
+            st.progress(progress / 100)
             st.write(f"Progress: {st.session_state.current_question}/{len(nia.questions)} questions")
+        elif st.session_state.report_job is not None:
+            st.success("Assessment Completed!")
+            st.write("Preparing your report...")
         else:
             st.success("Assessment Completed!")
             st.write(f"Overall Score: {st.session_state.dashboard.get('overall_score', 0):.1f}/100")
         
         st.markdown("---")
         st.markdown("### Navigation")
-        page = st.radio("Go to:", ["Home", "Assessment", "Results", "Improvement Plan"])
+        pages = ["Home", "Assessment", "Results", "Improvement Plan"]
+        if ADMIN_MODE:
+            pages += ["Bank Analytics", "Item Analysis", "Team Comparison"]
+        page = st.radio("Go to:", pages, key="page")
     
     # Page routing
     if page == "Home":
@@ -514,6 +497,12 @@ def main():
         show_results_page(nia)
     elif page == "Improvement Plan":
         show_improvement_page(nia)
+    elif page == "Bank Analytics":
+        show_bank_analytics_page(nia)
+    elif page == "Item Analysis":
+        show_item_analysis_page(nia)
+    elif page == "Team Comparison":
+        show_team_comparison_page(nia)
 
 def show_home_page(nia):
     """Display the home page with introduction"""
@@ -552,11 +541,17 @@ def show_home_page(nia):
         ### 🚀 Ready to Begin?
         """)
         
-        if st.button("Start Your Assessment Journey", type="primary", use_container_width=True):
+        if st.button("Start Your Assessment Journey", type="primary", use_container_width=True,
+                     on_click=log_click, args=("Start Your Assessment Journey",)):
             st.session_state.assessment_started = True
             st.session_state.current_question = 0
             st.session_state.responses = {}
+            st.session_state.pending_choices = {}
             st.session_state.assessment_completed = False
+            st.session_state.last_answer_at = datetime.now().isoformat()
+            st.session_state.careless_monitor = CarelessMonitor(
+                get_centered_weights(), started_at=st.session_state.last_answer_at
+            )
             st.rerun()
     
     with col2:
@@ -606,46 +601,72 @@ def show_assessment_page(nia):
         
         # Display question
         st.markdown(f'<div class="question-card">', unsafe_allow_html=True)
-        st.markdown(f"### {question['text']}")
+        st.markdown(f"### {question_text(question)}")
         st.markdown(f"*Scenario type: {question['scenario_type'].replace('_', ' ').title()}*")
         st.markdown('</div>', unsafe_allow_html=True)
         
-        # Display options
-        options = question['options']
-        selected_option = st.radio(
+        # Display options. The radio returns the option index; its labels are part of the
+        # widget's identity, so after a language switch it is recreated at the choice made so far
+        texts = option_texts(question)
+        choices = st.session_state.setdefault('pending_choices', {})
+        saved = st.session_state.responses.get(str(question['id']), {}).get('selected_option', 0)
+        option_index = st.radio(
             "Choose your response:",
-            options=[opt['text'] for opt in options],
+            options=list(range(len(texts))),
+            index=choices.get(question['id'], saved),
+            format_func=lambda i: texts[i],
             key=f"q_{question['id']}"
         )
+        choices[question['id']] = option_index
         
         col1, col2 = st.columns([1, 1])
         
         with col1:
-            if st.button("← Previous", disabled=current_q == 0):
+            if st.button("← Previous", disabled=current_q == 0, on_click=log_click, args=("← Previous",)):
                 st.session_state.current_question -= 1
                 st.rerun()
         
         with col2:
-            if st.button("Next →", type="primary"):
-                # Save response
-                option_index = [opt['text'] for opt in options].index(selected_option)
+            if st.button("Next →", type="primary", on_click=log_click, args=("Next →",)):
+                # Save response; a question answered before was revisited with "← Previous"
+                now = datetime.now()
+                timestamp = now.isoformat()
+                previous = st.session_state.responses.get(str(question['id']))
                 st.session_state.responses[str(question['id'])] = {
                     "selected_option": option_index,
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": timestamp
                 }
+                if st.session_state.careless_monitor is not None:
+                    st.session_state.careless_monitor.update(
+                        current_q, option_index, timestamp,
+                        previous_option=previous['selected_option'] if previous is not None else None)
+                # Dwell is the time since the last Next click, which only measures this question on its first answer
+                if previous is None and st.session_state.last_answer_at is not None:
+                    dwell = (now - datetime.fromisoformat(st.session_state.last_answer_at)).total_seconds()
+                    get_latency_aggregator().record(current_q, option_index, dwell)
+                st.session_state.last_answer_at = timestamp
                 
                 # Move to next question or complete assessment
                 if current_q + 1 < total_questions:
                     st.session_state.current_question += 1
                 else:
                     st.session_state.assessment_completed = True
-                    # Calculate scores
-                    st.session_state.scores = nia.calculate_dimension_scores(st.session_state.responses)
-                    st.session_state.recommendations = nia.generate_ai_coach_recommendations(st.session_state.scores)
-                    st.session_state.dashboard = nia.create_executive_dashboard(
-                        st.session_state.scores, 
-                        "streamlit_user"
-                    )
+                    st.session_state.whatif_simulator = None
+                    st.session_state.completed_at = now.timestamp()
+                    st.session_state.profile_id = f"{st.session_state.user_id}@{timestamp}"
+                    choices_row = nia.responses_to_matrix([st.session_state.responses])[0]
+                    get_item_stats_aggregator().record(choices_row)
+                    get_correlation_aggregator().record(choices_row)
+                    # Scoring and the dashboard run in the report worker; the Results page waits for them
+                    monitor = st.session_state.careless_monitor
+                    job_args = (nia, dict(st.session_state.responses), st.session_state.user_id,
+                                monitor.flags() if monitor is not None else None)
+                    st.session_state.scores, st.session_state.dashboard, st.session_state.recommendations = {}, {}, []
+                    if get_report_worker().submit(st.session_state.profile_id, compute_report, *job_args):
+                        st.session_state.report_job = st.session_state.profile_id
+                    else:
+                        # Queue full: compute here rather than pile up work
+                        install_report(compute_report(*job_args))
                 st.rerun()
     
     else:
@@ -660,6 +681,11 @@ def show_results_page(nia):
         st.warning("Please complete the assessment first to view results.")
         return
     
+    if st.session_state.report_job is not None:
+        st.info("⏳ Preparing your report. This page updates as soon as it is ready.")
+        time.sleep(0.5)
+        st.rerun()
+    
     scores = st.session_state.scores
     dashboard = st.session_state.dashboard
     
@@ -679,6 +705,13 @@ def show_results_page(nia):
         level = "High" if dashboard['overall_score'] > 70 else "Medium" if dashboard['overall_score'] > 40 else "Low"
         st.metric("Performance Level", level)
     
+    if 'archetype' in dashboard:
+        st.info(f"**Profile Archetype:** {dashboard['archetype']['name']}")
+    
+    if 'correlation_adjustments' in dashboard:
+        version = dashboard['correlation_adjustments']
+        st.caption("Cross-dimension adjustments: " + ("fixed rules" if version == "fixed" else f"learned set v{version}"))
+    
     st.markdown("---")
     
     # Visualizations
@@ -686,8 +719,8 @@ def show_results_page(nia):
     
     with col1:
         # Radar chart
-        dimensions = list(scores.keys())
-        values = list(scores.values())
+        dimensions = [d for d in scores if d in nia.measured_dimensions]
+        values = [scores[d] for d in dimensions]
         
         fig_radar = go.Figure()
         fig_radar.add_trace(go.Scatterpolar(
@@ -714,16 +747,29 @@ def show_results_page(nia):
         fig_bar = go.Figure()
         colors = ['red' if x < 40 else 'orange' if x < 70 else 'green' for x in values]
         
+        # Bootstrap bounds from the dashboard, as error bars around each score
+        intervals = dashboard.get('confidence_intervals', {})
+        error_y = None
+        if intervals:
+            bounds = [intervals.get(d, {'low': v, 'high': v}) for d, v in zip(dimensions, values)]
+            error_y = dict(
+                type='data',
+                array=[max(0.0, b['high'] - v) for b, v in zip(bounds, values)],
+                arrayminus=[max(0.0, v - b['low']) for b, v in zip(bounds, values)],
+                color='gray'
+            )
+        
         fig_bar.add_trace(go.Bar(
             x=[nia.dimensions[d] for d in dimensions],
             y=values,
             marker_color=colors,
             text=[f"{v:.1f}" for v in values],
             textposition='auto',
+            error_y=error_y,
         ))
         
         fig_bar.update_layout(
-            title="Dimension Scores",
+            title="Dimension Scores" + (f" ({next(iter(intervals.values()))['level']:.0%} intervals)" if intervals else ""),
             yaxis=dict(range=[0, 100]),
             height=400
         )
@@ -766,6 +812,156 @@ def show_results_page(nia):
             st.write("**Recommended Actions:**")
             for action in rec['actions']:
                 st.write(f"- {action}")
+    
+    if dashboard.get('recommended_actions'):
+        st.markdown("### 📚 Suggested Learning")
+        st.dataframe(pd.DataFrame([{
+            "Course": action['title'],
+            "Develops": nia.dimensions[action['for_dimension']],
+            "Duration (min)": int(action['duration_minutes']),
+            "Rating": action['rating'],
+        } for action in dashboard['recommended_actions']]), use_container_width=True, hide_index=True)
+    
+    # Histories are only shown to the user they belong to, as vouched for by the proxy
+    user = verified_user()
+    if user is not None and user == dashboard['user_id']:
+        show_history_panel(nia, dashboard['user_id'])
+    show_what_if_panel(nia, scores, dashboard)
+    show_mentor_matches(nia, scores, dashboard)
+
+def show_history_panel(nia, user_id):
+    """Chart every stored assessment for this user with trend lines"""
+    history = get_history_store().trajectory(user_id)
+    if len(history['dates']) < 2:
+        return
+    st.markdown("### 📅 Progress Over Time")
+    
+    fig = go.Figure()
+    colors = px.colors.qualitative.Plotly
+    for n, dim in enumerate(nia.measured_dimensions):
+        i = nia.dimension_keys.index(dim)
+        fig.add_trace(go.Scatter(x=history['dates'], y=history['scores'][:, i], mode='lines+markers',
+                                 name=nia.dimensions[dim], line=dict(color=colors[n % len(colors)])))
+        fig.add_trace(go.Scatter(x=history['dates'], y=history['trend_line'][:, i], mode='lines', showlegend=False,
+                                 line=dict(color=colors[n % len(colors)], dash='dot', width=1)))
+    fig.update_layout(yaxis=dict(range=[0, 100], title="Score"), height=400, margin=dict(t=30, b=30))
+    st.plotly_chart(fig, use_container_width=True)
+    
+    cols = st.columns(len(nia.measured_dimensions))
+    for col, dim in zip(cols, nia.measured_dimensions):
+        i = nia.dimension_keys.index(dim)
+        with col:
+            st.metric(nia.dimensions[dim], f"{history['scores'][-1, i]:.1f}", f"{history['deltas'][-1, i]:+.1f}")
+    trend = history['trend_per_30_days']
+    st.caption(f"{len(history['dates'])} assessments since {history['dates'][0]:%Y-%m-%d}. Trend per 30 days: "
+               + ", ".join(f"{nia.dimensions[d]} {trend[d]:+.1f}" for d in nia.measured_dimensions))
+    if len(set(history['adjustments'])) > 1:
+        st.caption("Some of these assessments were scored with different cross-dimension adjustments, "
+                   "so part of the change may come from scoring rather than from you.")
+
+def show_what_if_panel(nia, scores, dashboard):
+    """Let coaches show how changing a single answer would move the profile"""
+    st.markdown("### 🔀 What-If Explorer")
+    
+    if st.session_state.get('whatif_simulator') is None:
+        st.session_state.whatif_simulator = WhatIfSimulator.from_responses(nia, st.session_state.responses)
+    simulator = st.session_state.whatif_simulator
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        q_index = st.selectbox(
+            "Change the answer to",
+            options=list(range(len(nia.questions))),
+            format_func=lambda i: f"Q{nia.questions[i]['id']}: {question_text(nia.questions[i])[:70]}...",
+            key="whatif_question"
+        )
+        question = nia.questions[q_index]
+        current = int(simulator.choices[q_index])
+        texts = option_texts(question)
+        option_index = st.radio(
+            "Alternative response:",
+            options=list(range(len(question['options']))),
+            index=max(current, 0),
+            format_func=lambda i: texts[i] + (" (your answer)" if i == current else ""),
+            key=f"whatif_option_{question['id']}"
+        )
+    
+    result = simulator.simulate(q_index, option_index)
+    what_if = result['scores']
+    
+    with col2:
+        m1, m2 = st.columns(2)
+        with m1:
+            st.metric("Overall Score", f"{result['overall_score']:.1f}/100",
+                      f"{result['overall_score'] - dashboard['overall_score']:+.1f}")
+        with m2:
+            st.metric("Innovation Potential", f"{result['innovation_potential']:.1f}/100",
+                      f"{result['innovation_potential'] - dashboard['innovation_potential']:+.1f}")
+        st.write(f"**Leadership Style:** {result['leadership_style'].split(':')[0]}")
+        if 'archetype' in result:
+            st.write(f"**Archetype:** {result['archetype']['name']}")
+        
+        dimensions = [d for d in scores if d in nia.measured_dimensions]
+        theta = [nia.dimensions[d] for d in dimensions] + [nia.dimensions[dimensions[0]]]
+        fig = go.Figure()
+        for name, profile, color in (("Actual", scores, 'blue'), ("What-if", what_if, 'orange')):
+            values = [profile[d] for d in dimensions]
+            fig.add_trace(go.Scatterpolar(r=values + [values[0]], theta=theta, fill='toself', name=name,
+                                          line=dict(color=color, width=2)))
+        fig.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 100])), height=350,
+                          margin=dict(t=30, b=30))
+        st.plotly_chart(fig, use_container_width=True)
+
+def show_mentor_matches(nia, scores, dashboard):
+    """Suggest mentors who are strong where this candidate has room to grow"""
+    mentor_index = get_mentor_index()
+    if mentor_index is None:
+        return
+    st.markdown("### 🤝 Suggested Mentors")
+    
+    development = [area['dimension'] for area in dashboard['development_areas']]
+    where = {"is_mentor": True} if "is_mentor" in mentor_index.attributes else None
+    matches = mentor_index.complementary(scores, development, k=5, where=where,
+                                         exclude_ids=[st.session_state.get('profile_id')])
+    if not matches:
+        st.info("No mentor profiles are available yet.")
+        return
+    
+    st.write("Mentors ranked by strength in: " + ", ".join(nia.dimensions[d] for d in development))
+    st.dataframe(pd.DataFrame([
+        {"Mentor": match['id'], "Match": round(match['match_score'], 1),
+         **{nia.dimensions[d]: round(match['profile'][d], 1) for d in development}}
+        for match in matches
+    ]), use_container_width=True, hide_index=True)
+
+def draft_fields(nia):
+    """Widget keys of the improvement page whose values are kept as drafts"""
+    return ([f"{kind}_{dim}" for dim in nia.dimensions for kind in ("goal", "actions")]
+            + ["timeline_short", "timeline_medium", "timeline_long", "progress_notes"])
+
+def restore_drafts(nia, user_id):
+    """Fill the improvement page's widgets from the user's drafts before they are rendered"""
+    fields = draft_fields(nia)
+    # Streamlit drops widget values while the page is not shown, and signing in switches to the user's own drafts
+    if st.session_state.get('drafts_user') == user_id and all(key in st.session_state for key in fields):
+        return
+    drafts = get_draft_store().load(user_id)
+    for key in fields:
+        st.session_state[key] = drafts.get(key, "")
+    st.session_state.drafts_user = user_id
+
+def save_progress_note(user_id):
+    log_click("Save Progress Update", {'progress_notes': st.session_state.get('progress_notes', "")})
+    note = st.session_state.get('progress_notes', "").strip()
+    if not note:
+        st.session_state.progress_message = ("warning", "Please enter some progress notes before saving.")
+        return
+    store = get_draft_store()
+    store.add_progress_note(user_id, note)
+    st.session_state.progress_notes = ""
+    store.stage(user_id, {'progress_notes': ""})
+    st.session_state.progress_message = ("success", "Progress update saved!")
 
 def show_improvement_page(nia):
     """Display improvement plan and development suggestions"""
@@ -775,6 +971,10 @@ def show_improvement_page(nia):
         st.warning("Please complete the assessment first to view your improvement plan.")
         return
     
+    user_id = st.session_state.user_id
+    drafts = get_draft_store()
+    restore_drafts(nia, user_id)
+    
     st.markdown("""
     ### 🎯 Customized Development Framework
     
@@ -814,19 +1014,26 @@ def show_improvement_page(nia):
         
         with timeline_col1:
             st.write("**Short-term (1-3 months)**")
-            short_term = st.text_area("Immediate actions", placeholder="Quick wins and initial steps...")
+            short_term = st.text_area("Immediate actions", placeholder="Quick wins and initial steps...",
+                                      key="timeline_short")
         
         with timeline_col2:
             st.write("**Medium-term (3-6 months)**")
-            medium_term = st.text_area("Development projects", placeholder="Larger initiatives and skill building...")
+            medium_term = st.text_area("Development projects", placeholder="Larger initiatives and skill building...",
+                                       key="timeline_medium")
         
         with timeline_col3:
             st.write("**Long-term (6-12 months)**")
-            long_term = st.text_area("Career development", placeholder="Advanced skills and leadership growth...")
+            long_term = st.text_area("Career development", placeholder="Advanced skills and leadership growth...",
+                                     key="timeline_long")
         
-        submitted = st.form_submit_button("Save Improvement Plan")
-        if submitted:
-            st.success("Improvement plan saved! You can revisit this page to update your progress.")
+        submitted = st.form_submit_button("Save Improvement Plan", on_click=log_click, args=("Save Improvement Plan",))
+    
+    # Only changed fields are written, and only once edits settle, unless the plan is saved explicitly
+    drafts.stage(user_id, {key: st.session_state.get(key, "") for key in draft_fields(nia)})
+    if submitted:
+        drafts.flush(user_id)
+        st.success("Improvement plan saved! You can revisit this page to update your progress.")
     
     # Progress tracking
     st.markdown("### 📊 Progress Tracking")
@@ -838,17 +1045,188 @@ def show_improvement_page(nia):
     - Seek feedback from mentors and peers
     """)
     
-    progress_update = st.text_area(
+    st.text_area(
         "Progress Notes and Updates",
         placeholder="Document your development journey, milestones achieved, and lessons learned...",
-        height=150
+        height=150,
+        key="progress_notes"
     )
     
-    if st.button("Save Progress Update"):
-        if progress_update:
-            st.success("Progress update saved!")
-        else:
-            st.warning("Please enter some progress notes before saving.")
+    st.button("Save Progress Update", on_click=save_progress_note, args=(user_id,))
+    message = st.session_state.pop('progress_message', None)
+    if message is not None:
+        getattr(st, message[0])(message[1])
+    
+    previous = drafts.progress_notes(user_id)
+    if previous:
+        with st.expander(f"Previous updates ({len(previous)})"):
+            for entry in previous:
+                st.markdown(f"**{datetime.fromtimestamp(entry['created']).strftime('%Y-%m-%d %H:%M')}**  \n{entry['note']}")
+
+def show_bank_analytics_page(nia):
+    """Display per-question dwell-time analytics for bank tuning"""
+    st.markdown('<h1 class="main-header">⏱️ Question Bank Analytics</h1>', unsafe_allow_html=True)
+    
+    st.markdown("### Report Queue")
+    queue = get_report_worker().metrics()
+    cols = st.columns(5)
+    cols[0].metric("Queued", queue['queued'], help=f"Peak {queue['peak_queued']}, capacity {queue['capacity']}")
+    cols[1].metric("Running", queue['running'])
+    cols[2].metric("Completed", queue['completed'])
+    cols[3].metric("Rejected", queue['rejected'], help="Computed inline because the queue was full")
+    cols[4].metric("Wait p95", f"{queue['wait_p95_s']:.2f}s" if queue['wait_p95_s'] is not None else "–")
+    
+    st.markdown("### Session Memory")
+    sessions = get_session_manager().metrics()
+    cols = st.columns(4)
+    cols[0].metric("In Memory", sessions['in_memory'])
+    cols[1].metric("State Size", f"{sessions['bytes'] / 1024:.0f} KB", help=f"Budget {sessions['budget'] / 1024 ** 2:.0f} MB")
+    cols[2].metric("Spilled to Disk", sessions['on_disk'])
+    cols[3].metric("Rehydrated", sessions['rehydrated'])
+    
+    histogram = get_latency_aggregator().merged()
+    if histogram.total == 0:
+        st.info("No timed answers recorded yet.")
+        return
+    
+    summary = histogram.summary([q['id'] for q in nia.questions])
+    st.markdown("### Time per Question")
+    overview = pd.DataFrame([
+        {"Question": row['question'], "Answers": row['answers'],
+         "p50 (s)": row['p50_s'], "p95 (s)": row['p95_s']}
+        for row in summary
+    ])
+    st.dataframe(overview.round(1), use_container_width=True, hide_index=True)
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=overview["Question"], y=overview["p50 (s)"], name="p50"))
+    fig.add_trace(go.Bar(x=overview["Question"], y=overview["p95 (s)"], name="p95"))
+    fig.update_layout(title="Dwell Time per Question", barmode="group", xaxis_title="Question",
+                      yaxis_title="Seconds", height=400)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("### Time per Option")
+    q_index = st.selectbox(
+        "Question",
+        options=list(range(len(nia.questions))),
+        format_func=lambda i: f"Q{nia.questions[i]['id']}: {nia.questions[i]['text'][:80]}..."
+    )
+    question = nia.questions[q_index]
+    options_frame = pd.DataFrame([
+        {"Option": question['options'][opt['option']]['text'], "Answers": opt['answers'],
+         "p50 (s)": opt['p50_s'], "p95 (s)": opt['p95_s']}
+        for opt in summary[q_index]['options'] if opt['option'] < len(question['options'])
+    ])
+    st.dataframe(options_frame.round(1), use_container_width=True, hide_index=True)
+
+def show_item_analysis_page(nia):
+    """Display option frequencies, item discrimination and scale reliability"""
+    st.markdown('<h1 class="main-header">🧪 Item Analysis</h1>', unsafe_allow_html=True)
+    
+    report = get_item_stats_aggregator().merged().report()
+    if report['responses'] < 2:
+        st.info("Item statistics need at least two complete responses.")
+        return
+    st.write(f"Based on {report['responses']:,} complete responses.")
+    
+    st.markdown("### Reliability per Dimension")
+    reliability = pd.DataFrame([
+        {"Dimension": nia.dimensions[dim], "Items": report['scale_items'][dim], "Cronbach's Alpha": alpha}
+        for dim, alpha in report['alpha'].items()
+    ])
+    st.dataframe(reliability.round(3), use_container_width=True, hide_index=True)
+    
+    st.markdown("### Item-Rest Correlations")
+    discrimination = pd.DataFrame(
+        [{nia.dimensions[d]: row['item_rest'].get(d) for d in nia.dimension_keys} for row in report['questions']],
+        index=[f"Q{row['question']}" for row in report['questions']]
+    ).astype(float)
+    fig = px.imshow(discrimination, color_continuous_scale="RdBu", zmin=-1, zmax=1, text_auto=".2f", aspect="auto")
+    fig.update_layout(height=450)
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("Correlation of each item with the rest of its dimension's scale; blank cells are items outside the scale.")
+    
+    st.markdown("### Option Selection Rates")
+    rates = pd.DataFrame([
+        {"Question": f"Q{row['question']}", **{f"Option {i + 1}": rate for i, rate in enumerate(row['option_rates'])}}
+        for row in report['questions']
+    ])
+    st.dataframe(rates.round(3), use_container_width=True, hide_index=True)
+    
+    st.markdown("### Cross-Dimension Adjustments")
+    adjustments = nia.learned_adjustments()
+    if adjustments is None:
+        st.info("No learned adjustment set yet; the fixed correlation rules apply.")
+        return
+    st.write(f"Version {adjustments.version}, learned from {adjustments.n_samples:,} assessments "
+             f"on {datetime.fromtimestamp(adjustments.derived_at).strftime('%Y-%m-%d %H:%M')}.")
+    names = [nia.dimensions[d] for d in nia.dimension_keys]
+    matrix = pd.DataFrame(adjustments.matrix.T, index=names, columns=names)
+    matrix["Offset"] = adjustments.offset
+    st.dataframe(matrix.round(3), use_container_width=True)
+    st.caption("Each row gives an adjusted score as a weighted sum of the unadjusted scores plus an offset.")
+
+# Larger teams are shown in part: the heat map by its first members, pairs only on request
+HEATMAP_MEMBERS = 150
+PAIR_SCAN_MEMBERS = 5000
+
+def show_team_comparison_page(nia):
+    """Compare a team's members by the distance between their score profiles"""
+    st.markdown('<h1 class="main-header">👥 Team Comparison</h1>', unsafe_allow_html=True)
+    
+    profiles = get_mentor_index()
+    if profiles is None:
+        st.info("Team comparison uses the stored profiles; set NEXUS_MENTOR_INDEX to a profile index.")
+        return
+    
+    team_name = st.text_input("Team", key="team_name")
+    members_text = st.text_area("Member profile IDs, one per line", key="team_members", height=150)
+    requested = list(dict.fromkeys(line.strip() for line in members_text.splitlines() if line.strip()))
+    if not team_name or len(requested) < 2:
+        st.info("Name the team and list at least two members.")
+        return
+    
+    rows = {member: profiles.row(member) for member in requested}
+    missing = [member for member, row in rows.items() if row is None]
+    if missing:
+        st.warning(f"No profile for {len(missing)} member(s): {', '.join(missing[:10])}")
+    members = [member for member, row in rows.items() if row is not None]
+    if len(members) < 2:
+        return
+    team = get_team_cache().get(team_name, members, profiles.vectors[[rows[m] for m in members]])
+    
+    st.markdown("### Profile Similarity")
+    shown = members[:HEATMAP_MEMBERS]
+    if len(members) > len(shown):
+        st.caption(f"Showing the first {len(shown)} of {len(members)} members.")
+    similarity = pd.DataFrame(team.similarity(team.submatrix(shown)), index=shown, columns=shown)
+    fig = px.imshow(similarity, color_continuous_scale="Viridis", zmin=0, zmax=1, aspect="auto")
+    fig.update_layout(height=500)
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("1 is an identical profile; 0 is the farthest apart two profiles can be.")
+    
+    if len(members) <= PAIR_SCAN_MEMBERS or st.checkbox(f"Scan all {len(members):,} members for pairs"):
+        col1, col2 = st.columns(2)
+        for col, title, farthest in ((col1, "Most Similar Pairs", False), (col2, "Most Complementary Pairs", True)):
+            with col:
+                st.markdown(f"### {title}")
+                st.dataframe(pd.DataFrame([
+                    {"Member": pair['a'], "Teammate": pair['b'], "Similarity": round(pair['similarity'], 3)}
+                    for pair in team.extreme_pairs(10, farthest=farthest)
+                ]), use_container_width=True, hide_index=True)
+    
+    st.markdown("### Member Lookup")
+    member = st.selectbox("Member", members, key="team_lookup")
+    col1, col2 = st.columns(2)
+    for col, title, farthest in ((col1, "Closest Teammates", False), (col2, "Most Different Teammates", True)):
+        with col:
+            st.markdown(f"**{title}**")
+            neighbors = team.neighbors(member, k=5, farthest=farthest)
+            st.dataframe(pd.DataFrame([
+                {"Teammate": n['id'], "Similarity": round(n['similarity'], 3),
+                 **{nia.dimensions[d]: round(float(v), 1) for d, v in zip(nia.dimension_keys, team.vectors[team.index[n['id']]])}}
+                for n in neighbors
+            ]), use_container_width=True, hide_index=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -66,6 +66,7 @@ class NexusInsightAssessment:
         }
         
         self.questions = self._create_questions()
+        self.question_bounds = self._build_question_bounds()
         
     def _create_questions(self):
         """Create assessment questions"""
@@ -182,10 +183,22 @@ class NexusInsightAssessment:
             }
         ]
 
+    def _build_question_bounds(self):
+        """Lowest and highest contribution each question can make to each dimension"""
+        bounds = {}
+        for question in self.questions:
+            bounds[question["id"]] = {
+                dim: (min(opt["weights"].get(dim, 0) for opt in question["options"]),
+                      max(opt["weights"].get(dim, 0) for opt in question["options"]))
+                for dim in self.dimensions
+            }
+        return bounds
+
     def calculate_scores(self, responses):
         """Calculate dimension scores"""
         dimension_totals = {dim: 0 for dim in self.dimensions.keys()}
-        question_counts = {dim: 0 for dim in self.dimensions.keys()}
+        min_possible = {dim: 0 for dim in self.dimensions.keys()}
+        max_possible = {dim: 0 for dim in self.dimensions.keys()}
         
         for q_id, response in responses.items():
             question = next((q for q in self.questions if q["id"] == int(q_id)), None)
@@ -196,21 +209,17 @@ class NexusInsightAssessment:
                     
                     for dim, weight in selected_option["weights"].items():
                         dimension_totals[dim] += weight
-                        question_counts[dim] += 1
+                    for dim, (low, high) in self.question_bounds[question["id"]].items():
+                        min_possible[dim] += low
+                        max_possible[dim] += high
         
-        # Normalize scores to 0-100 scale
+        # Normalize scores to 0-100 against the range the answered questions can reach
         normalized_scores = {}
         for dim in self.dimensions.keys():
-            if question_counts[dim] > 0:
+            if max_possible[dim] > min_possible[dim]:
                 raw_score = dimension_totals[dim]
-                max_possible = question_counts[dim] * 4
-                min_possible = question_counts[dim] * -3
-                
-                if max_possible != min_possible:
-                    normalized = ((raw_score - min_possible) / (max_possible - min_possible)) * 100
-                    normalized_scores[dim] = max(0, min(100, normalized))
-                else:
-                    normalized_scores[dim] = 50
+                normalized = ((raw_score - min_possible[dim]) / (max_possible[dim] - min_possible[dim])) * 100
+                normalized_scores[dim] = max(0, min(100, normalized))
             else:
                 normalized_scores[dim] = 0
         
@@ -0,0 +1,226 @@
+# nexus_team.py
+"""Team composition from precomputed score matrices.
+
+A team is scored on its dimension profile, with scores scaled to 0-1:
+
+- coverage: for each dimension, the best member's score, so every
+  dimension has someone to carry it (Team Roles and Leadership weigh most)
+- depth: the team's mean score per dimension
+- balance: a penalty on the spread of the team's mean across dimensions
+
+Only the dimensions the question bank measures are scored; the rest are 0
+for everyone and would only dilute the weights and distort the balance.
+
+Teams are seeded greedily and improved by swapping one member for one
+outsider. Per-dimension sums are kept incrementally and the value of every
+possible (member, outsider) swap is evaluated as one (size, pool, dims)
+array operation, so a 10k pool takes a fraction of a second per restart.
+Restarts with different seed members run across processes.
+
+    python nexus_team.py store/ --size 6 --teams 20 --restarts 8 --workers 4
+"""
+import argparse
+import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_DIM_WEIGHTS = {"TR": 1.5, "LD": 1.5}
+
+TEAM_OBJECTIVE = {
+    "coverage_weight": 0.6,  # share of the profile term taken by per-dimension best, rest by mean
+    "balance_weight": 0.5,   # penalty per unit of std of the team mean across dimensions
+}
+
+
+class TeamObjective:
+    """Vectorized team scoring over a (people, dims) score matrix"""
+
+    def __init__(self, scores: np.ndarray, dimension_keys: Sequence[str],
+                 dim_weights: Optional[Dict[str, float]] = None, objective: Optional[Dict] = None,
+                 measured: Optional[Sequence[str]] = None):
+        columns = [i for i, d in enumerate(dimension_keys) if measured is None or d in measured]
+        self.scores = np.ascontiguousarray(np.asarray(scores)[:, columns], dtype=np.float32) / 100.0
+        self.dimension_keys = [dimension_keys[i] for i in columns]
+        weights = {**DEFAULT_DIM_WEIGHTS, **(dim_weights or {})}
+        w = np.array([weights.get(d, 1.0) for d in self.dimension_keys], dtype=np.float32)
+        self.dim_weights = w / w.sum()
+        params = {**TEAM_OBJECTIVE, **(objective or {})}
+        self.coverage_weight = params["coverage_weight"]
+        self.balance_weight = params["balance_weight"]
+
+    def evaluate(self, team_max: np.ndarray, team_sum: np.ndarray, size: int) -> np.ndarray:
+        """Objective for any leading batch shape of (..., dims) max and sum arrays"""
+        mean = team_sum / size
+        profile = self.coverage_weight * team_max + (1 - self.coverage_weight) * mean
+        return profile @ self.dim_weights - self.balance_weight * mean.std(axis=-1)
+
+    def team_value(self, members: Sequence[int]) -> float:
+        block = self.scores[list(members)]
+        return float(self.evaluate(block.max(axis=0), block.sum(axis=0), len(members)))
+
+    def greedy(self, size: int, available: np.ndarray, first: int) -> List[int]:
+        """Grow a team from ``first`` by adding the best outsider each step"""
+        members = [first]
+        team_max = self.scores[first].copy()
+        team_sum = self.scores[first].copy()
+        free = available.copy()
+        free[first] = False
+        while len(members) < size:
+            values = self.evaluate(np.maximum(team_max, self.scores), team_sum + self.scores, len(members) + 1)
+            values[~free] = -np.inf
+            best = int(np.argmax(values))
+            if not np.isfinite(values[best]):
+                raise ValueError(f"Pool has fewer than {size} available people")
+            members.append(best)
+            free[best] = False
+            np.maximum(team_max, self.scores[best], out=team_max)
+            team_sum += self.scores[best]
+        return members
+
+    def improve(self, members: List[int], available: np.ndarray, max_swaps: int = 1000) -> List[int]:
+        """Best-improvement single swaps until no swap raises the objective"""
+        members = list(members)
+        size = len(members)
+        free = available.copy()
+        free[members] = False
+        team_sum = self.scores[members].sum(axis=0)
+        current = self.team_value(members)
+        for _ in range(max_swaps):
+            block = self.scores[members]
+            # Per-dimension max of the team with each member left out, (size, dims)
+            others = ~np.eye(size, dtype=bool)
+            max_without = np.stack([block[keep].max(axis=0) for keep in others])
+            values = self.evaluate(
+                np.maximum(max_without[:, None, :], self.scores[None, :, :]),
+                (team_sum - block)[:, None, :] + self.scores[None, :, :],
+                size,
+            )
+            values[:, ~free] = -np.inf
+            out_pos, incoming = np.unravel_index(int(np.argmax(values)), values.shape)
+            if values[out_pos, incoming] <= current + 1e-7:
+                break
+            outgoing = members[out_pos]
+            members[out_pos] = int(incoming)
+            free[outgoing], free[incoming] = True, False
+            team_sum += self.scores[incoming] - self.scores[outgoing]
+            current = float(values[out_pos, incoming])
+        return members
+
+
+def _run_restarts(scores: np.ndarray, dimension_keys: Sequence[str], size: int, available: np.ndarray,
+                  seeds: Sequence[int], dim_weights: Optional[Dict], objective: Optional[Dict],
+                  measured: Optional[Sequence[str]] = None) -> tuple:
+    """Best (value, members) over greedy-then-swap restarts, one per seed"""
+    team_objective = TeamObjective(scores, dimension_keys, dim_weights, objective, measured)
+    candidates = np.flatnonzero(available)
+    best = (-np.inf, [])
+    for seed in seeds:
+        if seed == 0:
+            # Deterministic restart from the strongest individual
+            solo = team_objective.evaluate(team_objective.scores, team_objective.scores, 1)
+            first = int(candidates[np.argmax(solo[candidates])])
+        else:
+            first = int(np.random.default_rng(seed).choice(candidates))
+        members = team_objective.improve(team_objective.greedy(size, available, first), available)
+        value = team_objective.team_value(members)
+        if value > best[0]:
+            best = (value, sorted(members))
+    return best
+
+
+def _describe(team_objective: TeamObjective, members: List[int], value: float,
+              ids: Optional[Sequence]) -> Dict:
+    block = team_objective.scores[members] * 100
+    return {
+        "members": [ids[m] for m in members] if ids is not None else members,
+        "rows": members,
+        "objective": round(value, 4),
+        "coverage": {d: round(float(v), 1) for d, v in zip(team_objective.dimension_keys, block.max(axis=0))},
+        "mean": {d: round(float(v), 1) for d, v in zip(team_objective.dimension_keys, block.mean(axis=0))},
+    }
+
+
+def build_team(scores: np.ndarray, dimension_keys: Sequence[str], size: int, restarts: int = 8,
+               workers: int = 1, available: Optional[np.ndarray] = None, ids: Optional[Sequence] = None,
+               dim_weights: Optional[Dict[str, float]] = None, objective: Optional[Dict] = None,
+               seed: int = 0, executor: Optional[Executor] = None,
+               measured: Optional[Sequence[str]] = None) -> Dict:
+    """Best team of ``size`` from the pool over ``restarts`` greedy-with-swaps runs
+
+    ``measured`` limits scoring to those dimensions, normally the engine's
+    ``measured_dimensions``; all dimensions count when it is None.
+    """
+    available = np.ones(len(scores), dtype=bool) if available is None else np.asarray(available, dtype=bool)
+    if available.sum() < size:
+        raise ValueError(f"Pool has {int(available.sum())} available people, fewer than team size {size}")
+    seeds = [0] + [seed * 1_000_003 + r for r in range(1, restarts)]
+
+    if workers <= 1 and executor is None:
+        value, members = _run_restarts(scores, dimension_keys, size, available, seeds, dim_weights, objective,
+                                       measured)
+    else:
+        own_executor = executor is None
+        executor = executor or ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [
+                executor.submit(_run_restarts, scores, dimension_keys, size, available, chunk, dim_weights, objective,
+                                measured)
+                for chunk in np.array_split(seeds, min(max(workers, 1), len(seeds)))
+            ]
+            value, members = max((f.result() for f in futures), key=lambda result: result[0])
+        finally:
+            if own_executor:
+                executor.shutdown()
+    return _describe(TeamObjective(scores, dimension_keys, dim_weights, objective, measured), members, value, ids)
+
+
+def partition_teams(scores: np.ndarray, dimension_keys: Sequence[str], size: int,
+                    n_teams: Optional[int] = None, restarts: int = 4, workers: int = 1,
+                    ids: Optional[Sequence] = None, dim_weights: Optional[Dict[str, float]] = None,
+                    objective: Optional[Dict] = None, seed: int = 0,
+                    measured: Optional[Sequence[str]] = None) -> List[Dict]:
+    """Disjoint teams built one after another from whoever is still unassigned"""
+    available = np.ones(len(scores), dtype=bool)
+    n_teams = len(scores) // size if n_teams is None else n_teams
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    teams = []
+    try:
+        for t in range(n_teams):
+            if available.sum() < size:
+                break
+            team = build_team(scores, dimension_keys, size, restarts=restarts, workers=workers,
+                              available=available, ids=ids, dim_weights=dim_weights, objective=objective,
+                              seed=seed + t, executor=executor, measured=measured)
+            available[team["rows"]] = False
+            teams.append(team)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return teams
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Assemble teams from a score store")
+    parser.add_argument("store", help="score store directory (see nexus_rescoring.py)")
+    parser.add_argument("--size", type=int, default=6)
+    parser.add_argument("--teams", type=int, default=1, help="number of disjoint teams to build")
+    parser.add_argument("--restarts", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from nexus_rescoring import ScoreStore
+
+    store = ScoreStore(args.store, mode="r")
+    engine = store.engine()
+    teams = partition_teams(np.asarray(store.scores), engine.dimension_keys, args.size,
+                            n_teams=args.teams, restarts=args.restarts, workers=args.workers, seed=args.seed,
+                            measured=engine.measured_dimensions)
+    print(json.dumps(teams, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+# nexus_team_compare.py
+"""Pairwise profile distances for comparing the members of a team.
+
+A team's distances are Euclidean distances between members' dimension score
+vectors, kept on disk as one float32 (capacity, capacity) memory-mapped
+matrix per team. Rows are slots: a member keeps its slot while it stays on the
+team, and a leaver's slot goes to the next joiner. Matrices are computed in
+row blocks, each one (block, dims) @ (dims, capacity) BLAS product, so a 50k
+team never holds more than a block in memory.
+
+A team's cache records the hash of its membership and the vectors it was
+computed from. Asking for the same members with the same scores reads the
+matrix as is; when members join, leave or are reassessed only their rows are
+recomputed. Writing their columns too would touch a page of every row, so
+instead the cache lists these patched slots in update order and readers take
+each pair's distance from whichever of its two rows was written last. The
+matrix is rebuilt when most of the team changed, it runs out of slots, or
+``MAX_PATCHED`` rows are patched.
+
+    python nexus_team_compare.py team_cache/ store/ --team sales --rows 0-4999 --pairs 10
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Elements per (block, capacity) distance block, ~16 MB of float32
+BLOCK_ELEMENTS = 4_194_304
+# Rebuild instead of updating when this share of the team's rows changed
+REBUILD_FRACTION = 0.5
+# Patched rows tolerated before a rebuild folds them back in
+MAX_PATCHED = 256
+
+
+def membership_hash(ids: Sequence[Any]) -> str:
+    """Order-independent hash of a team's member ids"""
+    digest = hashlib.sha1()
+    for member in sorted(str(i) for i in ids):
+        digest.update(member.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def fill_rows(matrix: np.ndarray, vectors: np.ndarray, rows: np.ndarray):
+    """Write distances from ``vectors[rows]`` to every vector into ``matrix[rows]``"""
+    # Centering shrinks the norms, and with them float32 cancellation in |a|^2 + |b|^2 - 2ab
+    centered = vectors - vectors.mean(axis=0)
+    sq_norms = (centered ** 2).sum(axis=1)
+    block = max(1, BLOCK_ELEMENTS // len(vectors))
+    for start in range(0, len(rows), block):
+        chunk = rows[start:start + block]
+        d2 = centered[chunk] @ centered.T
+        d2 *= -2
+        d2 += sq_norms[chunk, None]
+        d2 += sq_norms[None, :]
+        np.maximum(d2, 0, out=d2)
+        np.sqrt(d2, out=d2)
+        d2[np.arange(len(chunk)), chunk] = 0
+        matrix[chunk] = d2
+
+
+class TeamDistances:
+    """One team's distance matrix with the member in each slot"""
+
+    def __init__(self, matrix: np.ndarray, vectors: np.ndarray, slots: List[Any], dimension_keys: Sequence[str],
+                 patched: Sequence[int] = (), measured: Optional[Sequence[str]] = None):
+        self.matrix = matrix
+        self.vectors = vectors
+        self.slots = slots
+        self.dimension_keys = list(dimension_keys)
+        self.index = {member: slot for slot, member in enumerate(slots) if member is not None}
+        self.active = np.array([member is not None for member in slots], dtype=bool)
+        # 0 for rows written by the last build, then 1, 2, ... in patch order
+        self.generation = np.zeros(len(slots), dtype=np.int32)
+        self.generation[list(patched)] = np.arange(1, len(patched) + 1)
+        # Largest possible distance, for scaling to a 0-1 similarity; unmeasured dimensions never differ
+        self.max_distance = 100.0 * np.sqrt(len(measured if measured is not None else self.dimension_keys))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def members(self) -> List[Any]:
+        return [member for member in self.slots if member is not None]
+
+    def similarity(self, distances: np.ndarray) -> np.ndarray:
+        return 1.0 - np.asarray(distances) / self.max_distance
+
+    def _read(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """(rows, cols) distances, each from the more recently written of its two rows"""
+        values = np.array(self.matrix[rows][:, cols], dtype=np.float32)
+        newer = self.generation[cols][None, :] > self.generation[rows][:, None]
+        stale = np.flatnonzero(newer.any(axis=0))
+        if len(stale):
+            # Gathers only the touched elements of those few patched rows
+            fresh = np.asarray(self.matrix[np.ix_(cols[stale], rows)]).T
+            values[:, stale] = np.where(newer[:, stale], fresh, values[:, stale])
+        return values
+
+    def distance(self, a: Any, b: Any) -> float:
+        return float(self._read(np.array([self.index[a]]), np.array([self.index[b]]))[0, 0])
+
+    def submatrix(self, ids: Sequence[Any]) -> np.ndarray:
+        """(len(ids), len(ids)) distances among ``ids``, e.g. for a heat map"""
+        slots = np.array([self.index[i] for i in ids], dtype=np.intp)
+        return self._read(slots, slots)
+
+    def neighbors(self, member: Any, k: int = 5, farthest: bool = False) -> List[Dict]:
+        """The ``k`` teammates closest to ``member``, or most different with ``farthest``"""
+        slot = self.index[member]
+        row = self._read(np.array([slot]), np.arange(len(self.slots)))[0]
+        key = -row if farthest else row
+        key[~self.active] = np.inf
+        key[slot] = np.inf
+        k = min(k, len(self) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(key, k - 1)[:k]
+        top = top[np.argsort(key[top], kind="stable")]
+        return [{"id": self.slots[j], "distance": float(row[j]), "similarity": float(self.similarity(row[j]))}
+                for j in top]
+
+    def extreme_pairs(self, k: int = 10, farthest: bool = False) -> List[Dict]:
+        """The ``k`` most similar (or most different) pairs, scanning the matrix in row blocks"""
+        n = len(self.slots)
+        active = np.flatnonzero(self.active)
+        block = max(1, BLOCK_ELEMENTS // max(n, 1))
+        best_keys = np.empty(0, dtype=np.float32)
+        best_pairs = np.empty((0, 2), dtype=np.int64)
+        for start in range(0, len(active), block):
+            rows = active[start:start + block]
+            values = self._read(rows, active)
+            key = -values if farthest else values
+            # Each pair once: only columns after the row's own position
+            key[np.arange(len(rows))[:, None] + start >= np.arange(len(active))[None, :]] = np.inf
+            flat = key.ravel()
+            take = min(k, int(np.isfinite(flat).sum()))
+            if take == 0:
+                continue
+            top = np.argpartition(flat, take - 1)[:take]
+            best_keys = np.concatenate([best_keys, flat[top]])
+            best_pairs = np.concatenate([best_pairs, np.column_stack([rows[top // len(active)],
+                                                                      active[top % len(active)]])])
+            if len(best_keys) > k:
+                keep = np.argpartition(best_keys, k - 1)[:k]
+                best_keys, best_pairs = best_keys[keep], best_pairs[keep]
+        order = np.argsort(best_keys, kind="stable")
+        signed = -best_keys if farthest else best_keys
+        return [
+            {"a": self.slots[a], "b": self.slots[b], "distance": float(d), "similarity": float(self.similarity(d))}
+            for (a, b), d in zip(best_pairs[order], signed[order])
+        ]
+
+
+class TeamDistanceCache:
+    """Directory of per-team distance matrices, reused while membership is unchanged"""
+
+    def __init__(self, directory: str, dimension_keys: Sequence[str], measured: Optional[Sequence[str]] = None):
+        self.directory = directory
+        self.dimension_keys = list(dimension_keys)
+        self.measured = list(measured) if measured is not None else None
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "updates": 0, "rows_updated": 0, "builds": 0}
+
+    def _paths(self, team: str) -> Dict[str, str]:
+        prefix = os.path.join(self.directory, hashlib.sha1(str(team).encode()).hexdigest())
+        return {"meta": prefix + ".json", "vectors": prefix + ".vec.npy", "matrix": prefix + ".dist"}
+
+    def _read_meta(self, paths: Dict[str, str]) -> Optional[Dict]:
+        try:
+            with open(paths["meta"]) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("dimension_keys") != self.dimension_keys or meta.get("membership") is None:
+            return None
+        return meta
+
+    def _write_meta(self, paths: Dict[str, str], meta: Dict):
+        tmp = paths["meta"] + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, paths["meta"])
+
+    def get(self, team: str, ids: Sequence[Any], vectors: np.ndarray) -> TeamDistances:
+        """Distances among ``ids`` (one row of ``vectors`` each), updating the team's cache as needed"""
+        ids = list(ids)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), len(self.dimension_keys))
+        if len(set(ids)) != len(ids):
+            raise ValueError("Team members must be unique")
+        paths = self._paths(team)
+        membership = membership_hash(ids)
+        with self._lock:
+            meta = self._read_meta(paths)
+            if meta is not None:
+                slots = meta["slots"]
+                stored = np.load(paths["vectors"])
+                index = {member: slot for slot, member in enumerate(slots) if member is not None}
+                given = np.array([index.get(i, -1) for i in ids], dtype=np.intp)
+                changed = (given < 0) | np.any(stored[np.maximum(given, 0)] != vectors, axis=1)
+                if meta["membership"] == membership and not changed.any():
+                    self._counters["hits"] += 1
+                    matrix = np.memmap(paths["matrix"], dtype=np.float32, mode="r",
+                                       shape=(meta["capacity"], meta["capacity"]))
+                    return TeamDistances(matrix, stored, slots, self.dimension_keys, meta["patched"], self.measured)
+                updated = self._update(paths, meta, stored, ids, vectors, changed)
+                if updated is not None:
+                    return updated
+            return self._build(paths, ids, vectors, membership)
+
+    def _build(self, paths: Dict[str, str], ids: List[Any], vectors: np.ndarray, membership: str) -> TeamDistances:
+        # Headroom for joiners before the next rebuild
+        capacity = len(ids) + max(16, len(ids) // 8)
+        stored = np.zeros((capacity, len(self.dimension_keys)), dtype=np.float32)
+        stored[:len(ids)] = vectors
+        slots = ids + [None] * (capacity - len(ids))
+        self._write_meta(paths, {"dimension_keys": self.dimension_keys, "membership": None})
+        matrix = np.memmap(paths["matrix"], dtype=np.float32, mode="w+", shape=(capacity, capacity))
+        fill_rows(matrix, stored, np.arange(len(ids)))
+        matrix.flush()
+        np.save(paths["vectors"], stored)
+        self._write_meta(paths, {"dimension_keys": self.dimension_keys, "membership": membership,
+                                 "capacity": capacity, "slots": slots, "patched": []})
+        self._counters["builds"] += 1
+        return TeamDistances(matrix, stored, slots, self.dimension_keys, measured=self.measured)
+
+    def _update(self, paths: Dict[str, str], meta: Dict, stored: np.ndarray, ids: List[Any],
+                vectors: np.ndarray, changed: np.ndarray) -> Optional[TeamDistances]:
+        """Recompute only the rows of joiners and reassessed members; None to rebuild"""
+        slots = list(meta["slots"])
+        keep = set(ids)
+        for slot, member in enumerate(slots):
+            if member is not None and member not in keep:
+                slots[slot] = None
+        index = {member: slot for slot, member in enumerate(slots) if member is not None}
+        joining = [i for i in ids if i not in index]
+        free = [slot for slot, member in enumerate(slots) if member is None]
+        if len(joining) > len(free) or changed.sum() > REBUILD_FRACTION * len(ids):
+            return None
+        for member, slot in zip(joining, free):
+            slots[slot] = member
+            index[member] = slot
+        rows = np.array(sorted(index[i] for i, c in zip(ids, changed) if c), dtype=np.intp)
+        # Rewritten rows move to the end of the patch order; vacated slots are never read again
+        updated = set(rows.tolist())
+        patched = [slot for slot in meta["patched"] if slot not in updated and slots[slot] is not None] + rows.tolist()
+        if len(patched) > MAX_PATCHED:
+            return None
+        stored[[index[i] for i in ids]] = vectors
+
+        self._write_meta(paths, {"dimension_keys": self.dimension_keys, "membership": None})
+        matrix = np.memmap(paths["matrix"], dtype=np.float32, mode="r+", shape=(meta["capacity"], meta["capacity"]))
+        fill_rows(matrix, stored, rows)
+        matrix.flush()
+        np.save(paths["vectors"], stored)
+        self._write_meta(paths, {"dimension_keys": self.dimension_keys, "membership": membership_hash(ids),
+                                 "capacity": meta["capacity"], "slots": slots, "patched": patched})
+        self._counters["updates"] += 1
+        self._counters["rows_updated"] += len(rows)
+        return TeamDistances(matrix, stored, slots, self.dimension_keys, patched, self.measured)
+
+    def drop(self, team: str):
+        with self._lock:
+            for path in self._paths(team).values():
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return dict(self._counters)
+
+
+def parse_rows(spec: str) -> List[int]:
+    """Row numbers from a spec like ``0-99,150,200-249``"""
+    rows = []
+    for part in spec.split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            rows.extend(range(int(first), int(last) + 1))
+        elif part.strip():
+            rows.append(int(part))
+    return rows
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare the members of a team from a score store")
+    parser.add_argument("cache", help="team distance cache directory")
+    parser.add_argument("store", help="score store directory (see nexus_rescoring.py)")
+    parser.add_argument("--team", required=True, help="team name the cache is kept under")
+    parser.add_argument("--rows", required=True, help="store rows on the team, e.g. 0-4999,6000")
+    parser.add_argument("--pairs", type=int, default=10, help="most similar and most different pairs to list")
+    args = parser.parse_args(argv)
+
+    from nexus_rescoring import ScoreStore
+
+    store = ScoreStore(args.store, mode="r")
+    rows = parse_rows(args.rows)
+    engine = store.engine()
+    cache = TeamDistanceCache(args.cache, engine.dimension_keys, engine.measured_dimensions)
+    team = cache.get(args.team, rows, np.asarray(store.scores[rows]))
+    print(f"{len(team)} members; cache {cache.metrics()}")
+    for title, farthest in (("Most similar", False), ("Most different", True)):
+        print(f"\n{title} pairs:")
+        for pair in team.extreme_pairs(args.pairs, farthest=farthest):
+            print(f"  {pair['a']:>8} {pair['b']:>8}  distance {pair['distance']:6.1f}  similarity {pair['similarity']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
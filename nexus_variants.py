@@ -0,0 +1,148 @@
+# nexus_variants.py
+"""A/B comparison of alternative weightings of the question bank.
+
+Variants are edited copies of the bank (as written by
+``nexus_rescoring.py export-bank``) that keep the questions and options and
+change only weights. All variants, with the current bank as the baseline,
+are scored in one pass by ``NexusInsightAssessment.score_variants``; each is
+then compared with the baseline per dimension:
+
+- Spearman rank correlation of candidates' scores
+- mean absolute score difference
+- how many candidates change level (Low / Medium / High per
+  ``engine.thresholds``), split into promotions and demotions
+
+    python nexus_variants.py cohort.nxa variant_a.json variant_b.json
+    python nexus_variants.py store/ variants/*.json --out scores.npy
+"""
+import argparse
+import json
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from nexus_engine import NexusInsightAssessment
+
+
+def variant_weights(engine: NexusInsightAssessment, banks: Sequence[List[Dict]]) -> np.ndarray:
+    """(1 + variants, questions, options, dimensions): the engine's weights followed by each bank's"""
+    tensors = [engine.weight_tensor]
+    for i, bank in enumerate(banks):
+        variant = NexusInsightAssessment(questions=bank)
+        if [q["id"] for q in variant.questions] != [q["id"] for q in engine.questions] \
+                or not np.array_equal(variant.option_mask, engine.option_mask):
+            raise ValueError(f"Variant {i} does not have the same questions and options as the bank")
+        tensors.append(variant.weight_tensor)
+    return np.stack(tensors)
+
+
+# Scores within this distance rank as ties; far below the 0.1 points reports show
+RANK_RESOLUTION = 1e-4
+
+
+def centered_ranks(scores: np.ndarray) -> np.ndarray:
+    """Column-wise ranks of an (n, columns) 0-100 score matrix minus their mean, ties sharing their average rank"""
+    n_bins = int(round(100 / RANK_RESOLUTION)) + 1
+    ranks = np.empty(scores.shape, dtype=np.float32)
+    for j in range(scores.shape[1]):
+        # Counting over quantized scores ranks in linear time, with no sort
+        keys = np.rint(np.clip(scores[:, j], 0, 100) / RANK_RESOLUTION).astype(np.int32)
+        counts = np.bincount(keys, minlength=n_bins)
+        average = np.cumsum(counts) - (counts - 1) / 2
+        ranks[:, j] = average[keys] - (len(scores) + 1) / 2
+    return ranks
+
+
+def rank_correlation(ra: np.ndarray, rb: np.ndarray) -> np.ndarray:
+    """Spearman correlation of matching columns from ``centered_ranks``; NaN for constant columns"""
+    numerator = np.einsum("ij,ij->j", ra, rb, dtype=np.float64)
+    denom = np.sqrt(np.einsum("ij,ij->j", ra, ra, dtype=np.float64) * np.einsum("ij,ij->j", rb, rb, dtype=np.float64))
+    return np.divide(numerator, denom, out=np.full(ra.shape[1], np.nan), where=denom > 0)
+
+
+def score_levels(engine: NexusInsightAssessment, scores: np.ndarray) -> np.ndarray:
+    """Index into the engine's thresholds (0 = lowest level) for every score"""
+    edges = sorted(low for low, _ in engine.thresholds.values())[1:]
+    return np.searchsorted(edges, scores, side="right").astype(np.int8)
+
+
+def agreement(engine: NexusInsightAssessment, variant_scores: np.ndarray, names: Sequence[str]) -> List[Dict]:
+    """Per-variant, per-dimension agreement of (variants, n, dimensions) scores with variant 0"""
+    measured = [i for i, d in enumerate(engine.dimension_keys) if d in engine.measured_dimensions]
+    baseline = variant_scores[0]
+    baseline_levels = score_levels(engine, baseline)
+    # Per measured dimension, then the overall score
+    baseline_ranks = centered_ranks(np.column_stack([baseline[:, measured], baseline[:, measured].mean(axis=1)]))
+    results = []
+    for v in range(1, len(variant_scores)):
+        scores = variant_scores[v]
+        ranks = centered_ranks(np.column_stack([scores[:, measured], scores[:, measured].mean(axis=1)]))
+        rho = rank_correlation(baseline_ranks, ranks)
+        levels = score_levels(engine, scores)
+        dimensions = {}
+        for j, i in enumerate(measured):
+            moved = levels[:, i].astype(np.int16) - baseline_levels[:, i]
+            dimensions[engine.dimension_keys[i]] = {
+                "spearman": float(rho[j]),
+                "mean_abs_diff": float(np.abs(scores[:, i] - baseline[:, i]).mean()),
+                "level_changes": int(np.count_nonzero(moved)),
+                "promoted": int((moved > 0).sum()),
+                "demoted": int((moved < 0).sum()),
+            }
+        results.append({
+            "variant": names[v],
+            "overall_spearman": float(rho[-1]),
+            "any_level_change": int(np.any(levels[:, measured] != baseline_levels[:, measured], axis=1).sum()),
+            "dimensions": dimensions,
+        })
+    return results
+
+
+def load_choices(path: str) -> Tuple[NexusInsightAssessment, np.ndarray]:
+    """``(engine, choices)`` from a score store directory or a .nxa archive"""
+    if os.path.isdir(path):
+        from nexus_rescoring import ScoreStore
+
+        store = ScoreStore(path, mode="r")
+        return store.engine(), store.choices
+    from nexus_archive import ArchiveReader
+
+    engine = NexusInsightAssessment()
+    with ArchiveReader(path, engine) as reader:
+        return engine, reader.choices()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Score and compare question bank weight variants")
+    parser.add_argument("source", help="score store directory or .nxa archive")
+    parser.add_argument("variants", nargs="+", help="variant bank JSON files")
+    parser.add_argument("--chunk-size", type=int, default=65_536)
+    parser.add_argument("--out", help="save the (variants, n, dimensions) scores to this .npy")
+    args = parser.parse_args(argv)
+
+    engine, choices = load_choices(args.source)
+    banks = []
+    for path in args.variants:
+        with open(path) as f:
+            banks.append(json.load(f))
+    names = ["baseline"] + [os.path.splitext(os.path.basename(p))[0] for p in args.variants]
+    weights = variant_weights(engine, banks)
+
+    out = None
+    if args.out:
+        out = np.lib.format.open_memmap(args.out, mode="w+", dtype=np.float32,
+                                        shape=(len(weights), len(choices), len(engine.dimension_keys)))
+    scores = engine.score_variants(choices, weights, chunk_size=args.chunk_size, out=out)
+
+    print(f"{len(choices)} responses, {len(banks)} variants against the current bank")
+    for result in agreement(engine, scores, names):
+        print(f"\n{result['variant']}: overall Spearman {result['overall_spearman']:.3f}, "
+              f"{result['any_level_change']} candidates change level on some dimension")
+        for dim, stats in result["dimensions"].items():
+            print(f"  {dim:<4} rho {stats['spearman']:6.3f}  |diff| {stats['mean_abs_diff']:5.2f}  "
+                  f"level changes {stats['level_changes']} (+{stats['promoted']} / -{stats['demoted']})")
+
+
+if __name__ == "__main__":
+    main()
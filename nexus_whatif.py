@@ -0,0 +1,59 @@
+# nexus_whatif.py
+"""Instant what-if scoring for changing a single answer.
+
+For a finished assessment the simulator precomputes, for every question and
+option, the change in raw dimension totals and normalization bounds that
+switching to that option would cause. Flipping an answer is then one vector add plus the
+engine's per-row normalization and correlation rules, O(dimensions) work.
+"""
+from typing import Dict
+
+import numpy as np
+
+from nexus_engine import NexusInsightAssessment
+
+
+class WhatIfSimulator:
+    """Score vector of one candidate under single-answer changes"""
+
+    def __init__(self, engine: NexusInsightAssessment, choices: np.ndarray):
+        self.engine = engine
+        self.choices = np.asarray(choices, dtype=np.int8)
+        totals, lower, upper = engine.raw_dimension_totals(self.choices[None, :])
+        self.totals = totals[0].astype(np.float64)
+        self.lower = lower[0].astype(np.float64)
+        self.upper = upper[0].astype(np.float64)
+
+        # Per-question, per-option delta vectors relative to the candidate's actual answers
+        q_index = np.arange(len(self.choices))
+        answered = (self.choices >= 0)[:, None, None]
+        current = np.where(self.choices >= 0, self.choices, 0)
+        self.delta_totals = engine.weight_tensor - engine.weight_tensor[q_index, current][:, None, :] * answered
+        # Answering a skipped question widens the bounds by that question's range; any option will do
+        self.delta_lower = np.where(answered[:, :, 0], 0, engine.option_min)
+        self.delta_upper = np.where(answered[:, :, 0], 0, engine.option_max)
+
+    @classmethod
+    def from_responses(cls, engine: NexusInsightAssessment, responses: Dict) -> "WhatIfSimulator":
+        return cls(engine, engine.responses_to_matrix([responses])[0])
+
+    def scores_with(self, question_index: int, option_index: int) -> Dict[str, float]:
+        """Dimension scores if ``question_index`` had been answered with ``option_index``"""
+        totals = self.totals + self.delta_totals[question_index, option_index]
+        lower = self.lower + self.delta_lower[question_index]
+        upper = self.upper + self.delta_upper[question_index]
+        row = self.engine.normalize_dimension_totals(totals[None, :], lower[None, :], upper[None, :])[0]
+        return {dim: float(score) for dim, score in zip(self.engine.dimension_keys, row)}
+
+    def simulate(self, question_index: int, option_index: int) -> Dict:
+        """Scores plus the headline dashboard figures that depend on them"""
+        scores = self.scores_with(question_index, option_index)
+        result = {
+            "scores": scores,
+            "overall_score": self.engine.overall_score(scores),
+            "leadership_style": self.engine._analyze_leadership_style(scores),
+            "innovation_potential": self.engine._calculate_innovation_potential(scores),
+        }
+        if self.engine.archetypes is not None:
+            result["archetype"] = self.engine.archetypes.describe(scores)
+        return result
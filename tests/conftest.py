@@ -0,0 +1,39 @@
+import copy
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_engine import NexusInsightAssessment  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def engine():
+    return NexusInsightAssessment()
+
+
+def random_choices(engine, n, seed=0, skip=0.1):
+    """(n, questions) valid option indices with about ``skip`` of the answers left out"""
+    rng = np.random.default_rng(seed)
+    counts = engine.option_mask.sum(axis=1)
+    choices = (rng.random((n, len(engine.questions))) * counts).astype(np.int8)
+    choices[rng.random(choices.shape) < skip] = -1
+    return choices
+
+
+def to_responses(engine, row):
+    return {str(q["id"]): {"selected_option": int(c)} for q, c in zip(engine.questions, row) if c >= 0}
+
+
+def edited_bank(engine, seed=0, questions=3):
+    """The engine's bank with the weights of a few questions' options changed"""
+    rng = np.random.default_rng(seed)
+    bank = copy.deepcopy(engine.questions)
+    for qi in rng.choice(len(bank), size=questions, replace=False):
+        for option in bank[qi]["options"]:
+            dim = engine.dimension_keys[rng.integers(len(engine.dimension_keys))]
+            option["weights"][dim] = option["weights"].get(dim, 0) + int(rng.integers(-3, 4))
+    return bank
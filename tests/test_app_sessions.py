@@ -0,0 +1,154 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("streamlit.testing.v1")
+import streamlit as st  # noqa: E402
+import streamlit.web.server.websocket_headers as websocket_headers  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from nexus_apptest import APP_SCRIPT as APP, settle_widgets  # noqa: E402
+
+if tuple(int(part) for part in st.__version__.split(".")[:2]) < (1, 33):
+    pytest.skip("the app needs the Streamlit version pinned in requirements.txt", allow_module_level=True)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def app_dirs(tmp_path_factory):
+    """Point every store the app writes at a scratch directory; resources are cached per process"""
+    root = tmp_path_factory.mktemp("app")
+    env = {"NEXUS_SPILL_DIR": "spill", "NEXUS_DRAFTS_DB": "drafts.db", "NEXUS_HISTORY_DIR": "history",
+           "NEXUS_ITEM_STATS_DIR": "item_stats", "NEXUS_LATENCY_DIR": "latency",
+           "NEXUS_CORRELATION_DIR": "correlations", "NEXUS_SESSION_DB": "sessions.db",
+           "NEXUS_USER_HEADER": "X-Forwarded-User"}
+    saved = {key: os.environ.get(key) for key in env}
+    os.environ.update({key: str(root / value) if key != "NEXUS_USER_HEADER" else value
+                       for key, value in env.items()})
+    st.cache_resource.clear()
+    yield root
+    st.cache_resource.clear()
+    for key, value in saved.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+
+def signed_in(monkeypatch, user):
+    monkeypatch.setattr(websocket_headers, "_get_websocket_headers",
+                        lambda: {"X-Forwarded-User": user} if user else None)
+
+
+def button(at, label):
+    return next(b for b in at.button if b.label == label)
+
+
+def go_to(at, page):
+    settle_widgets(at)
+    at.sidebar.radio[0].set_value(page).run()
+    assert not at.exception
+
+
+def completed_session():
+    at = AppTest.from_file(APP, default_timeout=60).run()
+    button(at, "Start Your Assessment Journey").click().run()
+    go_to(at, "Assessment")
+    while True:
+        radio = next((r for r in at.radio if r.key and r.key.startswith("q_")), None)
+        if radio is None:
+            break
+        radio.set_value(1)
+        button(at, "Next →").click().run()
+    assert not at.exception
+    return at
+
+
+def test_anonymous_sessions_do_not_share_drafts(monkeypatch):
+    signed_in(monkeypatch, None)
+    first, second = completed_session(), completed_session()
+    assert first.session_state.user_id != second.session_state.user_id
+
+    go_to(first, "Improvement Plan")
+    first.text_area(key="timeline_short").input("Shadow a senior manager")
+    button(first, "Save Improvement Plan").click().run()
+    first.text_area(key="progress_notes").input("Finished week one").run()
+    button(first, "Save Progress Update").click().run()
+    assert [s.value for s in first.success]
+
+    go_to(second, "Improvement Plan")
+    assert all(not area.value for area in second.text_area)
+    assert not [e for e in second.expander if "Finished week one" in str(e)]
+    assert "Finished week one" not in [m.value for m in second.markdown]
+
+    # The first session still finds its own plan after leaving the page
+    go_to(first, "Results")
+    go_to(first, "Improvement Plan")
+    assert first.text_area(key="timeline_short").value == "Shadow a senior manager"
+
+
+def test_history_is_only_shown_to_the_verified_user(monkeypatch, app_dirs):
+    from nexus_engine import NexusInsightAssessment
+    from nexus_history import HistoryStore
+
+    history = HistoryStore(str(app_dirs / "history"), NexusInsightAssessment().dimension_keys)
+    for i in range(2):
+        history.append("carol", {d: 40.0 + 10 * i for d in history.dimension_keys}, time.time() - 86_400 * (30 - i))
+
+    signed_in(monkeypatch, None)
+    anonymous = completed_session()
+    go_to(anonymous, "Results")
+    assert "Progress Over Time" not in " ".join(m.value for m in anonymous.markdown)
+    assert not [t for t in anonymous.sidebar.text_input if t.label == "User ID"]
+
+    signed_in(monkeypatch, "carol")
+    carol = completed_session()
+    go_to(carol, "Results")
+    assert "Progress Over Time" in " ".join(m.value for m in carol.markdown)
+    assert len(history.read("carol")[0]) == 3
+
+
+def test_a_shared_session_link_does_not_hand_over_another_users_session(monkeypatch):
+    signed_in(monkeypatch, "alice")
+    alice = completed_session()
+    sid = alice.query_params["sid"][0]
+
+    signed_in(monkeypatch, "bob")
+    bob = AppTest.from_file(APP, default_timeout=60)
+    bob.query_params["sid"] = sid
+    bob.run()
+    assert not bob.exception
+    assert bob.session_state.user_id == "bob"
+    assert not bob.session_state.assessment_completed and not bob.session_state.responses
+    assert bob.query_params["sid"][0] != sid
+
+    # Alice's stored session is untouched by Bob's visit
+    signed_in(monkeypatch, "alice")
+    again = AppTest.from_file(APP, default_timeout=60)
+    again.query_params["sid"] = sid
+    again.run()
+    assert again.session_state.assessment_completed
+    assert again.session_state.responses == alice.session_state.responses
+
+
+def test_spilled_sessions_leave_the_plan_to_the_draft_store(monkeypatch, app_dirs):
+    from nexus_drafts import DraftStore
+
+    # With no memory budget every run spills the other idle sessions; drafts are written at once
+    monkeypatch.setenv("NEXUS_SESSION_BUDGET_MB", "0")
+    monkeypatch.setenv("NEXUS_DRAFT_DEBOUNCE", "0")
+    st.cache_resource.clear()
+    try:
+        signed_in(monkeypatch, None)
+        first = completed_session()
+        go_to(first, "Improvement Plan")
+        first.text_area(key="timeline_short").input("Shadow a senior manager").run()
+        assert "timeline_short" in first.session_state
+
+        completed_session()
+        assert "timeline_short" not in first.session_state
+        assert "responses" not in first.session_state
+        drafts = DraftStore(str(app_dirs / "drafts.db")).load(first.session_state.user_id)
+        assert drafts["timeline_short"] == "Shadow a senior manager"
+    finally:
+        st.cache_resource.clear()
@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+
+from nexus_archetypes import ArchetypeModel
+
+
+def clusters(engine, n=300, seed=31):
+    """Three well separated groups of profiles and the group of each"""
+    rng = np.random.default_rng(seed)
+    centres = np.full((3, len(engine.dimension_keys)), 50.0)
+    centres[0, 0], centres[1, 1], centres[2, :] = 90.0, 90.0, 15.0
+    groups = rng.integers(3, size=n)
+    return (centres[groups] + rng.normal(0, 3, (n, len(engine.dimension_keys)))).astype(np.float32), groups
+
+
+def test_streamed_fit_finds_the_groups(engine):
+    profiles, groups = clusters(engine)
+    model = ArchetypeModel.initialize(profiles, 3, engine.dimension_keys, seed=1)
+    model.fit_chunks(np.array_split(profiles, 7), epochs=2)
+
+    labels = model.assign(profiles)
+    # Every group lands on one centroid of its own, at the group's mean
+    assert len({(g, l) for g, l in zip(groups, labels)}) == 3
+    for group in range(3):
+        centroid = model.centroids[labels[groups == group][0]]
+        np.testing.assert_allclose(centroid, profiles[groups == group].mean(axis=0), atol=1.0)
+    assert model.counts.sum() == 2 * len(profiles)
+
+
+def test_one_centroid_is_the_running_mean(engine):
+    profiles, _ = clusters(engine, n=100)
+    model = ArchetypeModel(profiles[:1].copy(), engine.dimension_keys)
+    model.fit_chunks(np.array_split(profiles, 4))
+    np.testing.assert_allclose(model.centroids[0], profiles.mean(axis=0), atol=1e-3)
+
+
+def test_labels_and_describe(engine):
+    profiles, _ = clusters(engine)
+    model = ArchetypeModel.initialize(profiles, 3, engine.dimension_keys, seed=1).fit_chunks([profiles])
+    model.label(engine.dimensions)
+    assert len(set(model.names)) == 3
+    first = engine.dimensions[engine.dimension_keys[0]]
+    assert any(name.startswith(f"Strong {first}") for name in model.names)
+
+    scores = dict(zip(engine.dimension_keys, profiles[0].tolist()))
+    described = model.describe(scores)
+    assert described["id"] == int(model.assign(profiles[:1])[0])
+    assert described["name"] == model.names[described["id"]]
+    assert described["distance"] == round(float(np.linalg.norm(profiles[0] - model.centroids[described["id"]])), 2)
+
+
+def test_refresh_returns_a_new_model_only_when_the_file_changes(engine, tmp_path):
+    profiles, _ = clusters(engine)
+    path = str(tmp_path / "archetypes.npz")
+    model = ArchetypeModel.initialize(profiles, 3, engine.dimension_keys, seed=1)
+    model.save(path)
+    live = ArchetypeModel.load(path)
+    assert live.refresh() is live
+
+    model.partial_fit(profiles)
+    model.version = 2
+    model.save(path)
+    # Make sure the rewrite is visible even where mtimes are coarse
+    os.utime(path, ns=(live._mtime + 1_000_000, live._mtime + 1_000_000))
+    fresh = live.refresh()
+    assert fresh is not live and fresh.version == 2
+    np.testing.assert_allclose(fresh.centroids, model.centroids)
+    assert live.version == 0 and not live.counts.any()
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from conftest import edited_bank, random_choices
+from nexus_archive import MISSING_TIME, ArchiveReader, ArchiveWriter
+from nexus_engine import NexusInsightAssessment
+
+
+def test_archive_round_trip(engine, tmp_path):
+    choices = random_choices(engine, 1000, seed=5)
+    rng = np.random.default_rng(5)
+    times = 1_700_000_000_000 + np.cumsum(rng.integers(1, 60_000, size=choices.shape), axis=1)
+    times[choices < 0] = MISSING_TIME
+    path = str(tmp_path / "cohort.nxa")
+    with ArchiveWriter(path, engine, chunk_rows=128) as writer:
+        writer.append_matrix(choices[:300], times[:300])
+        writer.append_matrix(choices[300:], times[300:])
+
+    with ArchiveReader(path, engine) as reader:
+        assert len(reader) == len(choices) and reader.n_chunks == 8
+        np.testing.assert_array_equal(reader.choices(), choices)
+        row_choices, row_times = reader.row(777)
+        np.testing.assert_array_equal(row_choices, choices[777])
+        np.testing.assert_array_equal(row_times, times[777])
+        responses = reader.responses(5)
+        assert {int(q): r["selected_option"] for q, r in responses.items()} == \
+            {q["id"]: int(c) for q, c in zip(engine.questions, choices[5]) if c >= 0}
+
+
+def test_archive_without_times_and_with_every_answer(engine, tmp_path):
+    choices = random_choices(engine, 50, seed=6, skip=0)
+    path = str(tmp_path / "full.nxa")
+    with ArchiveWriter(path, engine) as writer:
+        for row in choices:
+            writer.append_matrix(row[None, :])
+    with ArchiveReader(path) as reader:
+        decoded, times = reader.read_chunk(0)
+        np.testing.assert_array_equal(decoded, choices)
+        assert times is None
+
+
+def test_archive_refuses_another_bank(engine, tmp_path):
+    path = str(tmp_path / "cohort.nxa")
+    with ArchiveWriter(path, engine) as writer:
+        writer.append_matrix(random_choices(engine, 5))
+    with pytest.raises(ValueError):
+        ArchiveReader(path, NexusInsightAssessment(questions=edited_bank(engine)))
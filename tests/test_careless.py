@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from conftest import random_choices
+from nexus_careless import CarelessMonitor, centered_weights, detect_careless
+
+
+def answer_times(n, seconds=10.0):
+    start = datetime(2024, 1, 1, 9)
+    return start, [(start + timedelta(seconds=seconds * (i + 1))).isoformat() for i in range(n)]
+
+
+def test_monitor_matches_batch_detection(engine):
+    centered = centered_weights(engine)
+    row = random_choices(engine, 1, seed=9, skip=0)[0]
+    start, stamps = answer_times(len(row))
+    monitor = CarelessMonitor(centered, start.isoformat())
+    for qi, (option, stamp) in enumerate(zip(row, stamps)):
+        monitor.update(qi, int(option), stamp)
+    batch = detect_careless(row[None, :], np.full((1, len(row)), 10.0, dtype=np.float32), centered)
+    flags = monitor.flags()
+    assert flags["coherence"] == round(float(batch["coherence"][0]), 3)
+    for name in ("speeder", "straight_liner", "random_clicker"):
+        assert flags[name] == bool(batch[name][0])
+
+
+def test_revisited_answer_replaces_the_earlier_one(engine):
+    centered = centered_weights(engine)
+    n = len(engine.questions)
+    start, stamps = answer_times(n)
+    monitor = CarelessMonitor(centered, start.isoformat())
+    for qi in range(n):
+        monitor.update(qi, 0, stamps[qi])
+    assert monitor.flags()["straight_liner"]
+
+    # Going back and changing one answer, quickly
+    final = np.zeros(n, dtype=np.int8)
+    final[2] = 1
+    monitor.update(2, 1, (datetime.fromisoformat(stamps[-1]) + timedelta(seconds=1)).isoformat(), previous_option=0)
+    batch = detect_careless(final[None, :], np.full((1, n), 10.0, dtype=np.float32), centered)
+    flags = monitor.flags()
+    assert monitor.n_answers == n and monitor.n_fast == 0
+    assert not flags["straight_liner"]
+    assert flags["coherence"] == round(float(batch["coherence"][0]), 3)
+
+    restored = CarelessMonitor.from_state(centered, monitor.to_state())
+    assert restored.flags() == flags
@@ -0,0 +1,69 @@
+import json
+import os
+
+import numpy as np
+
+from nexus_catalog import ActionCatalog, synthetic_actions
+
+DIMS = ["LD", "CT", "Psy"]
+
+
+def action(id, dims, rating, minutes, level=""):
+    return {"id": id, "title": f"Course {id}", "dimensions": dims, "level": level,
+            "duration_minutes": minutes, "rating": rating}
+
+
+def write(path, actions):
+    with open(path, "w") as f:
+        f.write("\n".join(json.dumps(a) for a in actions))
+
+
+def test_actions_rank_by_rating_then_duration_then_file_order():
+    catalog = ActionCatalog([action("a", "LD", 4.0, 60), action("b", "LD", 4.5, 90), action("c", "LD", 4.0, 30),
+                             action("d", "LD", 4.0, 30), action("e", "LD", 5.0, 10, level="High")], DIMS)
+    assert [a["id"] for a in catalog.search(dimension="LD")] == ["e", "b", "c", "d", "a"]
+    assert [a["id"] for a in catalog.search(dimension="LD", level="Low")] == ["b", "c", "d", "a"]
+    assert [a["id"] for a in catalog.search(dimension="LD", max_minutes=45)] == ["e", "c", "d"]
+    assert catalog.titles("LD", 85, k=1) == ["Course e"]
+
+
+def test_recommend_interleaves_weakest_dimensions_first():
+    catalog = ActionCatalog([action("ld1", "LD", 5, 10), action("ld2", "LD", 4, 10), action("ct1", "CT", 5, 10),
+                             action("ct2", "CT", 4, 10), action("both", "LD;CT", 3, 10),
+                             action("psy", "Psy", 5, 10)], DIMS)
+    picks = catalog.recommend({"LD": 50, "CT": 20, "Psy": 90}, k=5, areas=2)
+    assert [a["id"] for a in picks] == ["ct1", "ld1", "ct2", "ld2", "both"]
+    assert [a["for_dimension"] for a in picks] == ["CT", "LD", "CT", "LD", "CT"]
+
+
+def test_recommend_batch_matches_recommend():
+    catalog = ActionCatalog(synthetic_actions(2_000, DIMS, seed=3), DIMS)
+    scores = np.random.default_rng(4).integers(0, 101, (300, len(DIMS))).astype(np.float32)
+    for max_minutes in (None, 120):
+        table = catalog.recommend_batch(scores, k=6, areas=2, max_minutes=max_minutes)
+        for row, positions in zip(scores, table):
+            expected = catalog.recommend(dict(zip(DIMS, row.tolist())), k=6, areas=2, max_minutes=max_minutes)
+            assert [a["id"] for a in catalog.actions(positions)] == [a["id"] for a in expected]
+
+
+def test_refresh_reloads_and_keeps_the_index_on_a_bad_or_missing_file(tmp_path):
+    path = str(tmp_path / "catalog.jsonl")
+    write(path, [action("a", "LD", 4, 30)])
+    catalog = ActionCatalog.load(path, DIMS)
+
+    write(path, [action("a", "LD", 4, 30), action("b", "CT", 5, 20)])
+    os.utime(path, ns=(0, 10**18))
+    assert len(catalog.refresh()) == 2 and catalog.version == 2
+
+    write(path, [action("c", "Nope", 4, 30)])
+    os.utime(path, ns=(0, 2 * 10**18))
+    assert len(catalog.refresh()) == 2 and "unknown: Nope" in catalog.last_error
+
+    os.remove(path)
+    assert len(catalog.refresh()) == 2 and catalog.last_error
+    assert [a["id"] for a in catalog.search(dimension="CT")] == ["b"]
+
+    write(path, [action("d", "Psy", 4, 30)])
+    os.utime(path, ns=(0, 3 * 10**18))
+    assert [a["id"] for a in catalog.refresh().search()] == ["d"]
+    assert catalog.last_error is None and catalog.version == 3
@@ -0,0 +1,31 @@
+import numpy as np
+
+from nexus_cohort import DEFAULT_PROFILES, CohortGenerator
+
+
+def test_generated_shapes_and_valid_choices(engine):
+    chunk = CohortGenerator(engine, seed=51).generate(2_000, first_id=10)
+    n_questions, n_dims = len(engine.questions), len(engine.dimension_keys)
+    assert chunk["respondent_id"].tolist() == list(range(10, 2_010))
+    assert chunk["profile"].shape == (2_000,) and chunk["latent"].shape == (2_000, n_dims)
+    assert chunk["choices"].shape == chunk["response_times"].shape == (2_000, n_questions)
+    assert chunk["choices"].dtype == np.int8 and chunk["response_times"].dtype == np.float32
+
+    rows = np.arange(n_questions)[None, :]
+    assert engine.option_mask[rows, chunk["choices"]].all()
+    assert (chunk["response_times"] > 0).all()
+    shares = np.bincount(chunk["profile"], minlength=len(DEFAULT_PROFILES)) / 2_000
+    np.testing.assert_allclose(shares, [p["share"] for p in DEFAULT_PROFILES], atol=0.04)
+
+
+def test_same_seed_same_cohort(engine):
+    first = list(CohortGenerator(engine, seed=52).iter_chunks(1_000, chunk_size=300))
+    again = list(CohortGenerator(engine, seed=52).iter_chunks(1_000, chunk_size=300))
+    other = CohortGenerator(engine, seed=53).generate(300)
+
+    assert [len(c["respondent_id"]) for c in first] == [300, 300, 300, 100]
+    assert np.concatenate([c["respondent_id"] for c in first]).tolist() == list(range(1_000))
+    for a, b in zip(first, again):
+        for key in a:
+            np.testing.assert_array_equal(a[key], b[key])
+    assert not np.array_equal(first[0]["choices"], other["choices"])
@@ -0,0 +1,34 @@
+import os
+import socket
+
+import numpy as np
+
+from conftest import random_choices
+from nexus_correlations import CorrelationAggregator, CovarianceState, merge_shards
+
+
+def test_aggregator_publishes_only_when_asked(engine, tmp_path):
+    choices = random_choices(engine, 30, seed=8)
+    manual = CorrelationAggregator(engine, directory=str(tmp_path / "manual"), min_samples=10, tolerance=0.0)
+    assert all(manual.record(row) is None for row in choices)
+    assert manual.registry.versions() == []
+    assert manual.derive() is not None
+    assert manual.registry.versions() == [1]
+
+    auto = CorrelationAggregator(engine, directory=str(tmp_path / "auto"), derive_every=15, min_samples=10,
+                                 tolerance=0.0)
+    published = [auto.record(row) for row in choices]
+    assert published[14] is not None and published[14].version == 1
+
+
+def test_shards_of_another_bank_are_skipped(engine, tmp_path):
+    stale = CovarianceState(len(engine.dimension_keys))
+    stale.add_batch(np.full((5, len(engine.dimension_keys)), 90.0))
+    stale.save(str(tmp_path / "otherhost-1.npz"), "old-bank")
+    stale.save(os.path.join(str(tmp_path), f"{socket.gethostname()}-{os.getpid()}.npz"), "old-bank")
+
+    aggregator = CorrelationAggregator(engine, directory=str(tmp_path), derive_every=3, min_samples=2)
+    for row in random_choices(engine, 3, seed=9):
+        aggregator.record(row)
+    assert aggregator.merged().n == 3
+    assert merge_shards(str(tmp_path), aggregator.fingerprint, len(engine.dimension_keys)).n == 3
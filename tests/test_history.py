@@ -0,0 +1,19 @@
+import numpy as np
+
+from conftest import random_choices
+from nexus_history import HistoryStore
+
+
+def test_history_round_trip_records_adjustment_versions(engine, tmp_path):
+    store = HistoryStore(str(tmp_path), engine.dimension_keys)
+    scores = engine.score_matrix(random_choices(engine, 20, seed=7))
+    versions = ["fixed"] * 10 + [3] * 9 + [None]
+    for i, (row, version) in enumerate(zip(scores, versions)):
+        store.append("alice", dict(zip(engine.dimension_keys, row)), timestamp=1_700_000_000 + i * 86_400,
+                     adjustment_version=version)
+
+    timestamps, stored = store.read("alice")
+    assert len(timestamps) == 20
+    np.testing.assert_allclose(stored, scores, atol=0.25 + 1e-6)
+    assert store.trajectory("alice")["adjustments"] == versions
+
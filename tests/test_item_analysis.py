@@ -0,0 +1,49 @@
+import os
+import socket
+
+import numpy as np
+
+from conftest import edited_bank, random_choices
+from nexus_engine import NexusInsightAssessment
+from nexus_item_analysis import ItemStats, ItemStatsAggregator
+
+
+def test_merged_batches_match_one_pass(engine):
+    choices = random_choices(engine, 600, seed=11)
+    whole = ItemStats(engine)
+    whole.add_batch(choices)
+    parts = ItemStats(engine)
+    for block in np.array_split(choices, 3):
+        shard = ItemStats(engine)
+        shard.add_batch(block, chunk_size=70)
+        parts.merge(shard)
+    one_by_one = ItemStats(engine)
+    for row in choices[:50]:
+        one_by_one.add(row)
+    head = ItemStats(engine)
+    head.add_batch(choices[:50])
+
+    assert parts.n == whole.n
+    np.testing.assert_array_equal(parts.option_counts, whole.option_counts)
+    np.testing.assert_allclose(parts.cross, whole.cross)
+    np.testing.assert_allclose(parts.cronbach_alpha(), whole.cronbach_alpha(), equal_nan=True)
+    np.testing.assert_allclose(parts.item_rest_correlations(), whole.item_rest_correlations(), equal_nan=True)
+    np.testing.assert_allclose(one_by_one.cross, head.cross)
+
+
+def test_aggregator_skips_shards_of_another_bank(engine, tmp_path):
+    old_engine = NexusInsightAssessment(questions=edited_bank(engine, seed=12))
+    stale = ItemStats(old_engine)
+    stale.add_batch(random_choices(engine, 40, seed=13))
+    stale.save(str(tmp_path / "otherhost-1.npz"))
+    # This process's own shard name, left over from before the bank edit
+    stale.save(os.path.join(str(tmp_path), f"{socket.gethostname()}-{os.getpid()}.npz"))
+    current = ItemStats(engine)
+    current.add_batch(random_choices(engine, 25, seed=14, skip=0))
+    current.save(str(tmp_path / "otherhost-2.npz"))
+
+    aggregator = ItemStatsAggregator(engine, directory=str(tmp_path))
+    aggregator.record(random_choices(engine, 1, seed=15, skip=0)[0])
+    assert aggregator.merged().n == 26
+    aggregator.flush()
+    assert ItemStats.read_fingerprint(aggregator.shard_path) == current.fingerprint
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from nexus_latency import LatencyAggregator, LatencyHistogram
+
+
+def test_histograms_from_different_banks_do_not_merge(tmp_path):
+    a = LatencyHistogram(3, 4, fingerprint="bank-a")
+    a.add(0, 1, 5.0)
+    path = str(tmp_path / "a.npz")
+    a.save(path)
+    assert LatencyHistogram.read_fingerprint(path) == "bank-a"
+    assert LatencyHistogram.load(path, "bank-a").total == 1
+    with pytest.raises(ValueError):
+        LatencyHistogram.load(path, "bank-b")
+    with pytest.raises(ValueError):
+        LatencyHistogram(3, 4, fingerprint="bank-b").merge(a)
+
+
+def test_aggregator_skips_shards_of_another_bank(tmp_path):
+    stale = LatencyHistogram(3, 4, fingerprint="old")
+    stale.add(0, 0, 2.0)
+    stale.save(str(tmp_path / "otherhost-1.npz"))
+    current = LatencyHistogram(3, 4, fingerprint="new")
+    current.add(1, 2, 8.0)
+    current.save(str(tmp_path / "otherhost-2.npz"))
+
+    aggregator = LatencyAggregator(3, 4, directory=str(tmp_path), fingerprint="new")
+    aggregator.record(2, 3, 4.0)
+    merged = aggregator.merged()
+    assert merged.total == 2
+    assert merged.counts[0].sum() == 0
+    assert np.array_equal(merged.counts.sum(axis=2).nonzero(), ([1, 2], [2, 3]))
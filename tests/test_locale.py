@@ -0,0 +1,45 @@
+import struct
+
+import pytest
+
+from nexus_locale import MAGIC, LocaleCatalog, build_catalog, source_strings, string_keys
+
+
+def test_catalog_format_and_lookups(engine, tmp_path):
+    questions = engine.questions
+    first, second = questions[0], questions[1]
+    translations = {"de": {f"q{first['id']}.text": "Frage eins", f"q{first['id']}.option0": "Möglichkeit A",
+                           "q9999.text": "unbekannt"}}
+    path = str(tmp_path / "catalog.nxl")
+    report = build_catalog(path, questions, translations)
+    assert report["de"]["unknown"] == ["q9999.text"]
+    assert f"q{second['id']}.text" in report["de"]["missing"]
+
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data[:4] == MAGIC
+    (header_len,) = struct.unpack_from("<I", data, 4)
+    catalog = LocaleCatalog(path, questions)
+    assert catalog.keys == string_keys(questions)
+    assert catalog.locales == ["en", "de"]
+    for locale in catalog.locales:
+        assert catalog.header["locales"][locale]["offset"] % 4 == 0
+        assert catalog.header["locales"][locale]["offset"] >= 8 + header_len
+
+    # Every source string round-trips
+    assert {key: catalog.text("en", key) for key in catalog.keys} == source_strings(questions)
+    assert catalog.question_text("de", first) == "Frage eins"
+    assert catalog.option_texts("de", first) == ["Möglichkeit A"] + [o["text"] for o in first["options"][1:]]
+    # Untranslated strings fall back to the source locale
+    assert catalog.question_text("de", second) == second["text"]
+    assert catalog.creative_elements("de", second) == second.get("creative_elements", [])
+    catalog.close()
+
+
+def test_catalog_rejects_another_bank_structure(engine, tmp_path):
+    path = str(tmp_path / "catalog.nxl")
+    build_catalog(path, engine.questions, {})
+    with pytest.raises(ValueError):
+        LocaleCatalog(path, engine.questions[:-1])
+    with pytest.raises(ValueError):
+        LocaleCatalog(path).table("fr")
@@ -0,0 +1,59 @@
+import numpy as np
+
+from nexus_mentor import ProfileIndex
+
+DIMS = ["Psy", "CT", "LT", "LD", "Cog", "TR"]
+
+
+def build(n=3_000, seed=21):
+    rng = np.random.default_rng(seed)
+    vectors = rng.uniform(0, 100, (n, len(DIMS))).astype(np.float32)
+    is_mentor = rng.random(n) < 0.3
+    index = ProfileIndex(DIMS, capacity=16)
+    for start in range(0, n, 700):
+        index.add([f"p{i}" for i in range(start, min(start + 700, n))], vectors[start:start + 700],
+                  {"is_mentor": is_mentor[start:start + 700]})
+    return index, vectors, is_mentor
+
+
+def test_similar_and_complementary_match_brute_force(monkeypatch):
+    monkeypatch.setattr("nexus_mentor.BLOCK_ROWS", 512)
+    index, vectors, is_mentor = build()
+    scores = dict(zip(DIMS, [35.0, 80.0, 60.0, 20.0, 70.0, 45.0]))
+    query = np.array([scores[d] for d in DIMS])
+    excluded = ["p3", "p10", "nobody", 17]
+    allowed = is_mentor & (vectors[:, DIMS.index("CT")] >= 50)
+    allowed[[3, 10]] = False
+
+    hits = index.similar(scores, k=7, where={"is_mentor": True}, min_scores={"CT": 50}, exclude_ids=excluded)
+    distances = np.where(allowed, np.linalg.norm(vectors - query, axis=1), np.inf)
+    expected = np.argsort(distances, kind="stable")[:7]
+    assert [h["id"] for h in hits] == [f"p{i}" for i in expected]
+    np.testing.assert_allclose([h["distance"] for h in hits], distances[expected], rtol=1e-4)
+
+    hits = index.complementary(scores, ["LD", "Psy"], k=7, where={"is_mentor": True}, min_scores={"CT": 50},
+                               exclude_ids=excluded)
+    weights = np.full(len(DIMS), 0.1)
+    weights[DIMS.index("LD")], weights[DIMS.index("Psy")] = 0.8, 0.65
+    strength = np.where(allowed, vectors @ (weights / weights.sum()), -np.inf)
+    expected = np.argsort(-strength, kind="stable")[:7]
+    assert [h["id"] for h in hits] == [f"p{i}" for i in expected]
+
+
+def test_added_profiles_survive_a_reload_and_a_save(tmp_path):
+    index, _, _ = build(n=50)
+    path = str(tmp_path / "mentors.npz")
+    index.save(path)
+
+    loaded = ProfileIndex.load(path)
+    loaded.add_scores("alice@1", dict.fromkeys(DIMS, 99.0))
+    loaded.add_scores("bob@2", dict.fromkeys(DIMS, 1.0), is_mentor=True)
+    reloaded = ProfileIndex.load(path)
+    assert len(reloaded) == 52
+    assert reloaded.row("alice@1") == 50 and reloaded.row("missing") is None
+    assert bool(reloaded.attributes["is_mentor"][51]) and not reloaded.attributes["is_mentor"][50]
+    assert reloaded.similar(dict.fromkeys(DIMS, 98.0), k=1)[0]["id"] == "alice@1"
+
+    reloaded.save(path)
+    assert not (tmp_path / "mentors.npz.journal").exists()
+    assert len(ProfileIndex.load(path)) == 52
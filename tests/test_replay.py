@@ -0,0 +1,80 @@
+import os
+import struct
+
+from nexus_apptest import STORES, scratch_stores
+from nexus_replay import MAGIC, EventLog, read_header, read_log
+
+
+def test_event_log_format(tmp_path):
+    log = EventLog(str(tmp_path))
+    session = "ab12cd34"
+    started = 1_700_000_000.0
+    log.record(session, started, 0.25)
+    log.record(session, started + 2.5, 0.5, {"set": {"page": "Assessment"}, "click": []})
+    log.record(session, started + 3.0, 0.125)  # st.rerun() after the interaction
+    log.record(session, started + 7.0, 0.1, {"set": {}, "click": [["Next →", {}]]})
+
+    path = log.path(session)
+    assert path.endswith(f"{session[:2]}/{session}.nxe")
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data[:4] == MAGIC
+    (length,) = struct.unpack_from("<H", data, 4)
+    assert read_header(path) == {"started": started}
+    offset_ms, run_us, size = struct.unpack_from("<IIH", data, 6 + length)
+    assert (offset_ms, run_us, size) == (0, 250_000, 0)
+
+    header, interactions = read_log(path)
+    assert header["started"] == started
+    assert [i["t"] for i in interactions] == [0.0, 2.5, 7.0]
+    assert interactions[1]["set"] == {"page": "Assessment"}
+    assert abs(interactions[1]["recorded_s"] - 0.625) < 1e-6
+    assert interactions[2]["click"] == [["Next →", {}]]
+
+
+def test_torn_final_record_is_ignored(tmp_path):
+    log = EventLog(str(tmp_path))
+    log.record("session1", 100.0, 0.1, {"set": {"page": "Home"}, "click": []})
+    with open(log.path("session1"), "ab") as f:
+        f.write(struct.pack("<IIH", 10, 10, 500) + b'{"set"')
+    _, interactions = read_log(log.path("session1"))
+    assert len(interactions) == 1
+
+
+def test_a_new_process_keeps_the_session_start(tmp_path):
+    EventLog(str(tmp_path)).record("session2", 100.0, 0.1)
+    EventLog(str(tmp_path)).record("session2", 104.0, 0.1, {"set": {"page": "Results"}, "click": []})
+    _, interactions = read_log(EventLog(str(tmp_path)).path("session2"))
+    assert [i["t"] for i in interactions] == [0.0, 4.0]
+
+
+def test_free_text_is_logged_as_a_same_length_placeholder(tmp_path):
+    log = EventLog(str(tmp_path), redact=("goal_", "progress_notes"))
+    log.record("session3", 100.0, 0.1, {"set": {"goal_LD": "Lead the Q3 launch", "page": "Improvement Plan"},
+                                        "click": [["Save Progress Update", {"progress_notes": "Met my mentor"}]]})
+    with open(log.path("session3"), "rb") as f:
+        data = f.read()
+    assert b"Q3 launch" not in data and b"mentor" not in data
+    _, interactions = read_log(log.path("session3"))
+    assert interactions[0]["set"] == {"goal_LD": "x" * 18, "page": "Improvement Plan"}
+    assert interactions[0]["click"] == [["Save Progress Update", {"progress_notes": "x" * 13}]]
+
+
+def test_scratch_stores_redirect_the_app_and_restore_the_environment(tmp_path, monkeypatch):
+    live = tmp_path / "live"
+    (live / "correlations" / "adjustments").mkdir(parents=True)
+    (live / "correlations" / "adjustments" / "v000001.json").write_text("{}")
+    monkeypatch.setenv("NEXUS_CORRELATION_DIR", str(live / "correlations"))
+    monkeypatch.setenv("NEXUS_EVENT_LOG", str(live / "events"))
+    monkeypatch.setenv("NEXUS_SESSION_DB", str(live / "sessions.db"))
+    monkeypatch.delenv("NEXUS_HISTORY_DIR", raising=False)
+
+    with scratch_stores() as root:
+        assert "NEXUS_EVENT_LOG" not in os.environ
+        for key in (*STORES, "NEXUS_SESSION_DB"):
+            assert os.environ[key].startswith(root)
+        assert os.listdir(os.path.join(os.environ["NEXUS_CORRELATION_DIR"], "adjustments")) == ["v000001.json"]
+
+    assert os.environ["NEXUS_CORRELATION_DIR"] == str(live / "correlations")
+    assert os.environ["NEXUS_EVENT_LOG"] == str(live / "events")
+    assert "NEXUS_HISTORY_DIR" not in os.environ
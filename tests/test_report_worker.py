@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from conftest import random_choices, to_responses
+from nexus_report_worker import ReportWorker, compute_report
+
+
+def wait_for(worker, job_id, *statuses):
+    deadline = time.monotonic() + 10
+    while worker.status(job_id) not in statuses:
+        assert time.monotonic() < deadline, worker.status(job_id)
+        time.sleep(0.001)
+
+
+def wait_until_finished(worker, *job_ids):
+    for job_id in job_ids:
+        wait_for(worker, job_id, "done", "failed")
+
+
+def test_full_queue_refuses_jobs_until_a_slot_frees():
+    worker = ReportWorker(max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        assert worker.submit("a", release.wait, 10)
+        wait_for(worker, "a", "running")
+        assert worker.submit("b", lambda: "b")
+        assert not worker.submit("c", lambda: "c")
+        metrics = worker.metrics()
+        assert (metrics["running"], metrics["queued"], metrics["rejected"]) == (1, 1, 1)
+        assert worker.status("b") == "queued" and worker.pop("b") is None
+
+        release.set()
+        wait_until_finished(worker, "a", "b")
+        assert worker.pop("a") is True and worker.pop("b") == "b"
+        assert worker.status("a") == "unknown"
+        # Slots are given back just after the status changes
+        assert worker.submit("c", lambda: "c", block_seconds=10)
+        wait_until_finished(worker, "c")
+        assert worker.metrics()["completed"] == 3
+    finally:
+        release.set()
+        worker.shutdown()
+
+
+def test_failed_job_reraises_so_the_caller_can_compute_inline(engine):
+    worker = ReportWorker(max_workers=1)
+    try:
+        assert worker.submit("bad", compute_report, engine, None, "carol")
+        wait_until_finished(worker, "bad")
+        assert worker.status("bad") == "failed"
+        with pytest.raises(Exception):
+            worker.pop("bad")
+        assert worker.metrics()["failed"] == 1
+
+        responses = to_responses(engine, random_choices(engine, 1, seed=41)[0])
+        assert worker.submit("good", compute_report, engine, responses, "carol")
+        wait_until_finished(worker, "good")
+        inline = compute_report(engine, responses, "carol")
+        background = worker.pop("good")
+        assert background["scores"] == inline["scores"] == engine.calculate_dimension_scores(responses)
+        assert background["recommendations"] == inline["recommendations"]
+    finally:
+        worker.shutdown()
+
+
+def test_uncollected_results_expire():
+    worker = ReportWorker(max_workers=1, result_ttl=0.0)
+    try:
+        assert worker.submit("old", lambda: "old")
+        wait_until_finished(worker, "old")
+        assert worker.status("old") == "done"
+        # Expiry runs on the next submission
+        assert worker.submit("new", lambda: "new")
+        assert worker.status("old") == "unknown" and worker.pop("old") is None
+    finally:
+        worker.shutdown()
@@ -0,0 +1,11 @@
+from nexus_reports import safe_filename
+
+
+def test_safe_filenames_are_distinct_and_stable():
+    ids = ["a/b", "a_b", "a b", "a?b", "../etc/passwd", "x" * 300]
+    names = [safe_filename(i) for i in ids]
+    assert len(set(names)) == len(ids)
+    assert names == [safe_filename(i) for i in ids]
+    for name in names:
+        assert "/" not in name and len(name) <= 111
+    assert safe_filename("candidate-0000042").startswith("candidate-0000042-")
@@ -0,0 +1,106 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import edited_bank, random_choices
+from nexus_correlations import AdjustmentRegistry, AdjustmentSet
+from nexus_engine import NexusInsightAssessment
+from nexus_rescoring import ScoreStore, delta_rescore, full_rescore
+
+
+@pytest.mark.parametrize("chunk_size", [64, 2_000_000])
+def test_delta_rescore_matches_full_rescore(engine, tmp_path, chunk_size):
+    choices = random_choices(engine, 500, seed=3)
+    new_engine = NexusInsightAssessment(questions=edited_bank(engine, seed=4))
+    delta = ScoreStore.create(str(tmp_path / "delta"), engine, choices)
+    full = ScoreStore.create(str(tmp_path / "full"), engine, choices)
+
+    result = delta_rescore(delta, new_engine, chunk_size=chunk_size)
+    full_rescore(full, new_engine)
+
+    assert 0 < result["rows_updated"] <= len(choices)
+    for name in ("totals", "lower", "upper"):
+        np.testing.assert_allclose(getattr(delta, name), getattr(full, name), atol=1e-4)
+    np.testing.assert_allclose(delta.scores, full.scores, atol=1e-3)
+    np.testing.assert_allclose(delta.scores, new_engine.score_matrix(choices), atol=1e-3)
+    assert ScoreStore(str(tmp_path / "delta")).bank == new_engine.questions
+
+
+def test_delta_rescore_rejects_structural_changes(engine, tmp_path):
+    store = ScoreStore.create(str(tmp_path / "store"), engine, random_choices(engine, 10))
+    with pytest.raises(ValueError):
+        delta_rescore(store, NexusInsightAssessment(questions=engine.questions[:-1]))
+
+
+def test_delta_rescore_renormalizes_every_row_when_adjustments_change(engine, tmp_path):
+    choices = random_choices(engine, 200, seed=5)
+    store = ScoreStore.create(str(tmp_path / "store"), engine, choices)
+    assert store.adjustment_version == "fixed"
+
+    new_engine = NexusInsightAssessment(questions=edited_bank(engine, seed=6))
+    n_dims = len(engine.dimension_keys)
+    new_engine.correlation_adjustments = AdjustmentRegistry(str(tmp_path / "adjustments"), "bank")
+    new_engine.correlation_adjustments.publish(AdjustmentSet(np.eye(n_dims) * 0.9, np.full(n_dims, 5.0),
+                                                             np.full(n_dims, 50.0), fingerprint="bank"))
+
+    result = delta_rescore(store, new_engine, chunk_size=64)
+
+    assert result["adjustments"] == 1
+    assert result["rows_updated"] == len(choices)
+    np.testing.assert_allclose(store.scores, new_engine.score_matrix(choices), atol=1e-3)
+    assert ScoreStore(str(tmp_path / "store")).adjustment_version == 1
+
+
+class Crash(Exception):
+    pass
+
+
+@pytest.mark.parametrize("crash_at", ["write", "pending"])
+def test_an_interrupted_delta_rescore_finishes_when_run_again(engine, tmp_path, monkeypatch, crash_at):
+    choices = random_choices(engine, 400, seed=7)
+    new_engine = NexusInsightAssessment(questions=edited_bank(engine, seed=8))
+    directory = str(tmp_path / "store")
+    ScoreStore.create(directory, engine, choices)
+    store = ScoreStore(directory)
+
+    calls = []
+    if crash_at == "write":
+        # Dies part-way through writing the second chunk: totals written, bounds and scores not
+        original = ScoreStore.replay_redo
+
+        def replay_redo(self, digest):
+            if os.path.exists(os.path.join(directory, "redo.npz")):
+                calls.append(1)
+                if len(calls) == 2:
+                    with np.load(os.path.join(directory, "redo.npz")) as redo:
+                        self.totals[redo["rows"]] = redo["totals"]
+                    raise Crash()
+            original(self, digest)
+
+        monkeypatch.setattr(ScoreStore, "replay_redo", replay_redo)
+    else:
+        # Dies after the third chunk is written but before its progress is recorded
+        original = ScoreStore.save_pending
+
+        def save_pending(self, digest, next_row):
+            calls.append(next_row)
+            if len(calls) == 4:
+                raise Crash()
+            original(self, digest, next_row)
+
+        monkeypatch.setattr(ScoreStore, "save_pending", save_pending)
+
+    with pytest.raises(Crash):
+        delta_rescore(store, new_engine, chunk_size=100)
+    monkeypatch.undo()
+    assert ScoreStore(directory).bank == engine.questions
+
+    with pytest.raises(ValueError):
+        delta_rescore(ScoreStore(directory), NexusInsightAssessment(questions=edited_bank(engine, seed=9)))
+    delta_rescore(ScoreStore(directory), new_engine, chunk_size=100)
+
+    resumed = ScoreStore(directory)
+    assert resumed.bank == new_engine.questions and resumed.pending() is None
+    np.testing.assert_allclose(resumed.totals, new_engine.raw_dimension_totals(choices)[0], atol=1e-4)
+    np.testing.assert_allclose(resumed.scores, new_engine.score_matrix(choices), atol=1e-3)
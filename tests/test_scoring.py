@@ -0,0 +1,65 @@
+import numpy as np
+
+from conftest import edited_bank, random_choices, to_responses
+from nexus_engine import NexusInsightAssessment
+from nexus_whatif import WhatIfSimulator
+
+
+def score_dict_matrix(engine, choices):
+    return np.array([[engine.calculate_dimension_scores(to_responses(engine, row))[d]
+                      for d in engine.dimension_keys] for row in choices])
+
+
+def test_batch_scores_match_calculate_dimension_scores(engine):
+    choices = random_choices(engine, 200)
+    choices[0] = -1  # nothing answered
+    choices[1, 1:] = -1  # a single answer
+    np.testing.assert_allclose(engine.score_matrix(choices), score_dict_matrix(engine, choices), atol=1e-3)
+
+
+def test_score_variants_match_engines_built_with_each_bank(engine):
+    choices = random_choices(engine, 300, seed=1)
+    banks = [edited_bank(engine, seed=s, questions=5) for s in range(3)]
+    weights = np.stack([engine.weight_tensor] + [NexusInsightAssessment(questions=b).weight_tensor for b in banks])
+    variants = engine.score_variants(choices, weights, chunk_size=64)
+    for v, bank in enumerate([engine.questions] + banks):
+        expected = NexusInsightAssessment(questions=bank).score_matrix(choices)
+        np.testing.assert_allclose(variants[v], expected, atol=1e-3)
+
+
+def test_what_if_matches_rescoring_the_changed_answers(engine):
+    row = random_choices(engine, 1, seed=2, skip=0.2)[0]
+    row[3] = -1
+    simulator = WhatIfSimulator(engine, row)
+    for qi in range(len(engine.questions)):
+        for option in range(int(engine.option_mask[qi].sum())):
+            changed = row.copy()
+            changed[qi] = option
+            expected = engine.calculate_dimension_scores(to_responses(engine, changed))
+            got = simulator.scores_with(qi, option)
+            np.testing.assert_allclose([got[d] for d in engine.dimension_keys],
+                                       [expected[d] for d in engine.dimension_keys], atol=1e-3)
+
+
+def test_score_intervals_bracket_the_point_score(engine):
+    choices = random_choices(engine, 300, seed=3)
+    choices[0] = -1  # nothing answered
+    low, high = engine.score_intervals(choices, chunk_size=64)
+    scores = engine.score_matrix(choices)
+    measured = [engine.dimension_keys.index(d) for d in engine.measured_dimensions]
+    unmeasured = [i for i in range(len(engine.dimension_keys)) if i not in measured]
+    assert unmeasured
+
+    assert np.isnan(low[:, unmeasured]).all() and np.isnan(high[:, unmeasured]).all()
+    assert np.isnan(low[0]).all() and np.isnan(high[0]).all()
+    low, high, scores = low[1:, measured], high[1:, measured], scores[1:, measured]
+    assert (low <= scores + 1e-3).all() and (scores <= high + 1e-3).all()
+    # One block gives the same bounds
+    np.testing.assert_array_equal(engine.score_intervals(choices)[0][1:, measured], low)
+
+    responses = to_responses(engine, choices[1])
+    intervals = engine.confidence_intervals(responses)
+    assert sorted(intervals) == sorted(engine.measured_dimensions)
+    for i, dim in enumerate(engine.measured_dimensions):
+        assert intervals[dim]["low"] == low[0, i] and intervals[dim]["high"] == high[0, i]
+    assert engine.confidence_intervals({}) == {}
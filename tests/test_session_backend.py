@@ -0,0 +1,39 @@
+from nexus_session_backend import SQLiteSessionBackend, decode_state, encode_state, merge_states
+
+
+def test_state_round_trips_through_a_blob():
+    state = {"responses": {"1": {"selected_option": 2}}, "current_question": 3, "dashboard": {}}
+    assert decode_state(encode_state(state)) == state
+
+
+def test_merge_keeps_changes_made_on_either_side():
+    base = {"current_question": 3, "responses": {"1": {"selected_option": 0}}, "page_note": "a"}
+    ours = {**base, "current_question": 4}
+    theirs = {**base, "page_note": "b"}
+    merged, conflicts = merge_states(base, ours, theirs)
+    assert merged == {**base, "current_question": 4, "page_note": "b"}
+    assert conflicts == []
+
+
+def test_merge_reports_keys_both_sides_changed_and_keeps_the_stored_value():
+    base = {"current_question": 3, "scores": {}}
+    merged, conflicts = merge_states(base, {**base, "current_question": 4}, {**base, "current_question": 5})
+    assert merged["current_question"] == 5
+    assert conflicts == ["current_question"]
+    # The same change on both sides is not a conflict
+    assert merge_states(base, {**base, "scores": {"LD": 1}}, {**base, "scores": {"LD": 1}})[1] == []
+
+
+def test_losing_writer_merges_instead_of_overwriting(tmp_path):
+    backend = SQLiteSessionBackend(str(tmp_path / "sessions.db"))
+    base = {"current_question": 0, "dashboard": {}}
+    version = backend.save("s1", base, 0)
+    assert backend.save("s1", {**base, "dashboard": {"overall_score": 50}}, version) == version + 1
+
+    ours = {**base, "current_question": 1}
+    assert backend.save("s1", ours, version) is None
+    latest, theirs = backend.load("s1")
+    merged, conflicts = merge_states(base, ours, theirs)
+    assert backend.save("s1", merged, latest) == latest + 1
+    assert backend.load("s1")[1] == {"current_question": 1, "dashboard": {"overall_score": 50}}
+    assert conflicts == []
@@ -0,0 +1,54 @@
+import os
+
+from nexus_session_manager import SPILL_SUFFIX, SessionManager, deep_size
+
+
+def run(manager, session_id, live):
+    """One script run of a session whose state is the ``live`` dict"""
+    restored = manager.begin(session_id)
+    if restored is not None:
+        live.update(restored)
+    live["runs"] = live.get("runs", 0) + 1
+
+    def spill():
+        state = dict(live)
+        live.clear()
+        return state
+
+    manager.end(session_id, spill, deep_size(live))
+
+
+def test_idle_sessions_are_spilled_and_come_back(tmp_path):
+    manager = SessionManager(str(tmp_path), idle_seconds=0, sweep_seconds=0)
+    live = {"responses": {"1": {"selected_option": 2}}}
+    run(manager, "a", live)
+    assert live["runs"] == 1  # state stays with the session between runs
+
+    manager.sweep()
+    assert live == {}
+    assert os.listdir(str(tmp_path)) == ["a" + SPILL_SUFFIX]
+
+    run(manager, "a", live)
+    assert live == {"responses": {"1": {"selected_option": 2}}, "runs": 2}
+    metrics = manager.metrics()
+    assert (metrics["spilled_idle"], metrics["rehydrated"], metrics["on_disk"]) == (1, 1, 0)
+
+
+def test_running_sessions_are_never_spilled(tmp_path):
+    manager = SessionManager(str(tmp_path), idle_seconds=0, sweep_seconds=0)
+    live = {"scores": {"LD": 50.0}}
+    run(manager, "a", live)
+    manager.begin("a")
+    manager.sweep()
+    assert live["scores"] == {"LD": 50.0}
+
+
+def test_memory_budget_spills_least_recently_active_first(tmp_path):
+    sessions = {name: {"dashboard": "x" * 1000} for name in "abc"}
+    budget = int(deep_size({"dashboard": "x" * 1000, "runs": 1}) * 2.5)
+    manager = SessionManager(str(tmp_path), memory_budget=budget, sweep_seconds=0)
+    for name in "abc":
+        run(manager, name, sessions[name])
+    assert sessions["a"] == {}
+    assert sessions["b"] and sessions["c"]
+    assert manager.metrics()["spilled_budget"] == 1
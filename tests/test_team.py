@@ -0,0 +1,39 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from nexus_team import TeamObjective, build_team, partition_teams
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_build_team_against_brute_force(engine, seed):
+    scores = np.random.default_rng(seed).uniform(0, 100, (14, len(engine.dimension_keys))).astype(np.float32)
+    objective = TeamObjective(scores, engine.dimension_keys, measured=engine.measured_dimensions)
+    team = build_team(scores, engine.dimension_keys, 4, restarts=8, measured=engine.measured_dimensions)
+
+    assert team["objective"] == round(objective.team_value(team["rows"]), 4)
+    best = max(objective.team_value(c) for c in itertools.combinations(range(len(scores)), 4))
+    # A local search: close to the best team, and no single swap improves on it
+    assert team["objective"] >= best - 0.01
+    outsiders = [p for p in range(len(scores)) if p not in team["rows"]]
+    for out_pos, incoming in itertools.product(range(4), outsiders):
+        swapped = list(team["rows"])
+        swapped[out_pos] = incoming
+        assert objective.team_value(swapped) <= objective.team_value(team["rows"]) + 1e-6
+
+
+def test_teams_use_only_available_people_and_measured_dimensions(engine):
+    scores = np.random.default_rng(61).uniform(0, 100, (30, len(engine.dimension_keys))).astype(np.float32)
+    available = np.ones(30, dtype=bool)
+    available[::3] = False
+    team = build_team(scores, engine.dimension_keys, 5, available=available, ids=[f"p{i}" for i in range(30)],
+                      measured=engine.measured_dimensions)
+    assert all(available[team["rows"]]) and team["members"] == [f"p{i}" for i in team["rows"]]
+    assert sorted(team["coverage"]) == sorted(engine.measured_dimensions)
+
+    teams = partition_teams(scores, engine.dimension_keys, 4, restarts=2, measured=engine.measured_dimensions)
+    rows = [row for t in teams for row in t["rows"]]
+    assert len(teams) == 7 and len(set(rows)) == len(rows) == 28
+    with pytest.raises(ValueError):
+        build_team(scores, engine.dimension_keys, 5, available=np.zeros(30, dtype=bool))
@@ -0,0 +1,44 @@
+import numpy as np
+
+from nexus_team_compare import TeamDistanceCache
+
+
+def full_matrix(vectors):
+    return np.sqrt(((vectors[:, None, :] - vectors[None, :, :]) ** 2).sum(axis=2))
+
+
+def test_cache_after_incremental_updates_matches_full_matrix(engine, tmp_path):
+    rng = np.random.default_rng(7)
+    cache = TeamDistanceCache(str(tmp_path), engine.dimension_keys, engine.measured_dimensions)
+    members = {f"m{i}": rng.uniform(0, 100, len(engine.dimension_keys)) for i in range(60)}
+    next_id = 60
+    for step in range(12):
+        ids = list(members)
+        distances = cache.get("sales", ids, np.array([members[i] for i in ids]))
+        assert sorted(distances.members) == sorted(ids)
+        order = list(rng.permutation(ids))
+        expected = full_matrix(np.array([members[i] for i in order]))
+        np.testing.assert_allclose(distances.submatrix(order), expected, atol=0.05)
+        a, b = order[0], order[1]
+        assert abs(distances.distance(a, b) - expected[0, 1]) < 0.05
+
+        # Reassess a few members, let two leave and two join
+        for member in rng.choice(ids, size=3, replace=False):
+            members[member] = rng.uniform(0, 100, len(engine.dimension_keys))
+        for member in rng.choice(ids, size=2, replace=False):
+            del members[member]
+        for _ in range(2):
+            members[f"m{next_id}"] = rng.uniform(0, 100, len(engine.dimension_keys))
+            next_id += 1
+
+    metrics = cache.metrics()
+    assert metrics["builds"] == 1 and metrics["updates"] == 11
+
+
+def test_unchanged_team_is_a_cache_hit(engine, tmp_path):
+    vectors = np.random.default_rng(8).uniform(0, 100, (20, len(engine.dimension_keys)))
+    ids = [f"m{i}" for i in range(20)]
+    cache = TeamDistanceCache(str(tmp_path), engine.dimension_keys)
+    cache.get("ops", ids, vectors)
+    again = TeamDistanceCache(str(tmp_path), engine.dimension_keys).get("ops", ids[::-1], vectors[::-1])
+    np.testing.assert_allclose(again.submatrix(ids), full_matrix(vectors), atol=0.05)